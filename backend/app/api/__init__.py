@@ -3,7 +3,7 @@ API Routes
 """
 from fastapi import APIRouter
 
-from app.api import dashboard, sites, alerts, settings, fetch, auth
+from app.api import dashboard, sites, alerts, settings, fetch, auth, events
 
 api_router = APIRouter()
 
@@ -14,4 +14,5 @@ api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
 api_router.include_router(settings.router, prefix="/settings", tags=["settings"])
 api_router.include_router(fetch.router, prefix="/fetch", tags=["fetch"])
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
 
@@ -2,42 +2,89 @@
 Alerts API Endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.core.pagination import keyset_page, next_page
 from app.models import Alert, Site
+from app.services.counters import ALERTS_ACTIVE, FLEET, CounterDeltas, read_counters
+from app.services.event_bus import ALERT_EVENT, event_bus
+from app.services.result_cache import ALERTS, STATS, get_or_compute_async, invalidate
 
 router = APIRouter()
 
 
+# Stable, unique sort key for keyset pagination (indexed), newest first
+ALERT_SORT_KEY = [Alert.timestamp, Alert.id]
+
+# Columns of the alerts listing, site name included via the join
+ALERT_COLUMNS = [
+    Alert.id,
+    Alert.site_id,
+    Site.name.label("site_name"),
+    Alert.device_id,
+    Alert.vendor,
+    Alert.severity,
+    Alert.code,
+    Alert.description,
+    Alert.status,
+    Alert.timestamp,
+    Alert.acknowledged_at,
+    Alert.resolved_at,
+]
+
+
+def filter_alerts(query, vendor: Optional[str], severity: Optional[str], status: Optional[str]):
+    """Apply the alert listing filters to a select"""
+    if vendor:
+        query = query.where(Alert.vendor == vendor)
+    if severity:
+        query = query.where(Alert.severity == severity)
+    if status:
+        query = query.where(Alert.status == status)
+    return query
+
+
 @router.get("")
-def get_all_alerts(
+async def get_all_alerts(
     vendor: Optional[str] = None,
     severity: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    page_size: int = Query(50, ge=1, le=500, description="Items per page"),
+    include_total: bool = Query(False, description="Count matching alerts even when no counter covers the filters"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all alerts with optional filtering"""
-    query = db.query(Alert).join(Site, Alert.site_id == Site.id)
+    """
+    Get alerts with optional filtering and cursor pagination, newest first
     
-    if vendor:
-        query = query.filter(Alert.vendor == vendor)
-    if severity:
-        query = query.filter(Alert.severity == severity)
-    if status:
-        query = query.filter(Alert.status == status)
+    Pass the returned next_cursor to get the following page; every page
+    costs the same however long the alert history is. The total comes from
+    the counters for status=Active alone, otherwise it is null unless
+    include_total is set.
+    
+    One projected query returns the page as tuples, site name included.
+    """
+    query = filter_alerts(
+        select(*ALERT_COLUMNS).join(Site, Alert.site_id == Site.id), vendor, severity, status
+    )
+    
+    try:
+        page = keyset_page(query, ALERT_SORT_KEY, cursor, page_size, descending=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    alerts = query.order_by(Alert.timestamp.desc()).all()
+    alerts, next_cursor = next_page((await db.execute(page)).all(), ALERT_SORT_KEY, page_size)
     
-    result = []
-    for alert in alerts:
-        site = db.query(Site).filter(Site.id == alert.site_id).first()
-        result.append({
+    result = [
+        {
             "id": alert.id,
             "site_id": alert.site_id,
-            "site_name": site.name if site else "Unknown",
+            "site_name": alert.site_name,
             "device_id": alert.device_id,
             "vendor": alert.vendor,
             "severity": alert.severity,
@@ -47,11 +94,62 @@ def get_all_alerts(
             "timestamp": alert.timestamp.isoformat() if alert.timestamp else None,
             "acknowledged_at": alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
             "resolved_at": alert.resolved_at.isoformat() if alert.resolved_at else None
-        })
+        }
+        for alert in alerts
+    ]
     
-    return result
+    # Total: O(1) from counters where possible, a COUNT only on request
+    total_count = None
+    if status == "Active" and not vendor and not severity:
+        total_count = int((await read_counters(db, FLEET)).get(ALERTS_ACTIVE, 0))
+    elif include_total:
+        total_count = await db.scalar(
+            filter_alerts(
+                select(func.count(Alert.id)).join(Site, Alert.site_id == Site.id), vendor, severity, status
+            )
+        )
+    
+    return {
+        "alerts": result,
+        "pagination": {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None,
+            "total_count": total_count
+        }
+    }
 
 
+@router.get("/summary")
+async def get_alerts_summary(
+    vendor: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Alert counts by severity, status and vendor (same filters as the listing)
+    
+    One grouped query over (severity, status, vendor); the facets are
+    folded from its rows. Cached until an alert changes.
+    """
+    async def compute():
+        query = filter_alerts(
+            select(Alert.severity, Alert.status, Alert.vendor, func.count(Alert.id))
+            .join(Site, Alert.site_id == Site.id),
+            vendor, severity, status
+        ).group_by(Alert.severity, Alert.status, Alert.vendor)
+        
+        facets = {"severity": {}, "status": {}, "vendor": {}}
+        total = 0
+        for alert_severity, alert_status, alert_vendor, count in await db.execute(query):
+            for facet, value in (("severity", alert_severity), ("status", alert_status), ("vendor", alert_vendor)):
+                facets[facet][value] = facets[facet].get(value, 0) + count
+            total += count
+        
+        return {"total": total, **facets}
+    
+    return await get_or_compute_async(ALERTS, ("summary", vendor, severity, status), compute)
 
 
 @router.patch("/{alert_id}/acknowledge")
@@ -62,9 +160,16 @@ def acknowledge_alert(alert_id: str, db: Session = Depends(get_db)):
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
+    counters = CounterDeltas()
+    counters.record_alert_status(alert.site_id, alert.status, "Acknowledged")
     alert.status = "Acknowledged"
     alert.acknowledged_at = datetime.utcnow()
+    counters.apply(db)
     db.commit()
+    invalidate(STATS, ALERTS)
+    event_bus.publish(ALERT_EVENT, [
+        {"id": alert.id, "site_id": alert.site_id, "status": alert.status, "acknowledged_at": alert.acknowledged_at}
+    ])
     
     return {"status": "success", "alert_id": alert_id}
 
@@ -77,9 +182,16 @@ def resolve_alert(alert_id: str, db: Session = Depends(get_db)):
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
+    counters = CounterDeltas()
+    counters.record_alert_status(alert.site_id, alert.status, "Resolved")
     alert.status = "Resolved"
     alert.resolved_at = datetime.utcnow()
+    counters.apply(db)
     db.commit()
+    invalidate(STATS, ALERTS)
+    event_bus.publish(ALERT_EVENT, [
+        {"id": alert.id, "site_id": alert.site_id, "status": alert.status, "resolved_at": alert.resolved_at}
+    ])
     
     return {"status": "success", "alert_id": alert_id}
 
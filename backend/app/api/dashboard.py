@@ -1,18 +1,29 @@
 """
 Dashboard API Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Optional
+from datetime import timedelta
 
-from app.core.database import get_db
-from app.models import Site, Alert
+from app.core.database import get_async_db, get_db
+from app.core.http_cache import conditional_response, make_etag
+from app.services.counters import (
+    ALERTS_ACTIVE, FLEET, PRODUCTION_TODAY, SITES, SITES_WITH_ALERTS, VERSION, read_counters, sites_with_status
+)
+from app.services.production_ledger import fleet_today, percent_change, read_production, vendor_scope
+from app.services.result_cache import STATS, get_or_compute_async
 
 router = APIRouter()
 
 
 @router.get("/stats")
-def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get dashboard statistics
     
@@ -21,38 +32,87 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
     - online_sites  
     - sites_with_alerts
     - total_production_today_kwh
-    - change_from_yesterday
+    - production_yesterday_kwh
+    - change_from_yesterday (percent, today so far vs yesterday; null without history)
+    - change_from_last_week (percent, vs the same day last week)
     - uptime_percentage
     - new_alerts_this_week
+    
+    Conditional on the fleet version and the day (the ledger comparison
+    moves at midnight without any write): unchanged stats return a 304.
     """
-    # Total sites
-    total_sites = db.query(Site).count()
+    # Counters maintained on write - O(1) regardless of fleet size
+    fleet = await read_counters(db, FLEET)
+    today = fleet_today()
     
-    # Online sites
-    online_sites = db.query(Site).filter(Site.status == "Online").count()
+    version = int(fleet.get(VERSION, 0))
+    etag = make_etag("stats", version, today)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
     
-    # Sites with active alerts
-    sites_with_alerts = db.query(func.count(func.distinct(Alert.site_id)))\
-        .filter(Alert.status == "Active").scalar() or 0
+    async def compute():
+        total_sites = int(fleet.get(SITES, 0))
+        online_sites = int(fleet.get(sites_with_status("Online"), 0))
+        sites_with_alerts = int(fleet.get(SITES_WITH_ALERTS, 0))
+        total_production_today = fleet.get(PRODUCTION_TODAY, 0.0)
+        
+        # Calculate uptime percentage
+        uptime_percentage = round((online_sites / total_sites * 100) if total_sites > 0 else 100, 1)
+        
+        # New alerts this week (simplified - count all active)
+        new_alerts_this_week = int(fleet.get(ALERTS_ACTIVE, 0))
+        
+        # Day-over-day / week-over-week from the production ledger
+        yesterday, last_week = today - timedelta(days=1), today - timedelta(days=7)
+        production = await read_production(db, FLEET, [today, yesterday, last_week])
+        
+        return {
+            "total_sites": total_sites,
+            "online_sites": online_sites,
+            "sites_with_alerts": sites_with_alerts,
+            "total_production_today_kwh": round(total_production_today, 2),
+            "production_yesterday_kwh": round(production[yesterday], 2),
+            "change_from_yesterday": percent_change(production[today], production[yesterday]),
+            "change_from_last_week": percent_change(production[today], production[last_week]),
+            "uptime_percentage": uptime_percentage,
+            "new_alerts_this_week": new_alerts_this_week
+        }
     
-    # Total production today
-    total_production_today = db.query(func.sum(Site.daily_production_kwh)).scalar() or 0
+    # Keyed by the version too, so the body always matches the ETag
+    return await get_or_compute_async(STATS, ("stats", version, today), compute)
+
+
+@router.get("/production")
+async def get_production_history(
+    days: int = Query(7, ge=1, le=366, description="Number of days, ending today"),
+    vendor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Daily production of the fleet (or one vendor's sites) from the ledger
     
-    # Calculate uptime percentage
-    uptime_percentage = round((online_sites / total_sites * 100) if total_sites > 0 else 100, 1)
+    Each site's production is booked on its own local day. Cached until
+    an overview changes.
+    """
+    scope = vendor_scope(vendor) if vendor else FLEET
+    today = fleet_today()
     
-    # New alerts this week (simplified - count all active)
-    new_alerts_this_week = db.query(Alert).filter(Alert.status == "Active").count()
+    async def compute():
+        history = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+        production = await read_production(db, scope, history + [today - timedelta(days=7)])
+        
+        return {
+            "scope": scope,
+            "days": [
+                {"date": day.isoformat(), "energy_kwh": round(production[day], 3)}
+                for day in history
+            ],
+            "change_day_over_day": percent_change(production[today], production[today - timedelta(days=1)]),
+            "change_week_over_week": percent_change(production[today], production[today - timedelta(days=7)])
+        }
     
-    return {
-        "total_sites": total_sites,
-        "online_sites": online_sites,
-        "sites_with_alerts": sites_with_alerts,
-        "total_production_today_kwh": round(total_production_today, 2),
-        "change_from_yesterday": 15.0,  # TODO: Calculate from historical data
-        "uptime_percentage": uptime_percentage,
-        "new_alerts_this_week": new_alerts_this_week
-    }
+    return await get_or_compute_async(STATS, ("production", scope, days, today), compute)
 
 
 @router.post("/refresh")
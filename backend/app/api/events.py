@@ -0,0 +1,79 @@
+"""
+Events API Endpoint - Server-Sent Events stream of site, device and alert changes
+"""
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+
+from app.core.config import settings
+from app.services.event_bus import RESET_EVENT, event_bus
+
+router = APIRouter()
+
+
+def format_event(event_id: str, kind: str, data: str) -> str:
+    """One SSE message"""
+    return f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n"
+
+
+async def event_stream(last_event_id: Optional[str]) -> AsyncIterator[str]:
+    """
+    Replay events after last_event_id, then stream new ones as they come
+
+    A comment line is sent every EVENTS_HEARTBEAT_SECONDS without events, so
+    proxies keep the connection open and dead clients are noticed.
+    """
+    subscription = event_bus.subscribe()
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+
+        sequence = event_bus.head()
+        if last_event_id:
+            replay_from = event_bus.parse_id(last_event_id)
+            if replay_from is None or event_bus.since(replay_from) is None:
+                # Missed events are gone (buffer overrun or restart): reload
+                yield format_event(event_bus.event_id(sequence), RESET_EVENT, json.dumps({"reason": "gap"}))
+            else:
+                sequence = replay_from
+
+        while True:
+            # Cleared before reading, so a publish in between still wakes us
+            subscription.wake.clear()
+            events = event_bus.since(sequence)
+            if events is None:
+                sequence = event_bus.head()
+                yield format_event(event_bus.event_id(sequence), RESET_EVENT, json.dumps({"reason": "overrun"}))
+                continue
+
+            for event in events:
+                yield format_event(event_bus.event_id(event.sequence), event.kind, event.data)
+                sequence = event.sequence
+
+            try:
+                await asyncio.wait_for(subscription.wake.wait(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+@router.get("")
+async def stream_events(last_event_id: Optional[str] = Header(None)):
+    """
+    Stream change events (text/event-stream)
+
+    Events: sites, devices and alerts carry a JSON array of changed fields
+    (each with its id); reset means events were missed and the client
+    should reload. EventSource reconnects with Last-Event-ID on its own,
+    and missed events still buffered are replayed.
+    """
+    return StreamingResponse(
+        event_stream(last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
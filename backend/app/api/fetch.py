@@ -16,6 +16,8 @@ router = APIRouter()
 def fetch_all_data(db: Session = Depends(get_db)):
     """
     Manually trigger data fetch from all vendors
+    
+    Fetches regardless of resource TTLs; rate-limit cooldowns still apply.
     """
     try:
         # Get all API keys
@@ -38,14 +40,15 @@ def fetch_all_data(db: Session = Depends(get_db)):
             logger.info(f"Fetching sites from {vendor}...")
             
             try:
-                sites = data_service.fetch_all_sites(vendor, key)
+                sites = data_service.fetch_all_sites(vendor, key, force=True)
                 
                 # Fetch details for first few sites (to avoid rate limits)
                 sites_updated = 0
                 for site in sites[:3]:  # Limit to 3 sites per vendor
                     try:
-                        data_service.fetch_site_overview(site.id, vendor, key)
-                        data_service.fetch_site_devices(site.id, vendor, key)
+                        data_service.fetch_site_overview(site.id, vendor, key, force=True)
+                        data_service.fetch_site_devices(site.id, vendor, key, force=True)
+                        data_service.fetch_site_energy(site.id, vendor, key, force=True)
                         sites_updated += 1
                     except Exception as e:
                         logger.error(f"Failed to fetch site {site.id}: {e}")
@@ -80,6 +83,8 @@ def fetch_all_data(db: Session = Depends(get_db)):
 def fetch_vendor_data(vendor: str, db: Session = Depends(get_db)):
     """
     Manually trigger data fetch from a specific vendor
+    
+    Fetches regardless of resource TTLs; rate-limit cooldowns still apply.
     """
     try:
         # Get API key for vendor
@@ -95,14 +100,15 @@ def fetch_vendor_data(vendor: str, db: Session = Depends(get_db)):
         key = api_key.key_encrypted
         
         logger.info(f"Fetching sites from {vendor}...")
-        sites = data_service.fetch_all_sites(vendor, key)
+        sites = data_service.fetch_all_sites(vendor, key, force=True)
         
         # Fetch details for first few sites
         sites_updated = 0
         for site in sites[:5]:
             try:
-                data_service.fetch_site_overview(site.id, vendor, key)
-                data_service.fetch_site_devices(site.id, vendor, key)
+                data_service.fetch_site_overview(site.id, vendor, key, force=True)
+                data_service.fetch_site_devices(site.id, vendor, key, force=True)
+                data_service.fetch_site_energy(site.id, vendor, key, force=True)
                 sites_updated += 1
             except Exception as e:
                 logger.error(f"Failed to fetch site {site.id}: {e}")
@@ -12,6 +12,10 @@ from loguru import logger
 from app.core.database import get_db
 from app.core.config import settings as config
 from app.models import ApiKey
+from app.connectors import connector_registry
+from app.services.power_flow_cache import power_flow_cache
+from app.services.quota import quota_manager, account_fingerprint
+from app.services.result_cache import clear_cache as clear_result_cache
 
 router = APIRouter()
 
@@ -103,14 +107,14 @@ def add_api_key(data: dict, db: Session = Depends(get_db)):
     logger.info(f"API key added for {vendor}. Triggering initial data fetch...")
     try:
         data_service = DataService(db)
-        sites = data_service.fetch_all_sites(vendor, key)
+        sites = data_service.fetch_all_sites(vendor, key, force=True)
         logger.info(f"✅ Initial fetch: {len(sites)} sites from {vendor}")
         
         # Fetch details for first 3 sites
         for site in sites[:3]:
             try:
-                data_service.fetch_site_overview(site.id, vendor, key)
-                data_service.fetch_site_devices(site.id, vendor, key)
+                data_service.fetch_site_overview(site.id, vendor, key, force=True)
+                data_service.fetch_site_devices(site.id, vendor, key, force=True)
             except Exception as e:
                 logger.error(f"Failed to fetch site details: {e}")
     except Exception as e:
@@ -135,14 +139,43 @@ def delete_api_key(key_id: str, db: Session = Depends(get_db)):
     db.delete(api_key)
     db.commit()
     
+    # Drop the pooled connector so the deleted credentials are not reused
+    connector_registry.close_vendor(api_key.vendor)
+    
     return {"status": "success", "message": "API key deleted"}
 
 
+@router.get("/quota")
+def get_quota(vendor: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Get remaining vendor API budget
+    
+    One entry per token bucket (vendor, account and site scopes). Account
+    buckets are labelled with the masked key they belong to.
+    """
+    masked_keys = {
+        account_fingerprint(key.key_encrypted): key.key_masked
+        for key in db.query(ApiKey).all()
+    }
+    
+    buckets = quota_manager.get_status(vendor)
+    for bucket in buckets:
+        if bucket["scope"] == "account":
+            bucket["key_masked"] = masked_keys.get(bucket["scope_id"])
+    
+    return buckets
+
+
 @router.post("/clear-cache")
 def clear_cache():
-    """Clear application cache"""
-    # TODO: Implement cache clearing logic
-    return {"status": "success", "message": "Cache cleared"}
+    """Clear cached API results (every worker's, unless CACHE_BACKEND is memory) and power flow readings"""
+    try:
+        cleared = clear_result_cache() + power_flow_cache.clear()
+    except Exception as e:
+        logger.error(f"Failed to clear cache: {e}")
+        raise HTTPException(status_code=503, detail=f"Cache unavailable: {str(e)}")
+    
+    return {"status": "success", "message": "Cache cleared", "cleared": cleared}
 
 
 @router.get("/export")
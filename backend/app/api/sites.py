@@ -1,44 +1,81 @@
 """
 Sites API Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 from loguru import logger
 
-from app.core.database import get_db
-from app.models import Site, Device, TimeseriesMetric, Alert
+from app.core.database import get_async_db, get_db
+from app.core.http_cache import conditional_response, make_etag
+from app.core.pagination import keyset_page, next_page
+from app.models import Site, Device, Alert
+from app.services.counters import (
+    DEVICES, DEVICES_ONLINE, FLEET, SITES, VERSION, read_counters, read_version, sites_with_status
+)
 from app.services.data_service import DataService
+from app.services.result_cache import energy_namespace, get_or_compute
+from app.services.rollups import read_rollups
+from app.services.timeseries_store import read_series
 
 router = APIRouter()
 
 
+# Stable, unique sort key for keyset pagination (indexed)
+SITE_SORT_KEY = [Site.name, Site.id]
+
+
 @router.get("")
-def get_all_sites(
+async def get_all_sites(
+    request: Request,
+    response: Response,
     vendor: Optional[str] = None,
     status: Optional[str] = None,
-    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db)
+    include_total: bool = Query(False, description="Count matching sites even when no counter covers the filters"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all sites with optional filtering and pagination"""
-    query = db.query(Site)
+    """
+    Get all sites with optional filtering and cursor pagination
+    
+    Sites are ordered by name. Pass the returned next_cursor to get the
+    following page; every page costs the same however deep it is. The
+    total comes from the fleet counters when the filters allow (no vendor
+    filter), otherwise it is null unless include_total is set.
+    
+    Conditional: the ETag changes with the fleet version, so an unchanged
+    page revalidates with a 304 and no site reads.
+    """
+    fleet = await read_counters(db, FLEET)
+    etag = make_etag("sites", int(fleet.get(VERSION, 0)), vendor, status, cursor, page_size, include_total)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    query = select(Site)
     
     if vendor:
-        query = query.filter(Site.vendor == vendor)
+        query = query.where(Site.vendor == vendor)
     if status:
-        query = query.filter(Site.status == status)
+        query = query.where(Site.status == status)
     
-    # Get total count before pagination
-    total_count = query.count()
+    try:
+        page = keyset_page(query, SITE_SORT_KEY, cursor, page_size)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    sites = query.offset(offset).limit(page_size).all()
+    sites, next_cursor = next_page((await db.scalars(page)).all(), SITE_SORT_KEY, page_size)
     
-    # Calculate pagination metadata
-    total_pages = (total_count + page_size - 1) // page_size  # Ceiling division
+    # Total: O(1) from counters where possible, a COUNT only on request
+    total_count = None
+    if not vendor:
+        total_count = int(fleet.get(sites_with_status(status) if status else SITES, 0))
+    elif include_total:
+        total_count = await db.scalar(select(func.count()).select_from(query.subquery()))
     
     return {
         "sites": [
@@ -58,20 +95,28 @@ def get_all_sites(
             for site in sites
         ],
         "pagination": {
-            "page": page,
             "page_size": page_size,
-            "total_count": total_count,
-            "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_prev": page > 1
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None,
+            "total_count": total_count
         }
     }
 
 
 @router.get("/{site_id}")
-def get_site_by_id(site_id: str, db: Session = Depends(get_db)):
-    """Get specific site by ID"""
-    site = db.query(Site).filter(Site.id == site_id).first()
+async def get_site_by_id(
+    site_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get specific site by ID (conditional on the site's version)"""
+    etag = make_etag("site", site_id, await read_version(db, site_id))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    site = await db.get(Site, site_id)
     
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
@@ -95,19 +140,27 @@ def get_site_by_id(site_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{site_id}/overview")
-def get_site_overview(site_id: str, db: Session = Depends(get_db)):
-    """Get site overview with current metrics"""
-    site = db.query(Site).filter(Site.id == site_id).first()
+async def get_site_overview(
+    site_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get site overview with current metrics (conditional on the site's version)"""
+    # Device counts and the site's version are maintained on write
+    counters = await read_counters(db, site_id)
+    etag = make_etag("overview", site_id, int(counters.get(VERSION, 0)))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    site = await db.get(Site, site_id)
     
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
-    # Get device counts
-    total_devices = db.query(Device).filter(Device.site_id == site_id).count()
-    online_devices = db.query(Device).filter(
-        Device.site_id == site_id, 
-        Device.status == "Online"
-    ).count()
+    total_devices = int(counters.get(DEVICES, 0))
+    online_devices = int(counters.get(DEVICES_ONLINE, 0))
     
     return {
         "site_id": site.id,
@@ -122,51 +175,84 @@ def get_site_overview(site_id: str, db: Session = Depends(get_db)):
     }
 
 
+# Coarsest rollup that still resolves each chart period
+PERIOD_RESOLUTION = {
+    "hour": "hour",
+    "day": "day",
+    "week": "day",
+    "month": "month",
+}
+
+
 @router.get("/{site_id}/energy")
 def get_site_energy(
     site_id: str,
     period: str = Query("day", regex="^(hour|day|week|month)$"),
+    resolution: Optional[str] = Query(None, regex="^(raw|hour|day|month)$"),
     db: Session = Depends(get_db)
 ):
-    """Get energy production data for a site"""
-    site = db.query(Site).filter(Site.id == site_id).first()
+    """
+    Get energy production data for a site
     
-    if not site:
-        raise HTTPException(status_code=404, detail="Site not found")
+    Reads the rollup matching the period (hourly for the last 24 hours,
+    daily for weeks, monthly for the year) so latency does not depend on
+    how much raw history is kept. Pass resolution to override, e.g.
+    resolution=raw for the stored intervals. Cached until new energy points
+    for the site are written.
+    """
+    resolution = resolution or PERIOD_RESOLUTION[period]
     
-    # Calculate time range based on period
-    end_time = datetime.utcnow()
-    if period == "hour":
-        start_time = end_time - timedelta(hours=24)
-    elif period == "day":
-        start_time = end_time - timedelta(days=7)
-    elif period == "week":
-        start_time = end_time - timedelta(weeks=4)
-    else:  # month
-        start_time = end_time - timedelta(days=365)
-    
-    # Fetch metrics
-    metrics = db.query(TimeseriesMetric).filter(
-        TimeseriesMetric.site_id == site_id,
-        TimeseriesMetric.metric_name == "energy",
-        TimeseriesMetric.timestamp >= start_time,
-        TimeseriesMetric.timestamp <= end_time
-    ).order_by(TimeseriesMetric.timestamp).all()
+    def compute():
+        site = db.query(Site).filter(Site.id == site_id).first()
+        
+        if not site:
+            raise HTTPException(status_code=404, detail="Site not found")
+        
+        # Calculate time range based on period
+        end_time = datetime.utcnow()
+        if period == "hour":
+            start_time = end_time - timedelta(hours=24)
+        elif period == "day":
+            start_time = end_time - timedelta(days=7)
+        elif period == "week":
+            start_time = end_time - timedelta(weeks=4)
+        else:  # month
+            start_time = end_time - timedelta(days=365)
+        
+        if resolution == "raw":
+            series = read_series(db, site_id, "energy", start_time, end_time)
+            
+            return [
+                {
+                    "timestamp": timestamp.isoformat(),
+                    "value": value,
+                    "metric_name": "energy"
+                }
+                for timestamp, value in series.points()
+            ]
+        
+        rollups = read_rollups(db, site_id, "energy", resolution, start_time, end_time)
+        
+        return [
+            {
+                "timestamp": rollup.bucket_start.isoformat(),
+                "value": rollup.value_sum,
+                "metric_name": "energy",
+                "resolution": resolution,
+                "min": rollup.value_min,
+                "max": rollup.value_max,
+                "count": rollup.sample_count
+            }
+            for rollup in rollups
+        ]
     
-    return [
-        {
-            "timestamp": metric.timestamp.isoformat(),
-            "value": metric.value,
-            "metric_name": metric.metric_name
-        }
-        for metric in metrics
-    ]
+    return get_or_compute(energy_namespace(site_id), (period, resolution), compute)
 
 
 @router.get("/{site_id}/devices")
-def get_site_devices(site_id: str, db: Session = Depends(get_db)):
+async def get_site_devices(site_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get all devices for a site"""
-    devices = db.query(Device).filter(Device.site_id == site_id).all()
+    devices = (await db.scalars(select(Device).where(Device.site_id == site_id))).all()
     
     return [
         {
@@ -186,12 +272,14 @@ def get_site_devices(site_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{site_id}/layout")
-def get_site_layout(site_id: str, db: Session = Depends(get_db)):
+async def get_site_layout(site_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get panel layout for schematic view"""
-    devices = db.query(Device).filter(
-        Device.site_id == site_id,
-        Device.device_type.in_(["panel", "microinverter"])
-    ).order_by(Device.serial_number).all()
+    devices = (await db.scalars(
+        select(Device).where(
+            Device.site_id == site_id,
+            Device.device_type.in_(["panel", "microinverter"])
+        ).order_by(Device.serial_number)
+    )).all()
     
     return [
         {
@@ -205,10 +293,11 @@ def get_site_layout(site_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{site_id}/alerts")
-def get_site_alerts(site_id: str, db: Session = Depends(get_db)):
+async def get_site_alerts(site_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get all alerts for a specific site"""
-    alerts = db.query(Alert).filter(Alert.site_id == site_id)\
-        .order_by(Alert.timestamp.desc()).all()
+    alerts = (await db.scalars(
+        select(Alert).where(Alert.site_id == site_id).order_by(Alert.timestamp.desc())
+    )).all()
     
     return [
         {
@@ -238,7 +327,6 @@ def get_site_power_flow(site_id: str, db: Session = Depends(get_db)):
     - Battery status (charging/discharging)
     """
     from app.models import ApiKey
-    from app.connectors import SolarEdgeConnector
     
     site = db.query(Site).filter(Site.id == site_id).first()
     
@@ -258,20 +346,26 @@ def get_site_power_flow(site_id: str, db: Session = Depends(get_db)):
             "message": "Power flow data only available for SolarEdge sites"
         }
     
-    try:
-        connector = SolarEdgeConnector(api_key.key_encrypted)
-        power_flow = connector.get_power_flow(site_id)
-        connector.close()
-        
-        return {
-            "site_id": site_id,
-            "site_name": site.name,
-            "supported": True,
-            **power_flow
-        }
-    except Exception as e:
-        logger.error(f"Failed to fetch power flow for {site_id}: {e}")
+    data_service = DataService(db)
+    power_flow = data_service.fetch_power_flow(site_id, site.vendor, api_key.key_encrypted)
+    
+    if power_flow is None:
+        cooldown_until = data_service.fetch_tracker.cooldown_until(site.vendor, site_id, "power_flow")
+        if cooldown_until:
+            retry_after = max(int((cooldown_until - datetime.utcnow()).total_seconds()), 1)
+            raise HTTPException(
+                status_code=503,
+                detail="Power flow is rate limited, try again later",
+                headers={"Retry-After": str(retry_after)}
+            )
         raise HTTPException(status_code=500, detail="Failed to fetch power flow data")
+    
+    return {
+        "site_id": site_id,
+        "site_name": site.name,
+        "supported": True,
+        **power_flow
+    }
 
 
 @router.post("/{site_id}/refresh")
@@ -4,6 +4,13 @@ Vendor API Connectors
 from app.connectors.enphase import EnphaseConnector
 from app.connectors.solaredge import SolarEdgeConnector
 from app.connectors.generac import GeneracConnector
+from app.connectors.registry import ConnectorRegistry, connector_registry
 
-__all__ = ["EnphaseConnector", "SolarEdgeConnector", "GeneracConnector"]
+__all__ = [
+    "EnphaseConnector",
+    "SolarEdgeConnector",
+    "GeneracConnector",
+    "ConnectorRegistry",
+    "connector_registry"
+]
 
@@ -3,16 +3,85 @@ Base Connector Class
 """
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 import httpx
 
+from app.services.quota import quota_manager, QuotaExceededError
+
+try:
+    import h2  # noqa: F401 - only needed to enable HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class RateLimitError(Exception):
+    """Raised when a vendor answers 429 Too Many Requests"""
+    
+    def __init__(self, vendor: str, retry_after: Optional[int] = None):
+        self.vendor = vendor
+        self.retry_after = retry_after
+        message = f"{vendor} rate limit exceeded"
+        if retry_after is not None:
+            message += f" (retry after {retry_after}s)"
+        super().__init__(message)
+
+
+# Errors that mean "stop calling this vendor for now" - connectors re-raise
+# these instead of swallowing them in their best-effort fallbacks
+THROTTLED_ERRORS = (RateLimitError, QuotaExceededError)
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[int]:
+    """
+    Parse a Retry-After header into seconds
+    
+    Accepts both forms allowed by RFC 9110: delay-seconds and HTTP-date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is not None:
+        retry_at = retry_at.replace(tzinfo=None) - retry_at.utcoffset()
+    return max(int((retry_at - datetime.utcnow()).total_seconds()), 0)
+
 
 class BaseConnector(ABC):
     """Base class for all vendor API connectors"""
     
+    vendor: str = ""
+    # Max sites per bulk overview request (1 = no bulk endpoint)
+    overview_batch_size: int = 1
+    # Energy ingestion: longest range one get_site_energy call may span, and
+    # the interval size to request (None = the connector's default)
+    energy_window: timedelta = timedelta(days=30)
+    energy_time_unit: Optional[str] = None
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.client = httpx.Client(timeout=30.0)  # Changed to sync Client
+        # Connectors are long-lived (see app.connectors.registry), so the
+        # client keeps connections alive and multiplexes over HTTP/2 when
+        # the vendor supports it instead of re-handshaking on every call
+        self.client = httpx.Client(
+            timeout=30.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=10,
+                max_keepalive_connections=5,
+                keepalive_expiry=120.0
+            )
+        )
     
     @abstractmethod
     def get_sites(self) -> List[Dict[str, Any]]:
@@ -31,7 +100,12 @@ class BaseConnector(ABC):
         start_date: datetime, 
         end_date: datetime
     ) -> List[Dict[str, Any]]:
-        """Fetch energy production data"""
+        """
+        Fetch energy production data
+        
+        Raises on any failed request; an empty list means the vendor
+        answered and has no data for the range.
+        """
         pass
     
     @abstractmethod
@@ -39,6 +113,15 @@ class BaseConnector(ABC):
         """Fetch devices/equipment for a site"""
         pass
     
+    def _acquire_quota(self, site_id: Optional[str] = None) -> None:
+        """
+        Reserve one request from the shared vendor quota
+        
+        Raises QuotaExceededError instead of sending a request that would
+        eat into a budget the vendor has already (or is about to) cut off.
+        """
+        quota_manager.acquire(self.vendor, self.api_key, site_id)
+    
     def close(self):
         """Close HTTP client"""
         self.client.close()
@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 import httpx
 from loguru import logger
 
-from app.connectors.base import BaseConnector
+from app.connectors.base import BaseConnector, RateLimitError, THROTTLED_ERRORS, parse_retry_after
 from app.core.config import settings
 
 
@@ -24,6 +24,10 @@ class EnphaseConnector(BaseConnector):
     The api_key parameter should contain the OAuth access_token
     """
     
+    vendor = "Enphase"
+    # Telemetry with granularity=day returns one day of intervals from start_at
+    energy_window = timedelta(days=1)
+    
     def __init__(self, api_key: str):
         super().__init__(api_key)
         self.base_url = settings.ENPHASE_BASE_URL
@@ -35,7 +39,8 @@ class EnphaseConnector(BaseConnector):
     def _make_request(
         self, 
         endpoint: str, 
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        site_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Make API request with OAuth token and API key
@@ -44,6 +49,8 @@ class EnphaseConnector(BaseConnector):
         - Authorization: Bearer {access_token} (in header)
         - key: {application_api_key} (in query params)
         """
+        self._acquire_quota(site_id)
+        
         if params is None:
             params = {}
         
@@ -68,7 +75,7 @@ class EnphaseConnector(BaseConnector):
                 raise Exception("Invalid or expired token")
             elif e.response.status_code == 429:
                 logger.warning(f"Enphase rate limit exceeded: {e}")
-                raise Exception("Rate limit exceeded")
+                raise RateLimitError(self.vendor, parse_retry_after(e.response))
             else:
                 logger.error(f"Enphase HTTP error: {e}")
                 raise
@@ -136,11 +143,13 @@ class EnphaseConnector(BaseConnector):
         system_id = site_id.replace("en_", "")
         
         # Get basic system info
-        system_data = self._make_request(f"/systems/{system_id}")
+        system_data = self._make_request(f"/systems/{system_id}", site_id=site_id)
         
         # Get summary with current production data
         try:
-            summary_data = self._make_request(f"/systems/{system_id}/summary")
+            summary_data = self._make_request(f"/systems/{system_id}/summary", site_id=site_id)
+        except THROTTLED_ERRORS:
+            raise
         except Exception as e:
             logger.warning(f"Could not fetch system summary: {e}")
             summary_data = {}
@@ -171,7 +180,7 @@ class EnphaseConnector(BaseConnector):
         """
         activation_id = site_id.replace("en_", "")
         
-        data = self._make_request(f"/activations/{activation_id}/ops/production_mode")
+        data = self._make_request(f"/activations/{activation_id}/ops/production_mode", site_id=site_id)
         
         return {
             "mode": data.get("mode"),
@@ -199,26 +208,24 @@ class EnphaseConnector(BaseConnector):
             "granularity": "day"
         }
         
-        # This is a simplified version - actual endpoint may vary
-        try:
-            data = self._make_request(
-                f"/systems/{system_id}/telemetry/production_micro",
-                params
-            )
-            
-            intervals = data.get("intervals", [])
-            
-            return [
-                {
-                    "timestamp": datetime.fromtimestamp(interval["end_at"]).isoformat(),
-                    "value": interval.get("powr", 0) / 1000,  # Convert W to kW
-                    "unit": "kWh"
-                }
-                for interval in intervals
-            ]
-        except Exception as e:
-            logger.warning(f"Could not fetch Enphase energy data: {e}")
-            return []
+        # This is a simplified version - actual endpoint may vary.
+        # Errors propagate: an empty list must mean the window has no data
+        data = self._make_request(
+            f"/systems/{system_id}/telemetry/production_micro",
+            params,
+            site_id=site_id
+        )
+        
+        intervals = data.get("intervals", [])
+        
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(interval["end_at"]).isoformat(),
+                "value": interval.get("enwh", 0) / 1000,  # Convert Wh to kWh
+                "unit": "kWh"
+            }
+            for interval in intervals
+        ]
     
     def get_devices(self, site_id: str) -> List[Dict[str, Any]]:
         """
@@ -229,7 +236,7 @@ class EnphaseConnector(BaseConnector):
         system_id = site_id.replace("en_", "")
         
         try:
-            data = self._make_request(f"/systems/{system_id}/devices")
+            data = self._make_request(f"/systems/{system_id}/devices", site_id=site_id)
             
             devices = []
             device_data = data.get("devices", {})
@@ -284,6 +291,8 @@ class EnphaseConnector(BaseConnector):
             
             return devices
         
+        except THROTTLED_ERRORS:
+            raise
         except Exception as e:
             logger.warning(f"Could not fetch Enphase devices: {e}")
             return []
@@ -298,7 +307,7 @@ class EnphaseConnector(BaseConnector):
         
         try:
             # Note: This endpoint structure is simplified
-            data = self._make_request(f"/systems/{system_id}/meters")
+            data = self._make_request(f"/systems/{system_id}/meters", site_id=site_id)
             
             meters = []
             for meter in data.get("meters", []):
@@ -314,6 +323,8 @@ class EnphaseConnector(BaseConnector):
             
             return meters
         
+        except THROTTLED_ERRORS:
+            raise
         except Exception as e:
             logger.warning(f"Could not fetch Enphase meters: {e}")
             return []
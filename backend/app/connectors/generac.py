@@ -10,10 +10,11 @@ from datetime import datetime, timedelta
 import httpx
 from loguru import logger
 import time
+import threading
 import json
 import base64
 
-from app.connectors.base import BaseConnector
+from app.connectors.base import BaseConnector, RateLimitError, THROTTLED_ERRORS, parse_retry_after
 
 
 class GeneracConnector(BaseConnector):
@@ -37,6 +38,8 @@ class GeneracConnector(BaseConnector):
     - Each user authenticates with their own account
     """
     
+    vendor = "Generac"
+    
     def __init__(self, credentials: str):
         """
         Initialize Generac connector
@@ -56,6 +59,7 @@ class GeneracConnector(BaseConnector):
         self.api_base_url = "https://generac-api.neur.io"
         self.last_request_time = 0
         self.min_request_interval = 10  # Minimum 10 seconds between requests
+        self._pace_lock = threading.Lock()
         
         # Parse OAuth credentials from base64-encoded JSON
         try:
@@ -87,16 +91,22 @@ class GeneracConnector(BaseConnector):
     def _make_request(
         self, 
         endpoint: str, 
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        site_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Make authenticated API request with rate limiting"""
-        # Enforce rate limiting
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            logger.info(f"⏱️ Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        self._acquire_quota(site_id)
+        
+        # Enforce rate limiting (the connector is shared between threads,
+        # so reserve the next request slot under the lock)
+        with self._pace_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self.last_request_time
+            if time_since_last_request < self.min_request_interval:
+                sleep_time = self.min_request_interval - time_since_last_request
+                logger.info(f"⏱️ Rate limiting: sleeping for {sleep_time:.2f} seconds")
+                time.sleep(sleep_time)
+            self.last_request_time = time.time()
         
         url = f"{self.api_base_url}{endpoint}"
         
@@ -127,7 +137,7 @@ class GeneracConnector(BaseConnector):
                 raise Exception("Access denied. Your account may not have permission to access this data.")
             elif e.response.status_code == 429:
                 logger.error(f"❌ Rate limit exceeded")
-                raise Exception("Rate limit exceeded - please try again later")
+                raise RateLimitError(self.vendor, parse_retry_after(e.response))
             else:
                 logger.error(f"❌ HTTP error: {e.response.status_code}")
                 raise
@@ -197,8 +207,8 @@ class GeneracConnector(BaseConnector):
         # Extract numeric site ID
         numeric_site_id = site_id.replace('gen_', '')
         
-        endpoint = f"/fleets/v4/{self.user_id}/sites/{numeric_site_id}"
-        data = self._make_request(endpoint)
+        endpoint = f"/fleets/v4/{self.fleet_id}/sites/{numeric_site_id}"
+        data = self._make_request(endpoint, site_id=site_id)
         
         return self._normalize_site(data)
     
@@ -213,9 +223,11 @@ class GeneracConnector(BaseConnector):
         
         # Try common overview endpoint patterns
         try:
-            endpoint = f"/fleets/v4/{self.user_id}/sites/{numeric_site_id}/overview"
-            data = self._make_request(endpoint)
-        except:
+            endpoint = f"/fleets/v4/{self.fleet_id}/sites/{numeric_site_id}/overview"
+            data = self._make_request(endpoint, site_id=site_id)
+        except THROTTLED_ERRORS:
+            raise
+        except Exception:
             # Fallback to site details
             logger.warning("Overview endpoint not found, using site details")
             data = self.get_site_details(site_id)
@@ -234,11 +246,13 @@ class GeneracConnector(BaseConnector):
         """
         numeric_site_id = site_id.replace('gen_', '')
         
-        endpoint = f"/fleets/v4/{self.user_id}/sites/{numeric_site_id}/devices"
+        endpoint = f"/fleets/v4/{self.fleet_id}/sites/{numeric_site_id}/devices"
         
         try:
-            data = self._make_request(endpoint)
-        except:
+            data = self._make_request(endpoint, site_id=site_id)
+        except THROTTLED_ERRORS:
+            raise
+        except Exception:
             logger.warning("Devices endpoint not available")
             return []
         
@@ -271,18 +285,15 @@ class GeneracConnector(BaseConnector):
         """
         numeric_site_id = site_id.replace('gen_', '')
         
-        endpoint = f"/fleets/v4/{self.user_id}/sites/{numeric_site_id}/energy"
+        endpoint = f"/fleets/v4/{self.fleet_id}/sites/{numeric_site_id}/energy"
         params = {
             'startDate': start_date.isoformat(),
             'endDate': end_date.isoformat(),
             'timeUnit': time_unit
         }
         
-        try:
-            data = self._make_request(endpoint, params)
-        except:
-            logger.warning("Energy endpoint not available")
-            return []
+        # Errors propagate: an empty list must mean the window has no data
+        data = self._make_request(endpoint, params, site_id=site_id)
         
         energy_data = []
         if 'data' in data:
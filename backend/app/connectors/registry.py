@@ -0,0 +1,87 @@
+"""
+Connector Registry
+
+Keeps one long-lived connector (and therefore one pooled HTTP client) per
+vendor account so the scheduler, the fetch endpoints and the live site
+endpoints all reuse the same keep-alive connections.
+
+Callers hold on to a connector without checking it back in, so connectors
+are never closed while the application runs: close_vendor() only retires
+them (later calls get a new connector) and they are closed at shutdown.
+"""
+from typing import Dict, List, Optional, Tuple
+import threading
+from loguru import logger
+
+from app.connectors.base import BaseConnector
+from app.connectors.enphase import EnphaseConnector
+from app.connectors.solaredge import SolarEdgeConnector
+from app.connectors.generac import GeneracConnector
+
+
+CONNECTOR_CLASSES = {
+    "SolarEdge": SolarEdgeConnector,
+    "Enphase": EnphaseConnector,
+    "Generac": GeneracConnector,
+}
+
+
+class ConnectorRegistry:
+    """Process-wide cache of connectors keyed by (vendor, api_key)"""
+
+    def __init__(self):
+        self._connectors: Dict[Tuple[str, str], BaseConnector] = {}
+        self._retired: List[BaseConnector] = []
+        self._lock = threading.Lock()
+
+    def get(self, vendor: str, api_key: str) -> Optional[BaseConnector]:
+        """
+        Get the shared connector for a vendor account, creating it on first use
+
+        Returns None for unsupported vendors.
+        """
+        connector_class = CONNECTOR_CLASSES.get(vendor)
+        if connector_class is None:
+            return None
+
+        key = (vendor, api_key)
+        with self._lock:
+            connector = self._connectors.get(key)
+            if connector is None:
+                connector = connector_class(api_key)
+                self._connectors[key] = connector
+                logger.info(f"🔌 Opened pooled {vendor} connector")
+            return connector
+
+    def close_vendor(self, vendor: str) -> None:
+        """
+        Retire every connector for a vendor (e.g. when its key is deleted)
+
+        Retired connectors are no longer handed out, but stay open until
+        shutdown: poller threads may still be mid-request on them.
+        """
+        with self._lock:
+            keys = [key for key in self._connectors if key[0] == vendor]
+            self._retired.extend(self._connectors.pop(key) for key in keys)
+
+        if keys:
+            logger.info(f"🔌 Retired {len(keys)} {vendor} connector(s)")
+
+    def close_all(self) -> None:
+        """Close every pooled and retired connector (called on application shutdown)"""
+        with self._lock:
+            connectors = list(self._connectors.values()) + self._retired
+            self._connectors.clear()
+            self._retired = []
+
+        for connector in connectors:
+            try:
+                connector.close()
+            except Exception as e:
+                logger.warning(f"Failed to close connector: {e}")
+
+        if connectors:
+            logger.info(f"🔌 Closed {len(connectors)} pooled connectors")
+
+
+connector_registry = ConnectorRegistry()
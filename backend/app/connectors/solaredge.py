@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 import httpx
 from loguru import logger
 
-from app.connectors.base import BaseConnector
+from app.connectors.base import BaseConnector, RateLimitError, parse_retry_after
 from app.core.config import settings
 
 
@@ -21,21 +21,31 @@ class SolarEdgeConnector(BaseConnector):
     - 300 requests/day per account
     - 300 requests/day per site
     - 3 concurrent calls per IP
+    - 100 site IDs per bulk request
     """
     
+    vendor = "SolarEdge"
+    overview_batch_size = 100
+    # Quarter-hour energy is limited to one month per request; dates are
+    # inclusive days, so 28-day windows stay inside the limit
+    energy_window = timedelta(days=28)
+    energy_time_unit = "QUARTER_OF_AN_HOUR"
+    
     def __init__(self, api_key: str):
         super().__init__(api_key)
         self.base_url = settings.SOLAREDGE_BASE_URL
         self.daily_limit = settings.SOLAREDGE_DAILY_LIMIT
         self.concurrent_limit = settings.SOLAREDGE_CONCURRENT_LIMIT
-        self.request_count = 0
     
     def _make_request(
         self, 
         endpoint: str, 
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        site_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Make API request with rate limiting"""
+        self._acquire_quota(site_id)
+        
         if params is None:
             params = {}
         
@@ -47,14 +57,13 @@ class SolarEdgeConnector(BaseConnector):
             logger.info(f"SolarEdge API request: {endpoint}")
             response = self.client.get(url, params=params)
             response.raise_for_status()
-            self.request_count += 1
             
             return response.json()
         
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:
                 logger.warning(f"SolarEdge rate limit exceeded: {e}")
-                raise Exception("Rate limit exceeded")
+                raise RateLimitError(self.vendor, parse_retry_after(e.response))
             elif e.response.status_code == 403:
                 logger.error(f"SolarEdge forbidden: {e}")
                 raise Exception("Invalid API key or permissions")
@@ -106,7 +115,7 @@ class SolarEdgeConnector(BaseConnector):
         # Remove 'se_' prefix if present
         vendor_site_id = site_id.replace("se_", "")
         
-        data = self._make_request(f"/site/{vendor_site_id}/details")
+        data = self._make_request(f"/site/{vendor_site_id}/details", site_id=site_id)
         details = data.get("details", {})
         
         return {
@@ -136,9 +145,36 @@ class SolarEdgeConnector(BaseConnector):
         """
         vendor_site_id = site_id.replace("se_", "")
         
-        data = self._make_request(f"/site/{vendor_site_id}/overview")
-        overview = data.get("overview", {})
+        data = self._make_request(f"/site/{vendor_site_id}/overview", site_id=site_id)
         
+        return self._parse_overview(data.get("overview", {}))
+    
+    def get_sites_overview(self, site_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch overviews for up to 100 sites in a single request
+        
+        Endpoint: GET /sites/{siteId1},{siteId2},.../overview
+        
+        Counts as one request against the account quota, instead of one
+        per site. Returns overviews keyed by our site ID; sites missing
+        from the response are omitted.
+        """
+        if len(site_ids) > self.overview_batch_size:
+            raise ValueError(f"At most {self.overview_batch_size} sites per bulk request")
+        
+        vendor_site_ids = ",".join(site_id.replace("se_", "") for site_id in site_ids)
+        
+        data = self._make_request(f"/sites/{vendor_site_ids}/overview")
+        site_list = data.get("sitesOverviews", {}).get("siteEnergyList", [])
+        
+        return {
+            f"se_{entry['siteId']}": self._parse_overview(entry.get("siteOverview", {}))
+            for entry in site_list
+            if entry.get("siteId") is not None
+        }
+    
+    def _parse_overview(self, overview: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a SolarEdge overview object (single or bulk response)"""
         return {
             "current_power_kw": overview.get("currentPower", {}).get("power", 0) / 1000,  # W to kW
             "daily_energy_kwh": overview.get("lastDayData", {}).get("energy", 0) / 1000,  # Wh to kWh
@@ -165,45 +201,33 @@ class SolarEdgeConnector(BaseConnector):
         """
         vendor_site_id = site_id.replace("se_", "")
         
-        try:
-            data = self._make_request(f"/site/{vendor_site_id}/currentPowerFlow")
-            power_flow = data.get("siteCurrentPowerFlow", {})
-            
-            # Extract power values (in W, we convert to kW)
-            pv_power = power_flow.get("PV", {}).get("currentPower", 0)
-            load_power = power_flow.get("LOAD", {}).get("currentPower", 0)
-            grid_power = power_flow.get("GRID", {}).get("currentPower", 0)
-            storage_power = power_flow.get("STORAGE", {}).get("currentPower", 0)
-            
-            # Handle cases where values might be None
-            pv_power = float(pv_power) if pv_power is not None else 0.0
-            load_power = float(load_power) if load_power is not None else 0.0
-            grid_power = float(grid_power) if grid_power is not None else 0.0
-            storage_power = float(storage_power) if storage_power is not None else 0.0
-            
-            return {
-                "pv_power_kw": pv_power / 1000,  # W to kW
-                "load_power_kw": load_power / 1000,  # W to kW
-                "grid_power_kw": grid_power / 1000,  # W to kW (positive = importing, negative = exporting)
-                "storage_power_kw": storage_power / 1000,  # W to kW (positive = discharging, negative = charging)
-                "storage_level_percent": power_flow.get("STORAGE", {}).get("chargeLevel", 0),
-                "status": power_flow.get("STORAGE", {}).get("status", ""),
-                "last_update": power_flow.get("updateRefreshRate"),
-                "unit": "kW"
-            }
-        except Exception as e:
-            logger.warning(f"Failed to fetch power flow for {site_id}: {e}")
-            # Return zeros if power flow is not available
-            return {
-                "pv_power_kw": 0.0,
-                "load_power_kw": 0.0,
-                "grid_power_kw": 0.0,
-                "storage_power_kw": 0.0,
-                "storage_level_percent": 0,
-                "status": "unavailable",
-                "last_update": None,
-                "unit": "kW"
-            }
+        # Errors propagate: a zero reading would pass for a real one
+        data = self._make_request(f"/site/{vendor_site_id}/currentPowerFlow", site_id=site_id)
+        power_flow = data.get("siteCurrentPowerFlow", {})
+        
+        # Extract power values (in W, we convert to kW)
+        pv_power = power_flow.get("PV", {}).get("currentPower", 0)
+        load_power = power_flow.get("LOAD", {}).get("currentPower", 0)
+        grid_power = power_flow.get("GRID", {}).get("currentPower", 0)
+        storage_power = power_flow.get("STORAGE", {}).get("currentPower", 0)
+        
+        # Handle cases where values might be None
+        pv_power = float(pv_power) if pv_power is not None else 0.0
+        load_power = float(load_power) if load_power is not None else 0.0
+        grid_power = float(grid_power) if grid_power is not None else 0.0
+        storage_power = float(storage_power) if storage_power is not None else 0.0
+        
+        return {
+            "pv_power_kw": pv_power / 1000,  # W to kW
+            "load_power_kw": load_power / 1000,  # W to kW
+            "grid_power_kw": grid_power / 1000,  # W to kW (positive = importing, negative = exporting)
+            "storage_power_kw": storage_power / 1000,  # W to kW (positive = discharging, negative = charging)
+            "storage_level_percent": power_flow.get("STORAGE", {}).get("chargeLevel", 0),
+            "status": power_flow.get("STORAGE", {}).get("status", ""),
+            "last_update": datetime.utcnow().isoformat(),
+            "update_refresh_rate": power_flow.get("updateRefreshRate"),  # Seconds between vendor updates
+            "unit": "kW"
+        }
     
     def get_site_energy(
         self, 
@@ -226,7 +250,7 @@ class SolarEdgeConnector(BaseConnector):
             "timeUnit": time_unit
         }
         
-        data = self._make_request(f"/site/{vendor_site_id}/energy", params)
+        data = self._make_request(f"/site/{vendor_site_id}/energy", params, site_id=site_id)
         energy_data = data.get("energy", {})
         
         return [
@@ -247,7 +271,7 @@ class SolarEdgeConnector(BaseConnector):
         """
         vendor_site_id = site_id.replace("se_", "")
         
-        data = self._make_request(f"/site/{vendor_site_id}/inventory")
+        data = self._make_request(f"/site/{vendor_site_id}/inventory", site_id=site_id)
         inventory = data.get("Inventory", {})
         
         devices = []
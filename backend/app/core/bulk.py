@@ -0,0 +1,166 @@
+"""
+Set-based bulk upserts
+
+Writes many rows per statement instead of one SELECT + UPDATE per row.
+SQLite and PostgreSQL use native INSERT ... ON CONFLICT DO UPDATE; other
+databases load the existing primary keys with one IN query per chunk and
+split the chunk into a bulk INSERT and a bulk UPDATE. bulk_increment is the
+same with "add to the stored value" instead of "overwrite".
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import Table, bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+# Rows per executemany batch - keeps bound parameters well under SQLite limits
+BULK_CHUNK_SIZE = 500
+
+
+def chunked(rows: List[Any], size: int = BULK_CHUNK_SIZE) -> Iterable[List[Any]]:
+    """Split a list into consecutive chunks of at most `size` items"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def bulk_upsert(
+    db: Session,
+    model,
+    rows: List[Dict[str, Any]],
+    update_columns: Optional[List[str]] = None
+) -> None:
+    """
+    Insert rows, updating the ones whose primary key already exists
+
+    Every row must have the same keys. The caller owns the transaction.
+
+    Args:
+        db: Database session
+        model: Mapped model class or Table (single-column primary key)
+        rows: Column values per row
+        update_columns: Columns overwritten on conflict (default: every
+            provided column except the primary key and created_at)
+    """
+    if not rows:
+        return
+
+    table = model if isinstance(model, Table) else model.__table__
+    pk = table.primary_key.columns.values()[0].name
+
+    if update_columns is None:
+        update_columns = [key for key in rows[0] if key not in (pk, "created_at")]
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(table)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[pk],
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[pk])
+
+        for chunk in chunked(rows):
+            db.execute(stmt, chunk)
+        return
+
+    # Portable path: one IN query per chunk, then bulk INSERT / bulk UPDATE
+    pk_column = table.c[pk]
+    for chunk in chunked(rows):
+        existing = {
+            row_id for (row_id,) in db.execute(
+                select(pk_column).where(pk_column.in_([row[pk] for row in chunk]))
+            )
+        }
+
+        new_rows = [row for row in chunk if row[pk] not in existing]
+        changed_rows = [
+            {pk: row[pk], **{column: row[column] for column in update_columns}}
+            for row in chunk if row[pk] in existing
+        ]
+
+        if new_rows:
+            db.execute(insert(table), new_rows)
+        if changed_rows and update_columns:
+            if isinstance(model, Table):
+                # Core bulk UPDATE: bind the key under a name that cannot clash
+                stmt = update(table).where(pk_column == bindparam("_pk")).values(
+                    {column: bindparam(column) for column in update_columns}
+                )
+                db.execute(stmt, [
+                    {"_pk": row[pk], **{column: row[column] for column in update_columns}}
+                    for row in changed_rows
+                ])
+            else:
+                db.execute(update(model), changed_rows)
+
+
+def bulk_increment(
+    db: Session,
+    model,
+    rows: List[Dict[str, Any]],
+    increment_columns: List[str]
+) -> None:
+    """
+    Insert rows, adding their increment columns onto rows that already exist
+
+    Every row must have the same keys; columns other than the increment
+    columns are only used when the row is inserted. The caller owns the
+    transaction.
+
+    Args:
+        db: Database session
+        model: Mapped model class (single-column primary key)
+        rows: Column values per row (increment columns hold the deltas)
+        increment_columns: Columns added to the stored value on conflict
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    pk = table.primary_key.columns.values()[0].name
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[pk],
+            set_={column: table.c[column] + stmt.excluded[column] for column in increment_columns}
+        )
+        for chunk in chunked(rows):
+            db.execute(stmt, chunk)
+        return
+
+    # Portable path: one IN query per chunk, then bulk INSERT / bulk UPDATE
+    # (bind names are prefixed so they cannot clash with column names)
+    pk_column = table.c[pk]
+    stmt = update(table).where(pk_column == bindparam("_pk")).values(
+        {column: table.c[column] + bindparam(f"_{column}") for column in increment_columns}
+    )
+    for chunk in chunked(rows):
+        existing = {
+            row_id for (row_id,) in db.execute(
+                select(pk_column).where(pk_column.in_([row[pk] for row in chunk]))
+            )
+        }
+
+        new_rows = [row for row in chunk if row[pk] not in existing]
+        if new_rows:
+            db.execute(insert(table), new_rows)
+
+        changed_rows = [
+            {"_pk": row[pk], **{f"_{column}": row[column] for column in increment_columns}}
+            for row in chunk if row[pk] in existing
+        ]
+        if changed_rows:
+            db.execute(stmt, changed_rows)
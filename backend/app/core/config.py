@@ -2,7 +2,7 @@
 Application Configuration
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,6 +10,18 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./sungazer.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with its async driver (aiosqlite, asyncpg)
+    DB_POOL_SIZE: int = 10  # Persistent connections (API threadpool + pollers + writer)
+    DB_MAX_OVERFLOW: int = 20  # Extra connections under bursts
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    
+    # SQLite performance profile (applied to every connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 64 MiB page cache per connection
+    SQLITE_MAINTENANCE_MINUTES: int = 15  # WAL checkpoint + PRAGMA optimize
     
     # API
     API_HOST: str = "0.0.0.0"
@@ -37,13 +49,71 @@ class Settings(BaseSettings):
     SOLAREDGE_DAILY_LIMIT: int = 300
     SOLAREDGE_CONCURRENT_LIMIT: int = 3
     
+    # Enphase / Generac quotas
+    ENPHASE_DAILY_LIMIT: int = 300  # Per application (developer API key) plan
+    GENERAC_DAILY_LIMIT: int = 200  # Per account
+    
+    # Enphase / Generac concurrency (per-vendor polling bulkheads)
+    ENPHASE_CONCURRENT_LIMIT: int = 4
+    GENERAC_CONCURRENT_LIMIT: int = 1  # Generac requests are paced 10s apart anyway
+    
+    # Rate limiting - cooldown applied after a 429 without a Retry-After header
+    RATE_LIMIT_COOLDOWN_SECONDS: int = 900
+    NO_DATA_COOLDOWN_MINUTES: int = 60  # Back-off for sites a bulk overview returned nothing for
+    ERROR_BACKOFF_SECONDS: int = 60  # Poller back-off after a failed fetch, doubled per consecutive failure
+    ERROR_BACKOFF_MAX_SECONDS: int = 3600  # Cap on that back-off
+    
     # Polling - Default values (can be overridden in Settings UI)
     DASHBOARD_TTL_MINUTES: int = 45
     SITE_TTL_MINUTES: int = 15
     POLL_INTERVAL_MINUTES: int = 15
     MAX_REPOLLS: int = 3
+    SCHEDULER_TICK_SECONDS: int = 60  # How often stale resources are dispatched
+    
+    # Per-resource refresh intervals (site overview uses SITE_TTL_MINUTES)
+    INVENTORY_TTL_MINUTES: int = 1440  # Devices/inventory - once a day
+    POWER_FLOW_TTL_MINUTES: int = 15  # Live power flow - on demand, reused while fresh
+    POWER_FLOW_CACHE_SECONDS: int = 60  # Reuse of a reading when the vendor reports no updateRefreshRate
+    ENERGY_TTL_MINUTES: int = 60  # Energy timeseries - incremental since the last point
+    ENERGY_BACKFILL_DAYS: int = 7  # History fetched for a site's first energy ingestion
     INACTIVITY_TIMEOUT_MINUTES: int = 5
     
+    # Timeseries storage backend: "rows" (one row per point) or "chunks"
+    # (compressed per site/metric/day blobs)
+    TIMESERIES_BACKEND: str = "rows"
+    
+    # Timeseries retention (days, 0 = forever); daily/monthly rollups are kept forever
+    RETENTION_RAW_DAYS: int = 90
+    RETENTION_HOURLY_DAYS: int = 730
+    RETENTION_INTERVAL_MINUTES: int = 60  # How often the retention job runs
+    RETENTION_BATCH_SIZE: int = 5000  # Records archived and deleted per transaction
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.1  # Gap between batches for other writers
+    ARCHIVE_DIR: str = "./archive"  # Compressed monthly archives of expired data
+    
+    # Metric write-behind buffer
+    METRIC_FLUSH_BATCH_SIZE: int = 5000  # Points per write transaction
+    METRIC_FLUSH_INTERVAL_SECONDS: float = 2.0  # Max age of a buffered point
+    METRIC_BUFFER_MAX_POINTS: int = 50000  # Pollers block beyond this (backpressure)
+    
+    # Result cache for computed API responses: "memory" (per-process LRU,
+    # single-process deployments only), "sqlite" (file shared by the workers
+    # on a host) or "redis" (needs the redis package)
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: int = 60  # Upper bound on staleness if an invalidation is missed
+    CACHE_MAX_ENTRIES: int = 1000  # Memory/SQLite eviction threshold (Redis uses maxmemory-policy)
+    CACHE_SQLITE_PATH: str = "./cache.db"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "sungazer:"  # Redis key prefix, so a shared Redis can be flushed selectively
+    
+    # Server-Sent Events (/api/events)
+    EVENTS_BUFFER_SIZE: int = 1000  # Events kept for Last-Event-ID replay
+    EVENTS_HEARTBEAT_SECONDS: int = 15  # Comment sent on idle streams
+    EVENTS_RETRY_MS: int = 3000  # Client reconnect delay
+    
+    # Dashboard - calendar for "today" / "yesterday" in fleet production
+    # deltas (each site's production is booked on its own local day)
+    FLEET_TIMEZONE: str = "UTC"
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     
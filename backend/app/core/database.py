@@ -1,23 +1,127 @@
 """
 Database Configuration and Session Management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
+import threading
+from loguru import logger
 
 from app.core.config import settings
 
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in settings.DATABASE_URL or settings.DATABASE_URL == "sqlite://")
+
+# asyncio driver used for the API's read path, per database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Performance profile applied to every SQLite connection
+    
+    WAL lets API readers run while the scheduler commits; NORMAL sync is
+    durable across application crashes in WAL mode (only a power loss can
+    drop the last commits); busy_timeout makes writers queue instead of
+    failing with "database is locked".
+    """
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # Negative = KiB instead of pages
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_profile(dbapi_connection, connection_record=None) -> None:
+    """Engine "connect" listener that applies sqlite_pragmas()"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
+def engine_options() -> Dict[str, Any]:
+    """Connection arguments and pool sizing for the configured database"""
+    options: Dict[str, Any] = {"echo": False, "pool_pre_ping": not IS_SQLITE}
+    
+    if IS_SQLITE:
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    
+    # In-memory SQLite uses a single shared connection, so no pool sizing
+    if not IS_SQLITE_MEMORY:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    
+    return options
+
+
+def async_engine_options() -> Dict[str, Any]:
+    """engine_options() for the async engine"""
+    options = engine_options()
+    
+    # aiosqlite defaults to NullPool (a new connection per session); pool
+    # file databases like the sync engine so pragmas are applied once
+    if not IS_SQLITE_MEMORY:
+        options["poolclass"] = AsyncAdaptedQueuePool
+    
+    return options
+
+
+def async_database_url() -> str:
+    """
+    DATABASE_URL with its driver swapped for the asyncio equivalent
+    
+    ASYNC_DATABASE_URL overrides this, e.g. for a driver not listed in
+    ASYNC_DRIVERS.
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    
+    url = make_url(settings.DATABASE_URL)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(
+            f"No async driver known for {url.get_backend_name()}, set ASYNC_DATABASE_URL"
+        )
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=False
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options())
+
+if IS_SQLITE:
+    event.listen(engine, "connect", apply_sqlite_profile)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the read endpoints - same database, pool sizing and
+# SQLite profile, but sessions wait on the event loop instead of holding a
+# threadpool worker. (An in-memory SQLite database is not shared between
+# the two engines.) Created on first use, so a missing async driver fails
+# those endpoints instead of every import of this module.
+_async_engine: Optional[AsyncEngine] = None
+_async_sessions: Optional[async_sessionmaker] = None
+_async_lock = threading.Lock()
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -33,12 +137,91 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_async_engine() -> AsyncEngine:
+    """
+    The async engine, created on first use
+    
+    Raises:
+        RuntimeError: if the async driver for the database is not installed
+    """
+    global _async_engine, _async_sessions
+    
+    with _async_lock:
+        if _async_engine is None:
+            try:
+                async_engine = create_async_engine(async_database_url(), **async_engine_options())
+            except ImportError as e:
+                raise RuntimeError(
+                    f"Async database driver not installed ({e}); install it or set ASYNC_DATABASE_URL"
+                ) from e
+            
+            if IS_SQLITE:
+                event.listen(async_engine.sync_engine, "connect", apply_sqlite_profile)
+            
+            _async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+            _async_engine = async_engine
+        return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections, if it was ever created"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting async database sessions (read endpoints)
+    """
+    get_async_engine()
+    async with _async_sessions() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database - create all tables
     """
-    from app.models import Site, Device, Alert, TimeseriesMetric, ApiKey, FetchLog
+    from app.models import (
+        Site, Device, Alert, TimeseriesMetric, ApiKey, FetchLog, QuotaBucket, RecordFingerprint,
+        MetricWatermark, MetricRollup, MetricChunk, Counter,
+        ProductionLedger
+    )
     
     Base.metadata.create_all(bind=engine)
+    
+    # create_all only indexes the tables it creates; add indexes introduced
+    # since an existing table was created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("✅ Database tables created")
+    
+    if IS_SQLITE:
+        with engine.connect() as connection:
+            journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        logger.info(f"🗃️  SQLite journal mode: {journal_mode}")
+
+
+def maintain_database() -> None:
+    """
+    Periodic SQLite housekeeping
+    
+    Lets SQLite refresh the query planner statistics it needs, then
+    checkpoints the WAL back into the main file and truncates it (so it
+    does not grow without bound while readers are always active). The
+    statistics are written first so the checkpoint includes them.
+    """
+    if not IS_SQLITE:
+        return
+    
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA optimize"))
+        connection.commit()
+        busy, wal_pages, checkpointed = connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).one()
+    
+    if busy:
+        logger.info(f"🗃️  WAL checkpoint incomplete ({checkpointed}/{wal_pages} pages), readers active")
+    else:
+        logger.debug(f"WAL checkpoint complete ({checkpointed} pages)")
 
@@ -0,0 +1,53 @@
+"""
+HTTP caching - ETag / If-None-Match conditional responses for read endpoints
+
+An endpoint derives its ETag from a cheap version signal (the change
+counters maintained on write) plus anything else its response depends on,
+such as query parameters. A client that sends back a matching ETag in
+If-None-Match gets an empty 304 before the endpoint reads any rows, so
+idle dashboards polling unchanged data cost one counter lookup each.
+
+Cache-Control makes clients revalidate every time (max-age=0), but lets
+them show the cached copy while revalidating for up to SITE_TTL_MINUTES,
+the longest the poller leaves a site's data unrefreshed.
+"""
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag of the parts a response depends on"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+def cache_control() -> str:
+    return f"private, max-age=0, stale-while-revalidate={settings.SITE_TTL_MINUTES * 60}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Add caching headers; return a 304 if the client's copy is current
+
+    Endpoints return the 304 as is, or build their body as usual (the
+    headers are already on the response).
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control()}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,106 @@
+"""
+Keyset Pagination - Opaque cursors over a stable sort key
+
+A page is read with WHERE (sort key) > (sort key of the previous page's
+last row) ORDER BY sort key LIMIT n. With an index on the sort key every
+page costs the same, unlike OFFSET which scans and discards every earlier
+row. The sort key must be unique (end it with the primary key).
+
+The cursor is the last row's sort key, JSON-encoded and base64url'd so
+clients treat it as opaque.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import binascii
+import json
+from sqlalchemy import DateTime, Select, tuple_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for a sort key"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Sort key encoded in a cursor, typed like the sort columns
+
+    Raises:
+        ValueError: The cursor is malformed or does not match the sort key
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    try:
+        return [_typed(column, value) for column, value in zip(columns, values)]
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _typed(column: Any, value: Any) -> Any:
+    """A cursor value converted to its column's type (TypeError if it cannot be)"""
+    if value is None:
+        return None
+
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise TypeError(f"{column.key} must be an ISO timestamp")
+        return datetime.fromisoformat(value)
+
+    python_type = column.type.python_type
+    if python_type in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"{column.key} must be a number")
+        return python_type(value)
+
+    if not isinstance(value, python_type):
+        raise TypeError(f"{column.key} must be a {python_type.__name__}")
+    return value
+
+
+def keyset_page(
+    query: Select,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    page_size: int,
+    descending: bool = False
+) -> Select:
+    """
+    Restrict a select to the page after `cursor`, in sort key order
+
+    Fetches one extra row so next_page() can tell whether another page
+    follows.
+
+    Raises:
+        ValueError: The cursor is malformed
+    """
+    if cursor:
+        key, after = tuple_(*columns), tuple_(*decode_cursor(cursor, columns))
+        query = query.where(key < after if descending else key > after)
+
+    order = [column.desc() for column in columns] if descending else list(columns)
+    return query.order_by(*order).limit(page_size + 1)
+
+
+def next_page(rows: Sequence[Any], columns: Sequence[Any], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Rows of a keyset_page() result and the cursor of the page after it
+
+    Returns:
+        (at most page_size rows, next cursor or None on the last page)
+    """
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
@@ -4,73 +4,67 @@ Background Scheduler for Data Polling
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from loguru import logger
-from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import SessionLocal
-from app.models import ApiKey
-from app.services.data_service import DataService
+from app.core.database import maintain_database
+from app.services.poller import fleet_poller
+from app.services.retention import retention_service
 
 scheduler = BackgroundScheduler()
 
 
-def poll_all_sites():
-    """Background job to poll data from all vendors"""
-    logger.info("🔄 Polling all sites...")
-    
-    db: Session = SessionLocal()
-    
+def poll_stale_resources():
+    """Background job to dispatch the (site, resource) pairs past their TTL"""
     try:
-        # Get all API keys
-        api_keys = db.query(ApiKey).all()
-        
-        if not api_keys:
-            logger.warning("No API keys found. Add API keys in Settings.")
-            return
-        
-        data_service = DataService(db)
-        
-        # Fetch sites for each vendor
-        for api_key in api_keys:
-            vendor = api_key.vendor
-            key = api_key.key_encrypted  # In production, decrypt this
-            
-            logger.info(f"Fetching sites from {vendor}...")
-            
-            try:
-                sites = data_service.fetch_all_sites(vendor, key)
-                logger.info(f"✅ Fetched {len(sites)} sites from {vendor}")
-                
-                # Fetch details for each site
-                for site in sites[:5]:  # Limit to 5 sites to avoid rate limits
-                    try:
-                        data_service.fetch_site_overview(site.id, vendor, key)
-                        data_service.fetch_site_devices(site.id, vendor, key)
-                        logger.info(f"✅ Updated data for site {site.name}")
-                    except Exception as e:
-                        logger.error(f"Failed to fetch site {site.id}: {e}")
-                        
-            except Exception as e:
-                logger.error(f"Failed to fetch from {vendor}: {e}")
-        
-        logger.info("✅ Polling complete")
-        
+        fleet_poller.dispatch_stale()
     except Exception as e:
         logger.error(f"Polling error: {e}")
-    finally:
-        db.close()
+
+
+def apply_retention():
+    """Background job to archive timeseries history past its retention"""
+    try:
+        retention_service.run()
+    except Exception as e:
+        logger.error(f"Retention error: {e}")
+
+
+def run_database_maintenance():
+    """Background job to checkpoint the SQLite WAL and refresh planner stats"""
+    try:
+        maintain_database()
+    except Exception as e:
+        logger.error(f"Database maintenance error: {e}")
 
 
 def start_scheduler():
     """Start the background scheduler"""
     logger.info("🚀 Starting background scheduler...")
     
-    # Add polling job
+    # Add polling job - runs every tick, but only stale resources are fetched
+    scheduler.add_job(
+        poll_stale_resources,
+        trigger=IntervalTrigger(seconds=settings.SCHEDULER_TICK_SECONDS),
+        id="poll_stale_resources",
+        name="Poll stale solar site resources",
+        replace_existing=True
+    )
+    
+    # Retention job - archives expired raw points and hourly rollups
+    scheduler.add_job(
+        apply_retention,
+        trigger=IntervalTrigger(minutes=settings.RETENTION_INTERVAL_MINUTES),
+        id="apply_retention",
+        name="Archive expired timeseries history",
+        replace_existing=True
+    )
+    
+    # Database maintenance - keeps the SQLite WAL from growing unbounded
     scheduler.add_job(
-        poll_all_sites,
-        trigger=IntervalTrigger(minutes=settings.POLL_INTERVAL_MINUTES),
-        id="poll_all_sites",
-        name="Poll all solar sites",
+        run_database_maintenance,
+        trigger=IntervalTrigger(minutes=settings.SQLITE_MAINTENANCE_MINUTES),
+        id="database_maintenance",
+        name="Checkpoint and optimize the database",
         replace_existing=True
     )
     
@@ -82,5 +76,6 @@ def stop_scheduler():
     """Stop the background scheduler"""
     if scheduler.running:
         scheduler.shutdown()
+        fleet_poller.shutdown()
         logger.info("⏹️  Scheduler stopped")
 
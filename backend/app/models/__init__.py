@@ -7,6 +7,13 @@ from app.models.alert import Alert
 from app.models.timeseries import TimeseriesMetric
 from app.models.api_key import ApiKey
 from app.models.fetch_log import FetchLog
+from app.models.quota_bucket import QuotaBucket
+from app.models.record_fingerprint import RecordFingerprint
+from app.models.metric_watermark import MetricWatermark
+from app.models.metric_rollup import MetricRollup
+from app.models.metric_chunk import MetricChunk
+from app.models.counter import Counter
+from app.models.production_ledger import ProductionLedger
 
 __all__ = [
     "Site",
@@ -14,6 +21,13 @@ __all__ = [
     "Alert",
     "TimeseriesMetric",
     "ApiKey",
-    "FetchLog"
+    "FetchLog",
+    "QuotaBucket",
+    "RecordFingerprint",
+    "MetricWatermark",
+    "MetricRollup",
+    "MetricChunk",
+    "Counter",
+    "ProductionLedger"
 ]
 
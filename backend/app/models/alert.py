@@ -1,7 +1,7 @@
 """
 Alert Model
 """
-from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -30,6 +30,10 @@ class Alert(Base):
     # Relationships
     site = relationship("Site", back_populates="alerts")
     
+    __table_args__ = (
+        Index('idx_alert_timestamp_id', 'timestamp', 'id'),  # Keyset pagination sort key
+    )
+    
     def __repr__(self):
         return f"<Alert(id={self.id}, severity={self.severity}, status={self.status})>"
 
@@ -0,0 +1,18 @@
+"""
+Counter Model - Denormalized fleet and per-site totals maintained on write
+"""
+from sqlalchemy import Column, String, Float
+
+from app.core.database import Base
+
+
+class Counter(Base):
+    __tablename__ = "counters"
+    
+    id = Column(String, primary_key=True)  # {scope}:{name}, e.g. fleet:sites.Online
+    scope = Column(String, nullable=False, index=True)  # "fleet" or a site ID
+    name = Column(String, nullable=False)  # sites, sites.Online, devices_online, ...
+    value = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<Counter(scope={self.scope}, name={self.name}, value={self.value})>"
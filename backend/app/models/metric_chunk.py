@@ -0,0 +1,27 @@
+"""
+Metric Chunk Model - One site/metric/day of timeseries points packed into a blob
+"""
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, LargeBinary, Index
+
+from app.core.database import Base
+
+
+class MetricChunk(Base):
+    __tablename__ = "metric_chunks"
+    
+    id = Column(String, primary_key=True)  # {site_id}:{metric_name}:{day}
+    site_id = Column(String, ForeignKey("sites.id"), nullable=False)
+    metric_name = Column(String, nullable=False)
+    day = Column(DateTime, nullable=False)  # Midnight the chunk's timestamps are offsets from
+    unit = Column(String, nullable=True)
+    
+    # zlib(delta-encoded second offsets as uint32 + values as float32)
+    point_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_chunk_site_metric_day', 'site_id', 'metric_name', 'day'),
+    )
+    
+    def __repr__(self):
+        return f"<MetricChunk(site_id={self.site_id}, metric={self.metric_name}, day={self.day}, points={self.point_count})>"
@@ -0,0 +1,32 @@
+"""
+Metric Rollup Model - Hourly/daily/monthly aggregates of timeseries metrics
+"""
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, Index
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class MetricRollup(Base):
+    __tablename__ = "metric_rollups"
+    
+    id = Column(String, primary_key=True)  # {site_id}:{metric_name}:{granularity}:{bucket_start}
+    site_id = Column(String, ForeignKey("sites.id"), nullable=False)
+    metric_name = Column(String, nullable=False)
+    granularity = Column(String, nullable=False)  # hour, day, month
+    bucket_start = Column(DateTime, nullable=False)
+    
+    # Aggregates over the points in the bucket
+    value_sum = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_rollup_site_metric_time', 'site_id', 'metric_name', 'granularity', 'bucket_start'),
+    )
+    
+    def __repr__(self):
+        return f"<MetricRollup(site_id={self.site_id}, metric={self.metric_name}, {self.granularity}={self.bucket_start})>"
@@ -0,0 +1,20 @@
+"""
+Metric Watermark Model - Newest ingested timestamp per site and metric
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class MetricWatermark(Base):
+    __tablename__ = "metric_watermarks"
+    
+    id = Column(String, primary_key=True)  # {site_id}:{metric_name}
+    site_id = Column(String, ForeignKey("sites.id"), nullable=False, index=True)
+    metric_name = Column(String, nullable=False)
+    high_water_mark = Column(DateTime, nullable=False)  # Timestamp of the newest stored point
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<MetricWatermark(site_id={self.site_id}, metric={self.metric_name}, mark={self.high_water_mark})>"
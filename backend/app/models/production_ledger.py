@@ -0,0 +1,22 @@
+"""
+Production Ledger Model - Daily production per site, vendor and fleet
+"""
+from sqlalchemy import Column, String, Float, Date, Index
+
+from app.core.database import Base
+
+
+class ProductionLedger(Base):
+    __tablename__ = "production_ledger"
+    
+    id = Column(String, primary_key=True)  # {scope}:{day}, e.g. fleet:2024-06-01
+    scope = Column(String, nullable=False)  # "fleet", "vendor:{vendor}" or a site ID
+    day = Column(Date, nullable=False)  # Local calendar day of the sites' readings
+    energy_kwh = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index('idx_ledger_scope_day', 'scope', 'day'),
+    )
+    
+    def __repr__(self):
+        return f"<ProductionLedger(scope={self.scope}, day={self.day}, energy_kwh={self.energy_kwh})>"
@@ -0,0 +1,25 @@
+"""
+Quota Bucket Model - Persistent token buckets for vendor API quotas
+"""
+from sqlalchemy import Column, String, Float, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class QuotaBucket(Base):
+    __tablename__ = "quota_buckets"
+    
+    id = Column(String, primary_key=True)  # {vendor}:{scope}:{scope_id}
+    vendor = Column(String, nullable=False, index=True)
+    scope = Column(String, nullable=False)  # vendor, account, site
+    scope_id = Column(String, nullable=False)  # account fingerprint or site ID
+    
+    # Token bucket state
+    capacity = Column(Float, nullable=False)
+    tokens = Column(Float, nullable=False)
+    refill_per_second = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<QuotaBucket(id={self.id}, tokens={self.tokens}/{self.capacity})>"
@@ -0,0 +1,18 @@
+"""
+Record Fingerprint Model - Content hash of the last normalized vendor record written
+"""
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class RecordFingerprint(Base):
+    __tablename__ = "record_fingerprints"
+    
+    id = Column(String, primary_key=True)  # {table}:{record_id}, e.g. sites:se_123
+    content_hash = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RecordFingerprint(id={self.id}, hash={self.content_hash[:8]})>"
@@ -1,7 +1,7 @@
 """
 Site Model
 """
-from sqlalchemy import Column, String, Float, Integer, DateTime, JSON
+from sqlalchemy import Column, String, Float, Integer, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -41,6 +41,10 @@ class Site(Base):
     alerts = relationship("Alert", back_populates="site", cascade="all, delete-orphan")
     metrics = relationship("TimeseriesMetric", back_populates="site", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        Index('idx_site_name_id', 'name', 'id'),  # Keyset pagination sort key
+    )
+    
     def __repr__(self):
         return f"<Site(id={self.id}, name={self.name}, vendor={self.vendor})>"
 
@@ -0,0 +1,119 @@
+"""
+Metric Archive - Compressed per-month files for timeseries past retention
+
+Expired raw points and hourly rollups are appended to gzip CSV files, one
+per kind, site, metric and month:
+
+    {ARCHIVE_DIR}/{kind}/{site_id}/{metric_name}/{YYYY-MM}.csv.gz
+
+Each retention batch is appended as its own gzip member, so files grow
+without being rewritten. A batch interrupted between the archive write and
+the database delete is archived twice; readers keep one value per
+timestamp, so that is harmless.
+"""
+from typing import Any, Dict, List, Tuple
+from collections import defaultdict
+from datetime import datetime
+import csv
+import gzip
+import io
+import os
+import threading
+from loguru import logger
+
+from app.core.config import settings
+
+# Columns after the timestamp, per archive kind
+ARCHIVE_COLUMNS = {
+    "raw": ["value"],
+    "hour": ["value_sum", "value_min", "value_max", "sample_count"],
+}
+
+_lock = threading.Lock()
+
+
+def archive_path(kind: str, site_id: str, metric_name: str, month: datetime) -> str:
+    """File holding one month of archived data"""
+    safe_site_id = site_id.replace(os.sep, "_")
+    return os.path.join(
+        settings.ARCHIVE_DIR, kind, safe_site_id, metric_name, f"{month:%Y-%m}.csv.gz"
+    )
+
+
+def next_month(month: datetime) -> datetime:
+    """First day of the month after `month`"""
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def months_between(start: datetime, end: datetime) -> List[datetime]:
+    """First day of every month overlapping [start, end)"""
+    month = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    months = []
+    while month < end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def append(kind: str, records: List[Tuple[str, str, datetime, Tuple[Any, ...]]]) -> int:
+    """
+    Append records to their monthly archive files
+
+    Args:
+        kind: Archive kind (raw, hour)
+        records: (site_id, metric_name, timestamp, values) tuples, values in
+            ARCHIVE_COLUMNS[kind] order
+
+    Returns:
+        Number of files written
+    """
+    files: Dict[str, List[List[Any]]] = defaultdict(list)
+    for site_id, metric_name, timestamp, values in records:
+        month = timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        files[archive_path(kind, site_id, metric_name, month)].append([timestamp.isoformat(), *values])
+
+    with _lock:
+        for path, lines in files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(sorted(lines))
+            with open(path, "ab") as archive_file:
+                archive_file.write(gzip.compress(buffer.getvalue().encode()))
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+
+    return len(files)
+
+
+def read(
+    kind: str,
+    site_id: str,
+    metric_name: str,
+    start: datetime,
+    end: datetime
+) -> Dict[datetime, List[str]]:
+    """
+    Archived records with start <= timestamp < end
+
+    Returns:
+        Values (as strings, in ARCHIVE_COLUMNS[kind] order) keyed by timestamp
+    """
+    records: Dict[datetime, List[str]] = {}
+
+    with _lock:
+        for month in months_between(start, end):
+            path = archive_path(kind, site_id, metric_name, month)
+            if not os.path.exists(path):
+                continue
+            try:
+                with gzip.open(path, "rt", newline="") as archive_file:
+                    for line in csv.reader(archive_file):
+                        timestamp = datetime.fromisoformat(line[0])
+                        if start <= timestamp < end:
+                            records[timestamp] = line[1:]
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"Could not fully read archive {path}: {e}")
+
+    return records
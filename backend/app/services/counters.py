@@ -0,0 +1,210 @@
+"""
+Counters - Denormalized fleet and per-site totals maintained on write
+
+Dashboard stats and site overviews read a few counter rows instead of
+aggregating sites, devices and alerts per request. Every write that changes
+a counted column stages a delta and applies it in the same transaction:
+
+- Site upserts: fleet site total and totals by status
+- Overview updates: fleet production today
+- Device upserts: per-site total and online device counts
+- Alert status changes: active alerts per site and fleet, and the number
+  of sites with active alerts
+- Any change to a site, its devices or alerts: the site's version and the
+  fleet version, which only ever grow (ETags of the read endpoints)
+
+rebuild_counters() recomputes every counter (except versions) from the
+tables. It runs at startup, so data written before the counters existed
+(or by hand) is counted too.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.bulk import bulk_increment, bulk_upsert, chunked
+from app.core.database import SessionLocal
+from app.models import Alert, Counter, Device, Site
+
+FLEET = "fleet"
+
+# Fleet counters
+SITES = "sites"
+PRODUCTION_TODAY = "production_today_kwh"
+SITES_WITH_ALERTS = "sites_with_alerts"
+
+# Per-site counters (ALERTS_ACTIVE is kept for the fleet too)
+DEVICES = "devices"
+DEVICES_ONLINE = "devices_online"
+ALERTS_ACTIVE = "alerts_active"
+
+# Per-site and fleet change counter
+VERSION = "version"
+
+
+def sites_with_status(status: Optional[str]) -> str:
+    """Fleet counter of sites in a status, e.g. sites.Online"""
+    return f"{SITES}.{status}"
+
+
+def counter_id(scope: str, name: str) -> str:
+    """Deterministic Counter key"""
+    return f"{scope}:{name}"
+
+
+class CounterDeltas:
+    """Counter changes staged by one write, applied in its transaction"""
+
+    def __init__(self):
+        self._deltas: Dict[Tuple[str, str], float] = defaultdict(float)
+
+    def add(self, scope: str, name: str, amount: float) -> None:
+        self._deltas[(scope, name)] += amount
+
+    def touch(self, site_id: str) -> None:
+        """Stage a change to a site's data (bumps its version and the fleet's)"""
+        self.add(site_id, VERSION, 1)
+        self.add(FLEET, VERSION, 1)
+
+    def record_site_upserts(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Stage the fleet deltas of upserting site rows
+
+        Must run before the upsert, since it reads the statuses being
+        replaced.
+        """
+        previous = {}
+        for ids in chunked([row["id"] for row in rows]):
+            previous.update(db.query(Site.id, Site.status).filter(Site.id.in_(ids)))
+
+        for row in rows:
+            if row["id"] in previous:
+                self.add(FLEET, sites_with_status(previous[row["id"]]), -1)
+            else:
+                # Overview metrics of existing sites are not part of a site upsert
+                self.add(FLEET, SITES, 1)
+                self.add(FLEET, PRODUCTION_TODAY, row.get("daily_production_kwh") or 0.0)
+            self.add(FLEET, sites_with_status(row["status"]), 1)
+            self.touch(row["id"])
+
+    def record_device_upserts(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Stage the per-site deltas of upserting device rows
+
+        Must run before the upsert, since it reads the rows being replaced.
+        """
+        previous = {}
+        for ids in chunked([row["id"] for row in rows]):
+            previous.update(
+                (device_id, (site_id, status)) for device_id, site_id, status in
+                db.query(Device.id, Device.site_id, Device.status).filter(Device.id.in_(ids))
+            )
+
+        for row in rows:
+            if row["id"] in previous:
+                site_id, status = previous[row["id"]]
+                self.add(site_id, DEVICES, -1)
+                self.add(site_id, DEVICES_ONLINE, -int(status == "Online"))
+            self.add(row["site_id"], DEVICES, 1)
+            self.add(row["site_id"], DEVICES_ONLINE, int(row["status"] == "Online"))
+            self.touch(row["site_id"])
+
+    def record_production(self, previous_kwh: Optional[float], kwh: Optional[float]) -> None:
+        """Stage a change of one site's production today"""
+        self.add(FLEET, PRODUCTION_TODAY, (kwh or 0.0) - (previous_kwh or 0.0))
+
+    def record_alert_status(self, site_id: str, previous_status: Optional[str], status: str) -> None:
+        """Stage an alert status change (previous_status None for a new alert)"""
+        active = int(status == "Active") - int(previous_status == "Active")
+        self.add(site_id, ALERTS_ACTIVE, active)
+        self.add(FLEET, ALERTS_ACTIVE, active)
+        self.touch(site_id)
+
+    def apply(self, db: Session) -> None:
+        """Add the staged deltas to the stored counters (the caller commits)"""
+        deltas = {key: amount for key, amount in self._deltas.items() if amount}
+        self._deltas.clear()
+        if not deltas:
+            return
+
+        _increment(db, deltas)
+
+        # A site's active alert count crossing zero changes sites_with_alerts
+        alert_deltas = {
+            scope: amount for (scope, name), amount in deltas.items()
+            if name == ALERTS_ACTIVE and scope != FLEET
+        }
+        if alert_deltas:
+            ids = [counter_id(site_id, ALERTS_ACTIVE) for site_id in alert_deltas]
+            active = dict(db.query(Counter.scope, Counter.value).filter(Counter.id.in_(ids)))
+            crossed = sum(
+                int(active.get(site_id, 0) > 0) - int(active.get(site_id, 0) - amount > 0)
+                for site_id, amount in alert_deltas.items()
+            )
+            if crossed:
+                _increment(db, {(FLEET, SITES_WITH_ALERTS): crossed})
+
+
+def _increment(db: Session, deltas: Dict[Tuple[str, str], float]) -> None:
+    bulk_increment(db, Counter, [
+        {"id": counter_id(scope, name), "scope": scope, "name": name, "value": amount}
+        for (scope, name), amount in deltas.items()
+    ], ["value"])
+
+
+async def read_counters(db: AsyncSession, scope: str) -> Dict[str, float]:
+    """Every counter of one scope (FLEET or a site ID), by name"""
+    rows = await db.execute(select(Counter.name, Counter.value).where(Counter.scope == scope))
+    return {name: value for name, value in rows}
+
+
+async def read_version(db: AsyncSession, scope: str) -> int:
+    """Change counter of a site (or FLEET); 0 if never changed"""
+    return int(await db.scalar(select(Counter.value).where(Counter.id == counter_id(scope, VERSION))) or 0)
+
+
+def rebuild_counters() -> int:
+    """
+    Recompute every counter from the sites, devices and alerts tables
+
+    Versions are kept: resetting them could make a stale ETag match again.
+
+    Returns:
+        Number of counters written
+    """
+    db = SessionLocal()
+    try:
+        values: Dict[Tuple[str, str], float] = {
+            (FLEET, SITES): db.query(func.count(Site.id)).scalar() or 0,
+            (FLEET, PRODUCTION_TODAY): db.query(func.sum(Site.daily_production_kwh)).scalar() or 0.0,
+            (FLEET, ALERTS_ACTIVE): db.query(func.count(Alert.id)).filter(Alert.status == "Active").scalar() or 0,
+            (FLEET, SITES_WITH_ALERTS): db.query(func.count(func.distinct(Alert.site_id)))
+                .filter(Alert.status == "Active").scalar() or 0,
+        }
+        for status, count in db.query(Site.status, func.count(Site.id)).group_by(Site.status):
+            values[(FLEET, sites_with_status(status))] = count
+        for site_id, count in db.query(Device.site_id, func.count(Device.id)).group_by(Device.site_id):
+            values[(site_id, DEVICES)] = count
+        for site_id, count in db.query(Device.site_id, func.count(Device.id))\
+                .filter(Device.status == "Online").group_by(Device.site_id):
+            values[(site_id, DEVICES_ONLINE)] = count
+        for site_id, count in db.query(Alert.site_id, func.count(Alert.id))\
+                .filter(Alert.status == "Active").group_by(Alert.site_id):
+            values[(site_id, ALERTS_ACTIVE)] = count
+
+        db.query(Counter).filter(Counter.name != VERSION).delete(synchronize_session=False)
+        bulk_upsert(db, Counter, [
+            {"id": counter_id(scope, name), "scope": scope, "name": name, "value": value}
+            for (scope, name), value in values.items()
+        ])
+        db.commit()
+
+        logger.info(f"🧮 Rebuilt {len(values)} counters")
+        return len(values)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -2,92 +2,225 @@
 Data Service - Orchestrates data fetching and normalization
 """
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
+import hashlib
+import json
+import threading
 import uuid
 
-from app.models import Site, Device, Alert, TimeseriesMetric
-from app.connectors import EnphaseConnector, SolarEdgeConnector, GeneracConnector
+from app.core.bulk import bulk_upsert, chunked
+from app.core.config import settings
+from app.models import Site, Device, Alert, TimeseriesMetric, RecordFingerprint, MetricWatermark
+from app.connectors import connector_registry
+from app.services.counters import CounterDeltas
+from app.services.event_bus import DEVICE_EVENT, SITE_EVENT, event_bus
+from app.services.fetch_tracker import FetchTracker
+from app.services.metric_writer import metric_writer
+from app.services.power_flow_cache import power_flow_cache
+from app.services.production_ledger import LedgerReadings, reading_day
+from app.services.result_cache import STATS, invalidate
 from loguru import logger
 
+# Site columns a vendor site listing is authoritative for
+SITE_LISTING_COLUMNS = [
+    "vendor",
+    "vendor_site_id",
+    "name",
+    "status",
+    "peak_power_kw",
+    "address_json",
+    "latitude",
+    "longitude",
+    "last_updated",
+]
+
+# Status of sites their account no longer lists: kept, with their history,
+# but no longer polled (a later listing that includes them restores them)
+REMOVED_STATUS = "Removed"
+
+# Bookkeeping columns left out of record fingerprints
+UNHASHED_COLUMNS = {"created_at", "last_updated", "last_reported"}
+
+
+def fingerprint(row: Dict[str, Any], columns: Optional[List[str]] = None) -> str:
+    """Content hash of a normalized row (timestamps excluded)"""
+    columns = columns or list(row)
+    payload = {column: row[column] for column in columns if column not in UNHASHED_COLUMNS}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def metric_point_id(site_id: str, metric_name: str, timestamp: datetime) -> str:
+    """Deterministic TimeseriesMetric key, so re-ingesting a point overwrites it"""
+    return f"{site_id}:{metric_name}:{timestamp.isoformat()}"
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a vendor timestamp into a naive datetime (aware values become UTC)"""
+    if isinstance(value, datetime):
+        timestamp = value
+    elif isinstance(value, str) and value:
+        try:
+            timestamp = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def site_listing_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Event delta of an upserted site listing (API field names)"""
+    event = {"id": row["id"]}
+    for column in SITE_LISTING_COLUMNS:
+        event["address" if column == "address_json" else column] = row[column]
+    return event
+
+
+def site_overview_event(site: Site) -> Dict[str, Any]:
+    """Event delta of a site's updated overview metrics"""
+    return {
+        "id": site.id,
+        "current_power_kw": site.current_power_kw,
+        "daily_production_kwh": site.daily_production_kwh,
+        "lifetime_energy_mwh": site.lifetime_energy_mwh,
+        "last_updated": site.last_updated
+    }
+
+
+def device_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Event delta of an upserted device"""
+    return {column: value for column, value in row.items() if column != "created_at"}
+
+
+class WriteStats:
+    """Changed/unchanged record counts, accumulated until the next poll cycle reports them"""
+    
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, kind: str, changed: int, unchanged: int) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(kind, {"changed": 0, "unchanged": 0})
+            counts["changed"] += changed
+            counts["unchanged"] += unchanged
+    
+    def snapshot(self, reset: bool = False) -> Dict[str, Dict[str, int]]:
+        """Counts per record kind, optionally starting a new cycle"""
+        with self._lock:
+            counts = {kind: dict(value) for kind, value in self._counts.items()}
+            if reset:
+                self._counts.clear()
+            return counts
+
+
+write_stats = WriteStats()
+
 
 class DataService:
     """Service for fetching and normalizing vendor data"""
     
     def __init__(self, db: Session):
         self.db = db
+        self.fetch_tracker = FetchTracker(db)
     
-    def fetch_all_sites(self, vendor: str, api_key: str) -> List[Site]:
+    def fetch_all_sites(self, vendor: str, api_key: str, force: bool = False) -> List[Site]:
         """
         Fetch all sites from a vendor and store in database
         
         Args:
             vendor: Vendor name (SolarEdge, Enphase, Generac)
             api_key: API key or account ID (for Generac, use account ID)
+            force: Fetch even if the site list is still within its TTL
         """
+        if not force and self.fetch_tracker.is_fresh(vendor, None, "sites"):
+            return self.db.query(Site).filter(Site.vendor == vendor).all()
+        
+        if self.fetch_tracker.is_cooling_down(vendor, None, "sites"):
+            return []
+        
         try:
-            if vendor == "SolarEdge":
-                connector = SolarEdgeConnector(api_key)
-                raw_sites = connector.get_sites()
-            elif vendor == "Enphase":
-                connector = EnphaseConnector(api_key)
-                raw_sites = connector.get_sites()
-            elif vendor == "Generac":
-                connector = GeneracConnector(api_key)  # api_key is account_id for Generac
-                raw_sites = connector.get_sites()
-            else:
+            # For Generac the api_key is the encoded OAuth credentials
+            connector = connector_registry.get(vendor, api_key)
+            if connector is None:
                 logger.warning(f"Unsupported vendor: {vendor}")
                 return []
             
-            sites = []
-            for raw_site in raw_sites:
-                site = self._normalize_site(raw_site)
-                sites.append(site)
-                
-                # Upsert to database
-                existing = self.db.query(Site).filter(Site.id == site.id).first()
-                if existing:
-                    for key, value in site.__dict__.items():
-                        if not key.startswith('_'):
-                            setattr(existing, key, value)
-                else:
-                    self.db.add(site)
+            raw_sites = connector.get_sites()
             
+            rows = [self._normalize_site(raw_site) for raw_site in raw_sites]
+            
+            # Set-based upsert of the sites whose listing changed; overview
+            # metrics are owned by the overview fetch, so a site listing
+            # must not reset them on existing rows
+            changed = self._changed_rows("sites", rows, SITE_LISTING_COLUMNS)
+            counters = CounterDeltas()
+            counters.record_site_upserts(self.db, changed)
+            bulk_upsert(self.db, Site, changed, update_columns=SITE_LISTING_COLUMNS)
+            # An empty listing is more likely a vendor glitch than an empty account
+            removed = self._prune_sites(vendor, rows, counters) if rows else []
+            counters.apply(self.db)
             self.db.commit()
-            connector.close()
+            if changed or removed:
+                invalidate(STATS)
+                event_bus.publish(SITE_EVENT, [site_listing_event(row) for row in changed] + removed)
+            
+            sites = [Site(**row) for row in rows]
+            self.fetch_tracker.record_success(vendor, None, "sites")
             
             logger.info(f"✅ Fetched {len(sites)} sites from {vendor}")
             return sites
             
         except Exception as e:
             logger.error(f"Failed to fetch sites from {vendor}: {e}")
+            self.fetch_tracker.record_failure(vendor, None, "sites", e)
             return []
     
-    def fetch_site_overview(self, site_id: str, vendor: str, api_key: str) -> Optional[Site]:
+    def fetch_site_overview(
+        self, 
+        site_id: str, 
+        vendor: str, 
+        api_key: str, 
+        force: bool = False
+    ) -> Optional[Site]:
         """
         Fetch site overview and update database
         
         For SolarEdge, we fetch both overview (for energy totals) and 
-        power flow (for real-time PV/battery/load data)
+        power flow (for real-time PV/battery/load data). Power flow is
+        only re-fetched once its own TTL has passed.
         """
+        if not force and self.fetch_tracker.is_fresh(vendor, site_id, "overview"):
+            return self.db.query(Site).filter(Site.id == site_id).first()
+        
+        if self.fetch_tracker.is_cooling_down(vendor, site_id, "overview"):
+            return None
+        
         try:
+            connector = connector_registry.get(vendor, api_key)
+            
             if vendor == "SolarEdge":
-                connector = SolarEdgeConnector(api_key)
                 overview = connector.get_site_overview(site_id)
                 
                 # Get real-time power flow data - this is the KEY to accurate current power
-                power_flow = connector.get_power_flow(site_id)
+                # (a reading cached for the site page is reused for free)
+                power_flow = power_flow_cache.peek(site_id)
+                if power_flow is None and not self.fetch_tracker.is_fresh(vendor, site_id, "power_flow"):
+                    power_flow = self.fetch_power_flow(site_id, vendor, api_key)
                 
                 # Use PV power from power flow as the actual current production
                 # This is what you see in the monitoring app (panels producing 0.4 kW, etc.)
-                overview['current_power_kw'] = power_flow.get('pv_power_kw', overview.get('current_power_kw', 0))
+                if power_flow:
+                    overview['current_power_kw'] = power_flow.get('pv_power_kw', overview.get('current_power_kw', 0))
                 
             elif vendor == "Enphase":
-                connector = EnphaseConnector(api_key)
                 # Enphase doesn't have a direct overview endpoint
                 overview = {}
             elif vendor == "Generac":
-                connector = GeneracConnector(api_key)
                 overview = connector.get_site_overview(site_id)
             else:
                 return None
@@ -95,90 +228,397 @@ class DataService:
             # Update site in database
             site = self.db.query(Site).filter(Site.id == site_id).first()
             if site:
-                site.current_power_kw = overview.get('current_power_kw', site.current_power_kw)
-                site.daily_production_kwh = overview.get('daily_energy_kwh', site.daily_production_kwh)
-                site.lifetime_energy_mwh = overview.get('lifetime_energy_mwh', site.lifetime_energy_mwh)
-                site.last_updated = datetime.utcnow()
+                counters, ledger = CounterDeltas(), LedgerReadings()
+                changed = self._apply_overview(site, overview, counters, ledger)
+                write_stats.record("overviews", int(changed), int(not changed))
+                counters.apply(self.db)
+                ledger.apply(self.db)
                 self.db.commit()
+                if changed:
+                    invalidate(STATS)
+                    event_bus.publish(SITE_EVENT, [site_overview_event(site)])
             
-            connector.close()
+            self.fetch_tracker.record_success(vendor, site_id, "overview")
             return site
             
         except Exception as e:
             logger.error(f"Failed to fetch overview for {site_id}: {e}")
+            self.fetch_tracker.record_failure(vendor, site_id, "overview", e)
             return None
     
-    def fetch_site_devices(self, site_id: str, vendor: str, api_key: str) -> List[Device]:
+    def fetch_sites_overview(
+        self, 
+        site_ids: List[str], 
+        vendor: str, 
+        api_key: str, 
+        force: bool = False
+    ) -> List[Site]:
+        """
+        Fetch overviews for many sites of one account using bulk requests
+        
+        Sites are grouped into batches of the connector's bulk limit (100
+        for SolarEdge), turning N overview calls into ceil(N/100). Live
+        power flow has no bulk endpoint, so it is left to on-demand fetches
+        here to keep large accounts inside the daily account quota.
+        Vendors without a bulk endpoint fall back to per-site fetches.
+        """
+        connector = connector_registry.get(vendor, api_key)
+        if connector is None:
+            return []
+        
+        if connector.overview_batch_size <= 1:
+            sites = [self.fetch_site_overview(site_id, vendor, api_key, force) for site_id in site_ids]
+            return [site for site in sites if site]
+        
+        due = [
+            site_id for site_id in site_ids
+            if (force or not self.fetch_tracker.is_fresh(vendor, site_id, "overview"))
+            and not self.fetch_tracker.is_cooling_down(vendor, site_id, "overview")
+        ]
+        
+        updated = []
+        batch_size = connector.overview_batch_size
+        for start in range(0, len(due), batch_size):
+            batch = due[start:start + batch_size]
+            try:
+                overviews = connector.get_sites_overview(batch)
+                
+                sites = self.db.query(Site).filter(Site.id.in_(list(overviews))).all()
+                counters, ledger = CounterDeltas(), LedgerReadings()
+                changed = [
+                    site for site in sites
+                    if self._apply_overview(site, overviews[site.id], counters, ledger)
+                ]
+                write_stats.record("overviews", len(changed), len(sites) - len(changed))
+                counters.apply(self.db)
+                ledger.apply(self.db)
+                self.db.commit()
+                if changed:
+                    invalidate(STATS)
+                    event_bus.publish(SITE_EVENT, [site_overview_event(site) for site in changed])
+                
+                self.fetch_tracker.record_batch_success(vendor, list(overviews), "overview")
+                missing = [site_id for site_id in batch if site_id not in overviews]
+                if missing:
+                    logger.warning(f"⚠️  {len(missing)} {vendor} sites missing from the bulk overview")
+                    self.fetch_tracker.record_batch_no_data(vendor, missing, "overview")
+                updated.extend(sites)
+                logger.info(f"✅ Fetched {len(overviews)} {vendor} overviews in one request")
+                
+            except Exception as e:
+                logger.error(f"Failed to fetch bulk overview for {len(batch)} {vendor} sites: {e}")
+                self.fetch_tracker.record_batch_failure(vendor, batch, "overview", e)
+        
+        return updated
+    
+    def fetch_power_flow(self, site_id: str, vendor: str, api_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch real-time power flow (SolarEdge only)
+        
+        Returns None when the vendor has no power flow endpoint, the
+        resource is cooling down after a rate limit, or the call failed
+        (including an answer without a reading), so callers never mistake
+        a failure for zero production.
+        
+        Readings come from the shared power_flow_cache: reused for the
+        vendor's refresh rate, with concurrent callers for one site sharing
+        a single upstream request.
+        """
+        if vendor != "SolarEdge":
+            return None
+        
+        return power_flow_cache.get(site_id, lambda: self._fetch_power_flow(site_id, vendor, api_key))
+    
+    def _fetch_power_flow(self, site_id: str, vendor: str, api_key: str) -> Optional[Dict[str, Any]]:
+        """Upstream power flow call (the cache's single flight for the site)"""
+        if self.fetch_tracker.is_cooling_down(vendor, site_id, "power_flow"):
+            return None
+        
+        try:
+            power_flow = connector_registry.get(vendor, api_key).get_power_flow(site_id)
+            if not power_flow or not power_flow.get("last_update"):
+                raise ValueError("No power flow reading returned")
+            self.fetch_tracker.record_success(vendor, site_id, "power_flow")
+            return power_flow
+        except Exception as e:
+            logger.warning(f"Failed to fetch power flow for {site_id}: {e}")
+            self.fetch_tracker.record_failure(vendor, site_id, "power_flow", e)
+            return None
+    
+    def fetch_site_devices(
+        self, 
+        site_id: str, 
+        vendor: str, 
+        api_key: str, 
+        force: bool = False
+    ) -> List[Device]:
         """
         Fetch devices for a site and update database
+        
+        Inventory rarely changes, so this is a no-op returning the stored
+        devices until INVENTORY_TTL_MINUTES has passed (unless forced).
         """
+        if not force and self.fetch_tracker.is_fresh(vendor, site_id, "devices"):
+            return self.db.query(Device).filter(Device.site_id == site_id).all()
+        
+        if self.fetch_tracker.is_cooling_down(vendor, site_id, "devices"):
+            return []
+        
         try:
-            if vendor == "SolarEdge":
-                connector = SolarEdgeConnector(api_key)
-                raw_devices = connector.get_devices(site_id)
-            elif vendor == "Enphase":
-                connector = EnphaseConnector(api_key)
-                raw_devices = connector.get_devices(site_id)
-            elif vendor == "Generac":
-                connector = GeneracConnector(api_key)
-                raw_devices = connector.get_devices(site_id)
-            else:
+            connector = connector_registry.get(vendor, api_key)
+            if connector is None:
                 return []
             
-            devices = []
-            for raw_device in raw_devices:
-                device = self._normalize_device(raw_device, site_id, vendor)
-                devices.append(device)
-                
-                # Upsert to database
-                existing = self.db.query(Device).filter(Device.id == device.id).first()
-                if existing:
-                    for key, value in device.__dict__.items():
-                        if not key.startswith('_'):
-                            setattr(existing, key, value)
-                else:
-                    self.db.add(device)
+            raw_devices = connector.get_devices(site_id)
+            
+            rows = [self._normalize_device(raw_device, site_id, vendor) for raw_device in raw_devices]
             
+            changed = self._changed_rows("devices", rows)
+            counters = CounterDeltas()
+            counters.record_device_upserts(self.db, changed)
+            bulk_upsert(self.db, Device, changed)
+            counters.apply(self.db)
             self.db.commit()
-            connector.close()
+            event_bus.publish(DEVICE_EVENT, [device_event(row) for row in changed])
+            
+            devices = [Device(**row) for row in rows]
+            self.fetch_tracker.record_success(vendor, site_id, "devices")
             
             logger.info(f"✅ Fetched {len(devices)} devices for site {site_id}")
             return devices
             
         except Exception as e:
             logger.error(f"Failed to fetch devices for {site_id}: {e}")
+            self.fetch_tracker.record_failure(vendor, site_id, "devices", e)
             return []
     
-    def _normalize_site(self, raw_site: Dict[str, Any]) -> Site:
-        """Normalize vendor site data to our schema"""
-        return Site(
-            id=raw_site.get('id', str(uuid.uuid4())),
-            vendor=raw_site.get('vendor', 'Unknown'),
-            vendor_site_id=raw_site.get('vendor_site_id', ''),
-            name=raw_site.get('name', 'Unknown Site'),
-            status=raw_site.get('status', 'Unknown'),
-            peak_power_kw=raw_site.get('peak_power_kw', 0.0),
-            current_power_kw=raw_site.get('current_power_kw', 0.0),
-            daily_production_kwh=raw_site.get('daily_production_kwh', 0.0),
-            health_score=raw_site.get('health_score', 100),
-            address_json=raw_site.get('address', {}),
-            latitude=raw_site.get('latitude'),
-            longitude=raw_site.get('longitude'),
-            last_updated=datetime.utcnow()
+    def fetch_site_energy(
+        self, 
+        site_id: str, 
+        vendor: str, 
+        api_key: str, 
+        force: bool = False
+    ) -> int:
+        """
+        Ingest energy intervals newer than the site's high-water mark
+        
+        The first ingestion backfills ENERGY_BACKFILL_DAYS. Ranges are split
+        into the connector's energy_window (one request each). Points go to
+        the write-behind metric_writer, each window followed by its
+        watermark, so an interrupted backfill resumes where it stopped. The
+        last stored interval is re-fetched because vendors report the
+        current interval while it is still filling; points are upserted on
+        (site_id, metric_name, timestamp), so that is idempotent.
+        
+        Returns:
+            Number of points queued for writing
+        """
+        if not force and self.fetch_tracker.is_fresh(vendor, site_id, "energy"):
+            return 0
+        
+        if self.fetch_tracker.is_cooling_down(vendor, site_id, "energy"):
+            return 0
+        
+        connector = connector_registry.get(vendor, api_key)
+        if connector is None:
+            return 0
+        
+        metric_name = "energy"
+        watermark = self.db.get(MetricWatermark, f"{site_id}:{metric_name}")
+        
+        # Vendors report intervals in site-local time, which can run up to
+        # 14 hours ahead of UTC; intervals not yet reported come back empty
+        end = datetime.utcnow() + timedelta(hours=14)
+        start = (
+            watermark.high_water_mark if watermark
+            else datetime.utcnow() - timedelta(days=settings.ENERGY_BACKFILL_DAYS)
         )
+        
+        options = {}
+        if connector.energy_time_unit:
+            options["time_unit"] = connector.energy_time_unit
+        
+        written = 0
+        try:
+            while start < end:
+                window_end = min(start + connector.energy_window, end)
+                points = connector.get_site_energy(site_id, start, window_end, **options)
+                
+                rows = []
+                for point in points:
+                    timestamp = parse_timestamp(point.get("timestamp"))
+                    if timestamp is None or point.get("value") is None:
+                        continue
+                    rows.append({
+                        "id": metric_point_id(site_id, metric_name, timestamp),
+                        "site_id": site_id,
+                        "device_id": None,
+                        "timestamp": timestamp,
+                        "metric_name": metric_name,
+                        "value": point["value"],
+                        "unit": point.get("unit", "kWh")
+                    })
+                
+                # A closed window the vendor answered with no data is skipped
+                # for good (a failed request raises and stops the loop); the
+                # open window only advances as far as the newest point
+                mark = max((row["timestamp"] for row in rows), default=None)
+                if window_end < end:
+                    mark = max(mark or window_end, window_end)
+                
+                metric_writer.submit(rows, (site_id, metric_name, start, mark) if mark else None)
+                written += len(rows)
+                start = window_end
+            
+            self.fetch_tracker.record_success(vendor, site_id, "energy")
+            if written:
+                logger.info(f"✅ Queued {written} energy points for site {site_id}")
+            return written
+            
+        except Exception as e:
+            logger.error(f"Failed to ingest energy for {site_id}: {e}")
+            self.fetch_tracker.record_failure(vendor, site_id, "energy", e)
+            return written
     
-    def _normalize_device(self, raw_device: Dict[str, Any], site_id: str, vendor: str) -> Device:
-        """Normalize vendor device data to our schema"""
-        return Device(
-            id=raw_device.get('id', str(uuid.uuid4())),
-            site_id=site_id,
-            vendor=vendor,
-            vendor_device_id=raw_device.get('vendor_device_id', ''),
-            device_type=raw_device.get('device_type', 'unknown'),
-            model=raw_device.get('model'),
-            manufacturer=raw_device.get('manufacturer'),
-            serial_number=raw_device.get('serial_number'),
-            status=raw_device.get('status', 'Unknown'),
-            last_reported=datetime.utcnow()
-        )
+    def _prune_sites(
+        self, 
+        vendor: str, 
+        rows: List[Dict[str, Any]], 
+        counters: CounterDeltas
+    ) -> List[Dict[str, Any]]:
+        """
+        Mark the vendor's sites missing from its listing as removed
+        
+        Stages the status change in counters and drops the sites' listing
+        fingerprints, so a site that comes back is written in full.
+        Returns the event deltas of the sites marked.
+        """
+        listed = {row["id"] for row in rows}
+        gone = [
+            site_id for (site_id,) in self.db.query(Site.id).filter(
+                Site.vendor == vendor, Site.status != REMOVED_STATUS
+            )
+            if site_id not in listed
+        ]
+        if not gone:
+            return []
+        
+        now = datetime.utcnow()
+        removed = [{"id": site_id, "status": REMOVED_STATUS, "last_updated": now} for site_id in gone]
+        counters.record_site_upserts(self.db, removed)
+        for ids in chunked(gone):
+            self.db.query(Site).filter(Site.id.in_(ids)).update(
+                {Site.status: REMOVED_STATUS, Site.last_updated: now}, synchronize_session=False
+            )
+            self.db.query(RecordFingerprint).filter(
+                RecordFingerprint.id.in_([f"sites:{site_id}" for site_id in ids])
+            ).delete(synchronize_session=False)
+        
+        logger.info(f"🗑️  {len(gone)} {vendor} sites no longer listed, marked {REMOVED_STATUS}")
+        return removed
+    
+    def _changed_rows(
+        self, 
+        kind: str, 
+        rows: List[Dict[str, Any]], 
+        columns: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter normalized rows down to the ones whose content changed
+        
+        Compares each row's fingerprint with the one stored for the last
+        write (one IN query per chunk) and stages the new fingerprints in
+        the caller's transaction, so they only persist with the data.
+        """
+        hashes = {f"{kind}:{row['id']}": fingerprint(row, columns) for row in rows}
+        
+        stored = {}
+        for ids in chunked(list(hashes)):
+            stored.update(
+                self.db.query(RecordFingerprint.id, RecordFingerprint.content_hash)
+                .filter(RecordFingerprint.id.in_(ids))
+            )
+        
+        now = datetime.utcnow()
+        changed, fingerprints = [], []
+        for row in rows:
+            key = f"{kind}:{row['id']}"
+            if stored.get(key) != hashes[key]:
+                changed.append(row)
+                fingerprints.append({"id": key, "content_hash": hashes[key], "updated_at": now})
+        
+        bulk_upsert(self.db, RecordFingerprint, fingerprints)
+        
+        write_stats.record(kind, len(changed), len(rows) - len(changed))
+        if len(changed) < len(rows):
+            logger.debug(f"Skipped {len(rows) - len(changed)}/{len(rows)} unchanged {kind}")
+        return changed
+    
+    def _apply_overview(
+        self, 
+        site: Site, 
+        overview: Dict[str, Any], 
+        counters: CounterDeltas, 
+        ledger: LedgerReadings
+    ) -> bool:
+        """
+        Copy normalized overview metrics onto a site row
+        
+        Stages the production change in counters and the production so far
+        on the site's local day in the ledger. Returns False (and leaves
+        last_updated alone) when nothing changed.
+        """
+        values = {
+            "current_power_kw": overview.get('current_power_kw', site.current_power_kw),
+            "daily_production_kwh": overview.get('daily_energy_kwh', site.daily_production_kwh),
+            "lifetime_energy_mwh": overview.get('lifetime_energy_mwh', site.lifetime_energy_mwh),
+        }
+        if all(getattr(site, column) == value for column, value in values.items()):
+            return False
+        
+        counters.record_production(site.daily_production_kwh, values["daily_production_kwh"])
+        counters.touch(site.id)
+        ledger.record(site.id, site.vendor, reading_day(overview), values["daily_production_kwh"])
+        for column, value in values.items():
+            setattr(site, column, value)
+        site.last_updated = datetime.utcnow()
+        return True
+    
+    def _normalize_site(self, raw_site: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize vendor site data to a row of our schema"""
+        now = datetime.utcnow()
+        return {
+            "id": raw_site.get('id', str(uuid.uuid4())),
+            "vendor": raw_site.get('vendor', 'Unknown'),
+            "vendor_site_id": raw_site.get('vendor_site_id', ''),
+            "name": raw_site.get('name', 'Unknown Site'),
+            "status": raw_site.get('status', 'Unknown'),
+            "peak_power_kw": raw_site.get('peak_power_kw', 0.0),
+            "current_power_kw": raw_site.get('current_power_kw', 0.0),
+            "daily_production_kwh": raw_site.get('daily_production_kwh', 0.0),
+            "lifetime_energy_mwh": raw_site.get('lifetime_energy_mwh', 0.0),
+            "health_score": raw_site.get('health_score', 100),
+            "address_json": raw_site.get('address', {}),
+            "latitude": raw_site.get('latitude'),
+            "longitude": raw_site.get('longitude'),
+            "created_at": now,
+            "last_updated": now
+        }
+    
+    def _normalize_device(self, raw_device: Dict[str, Any], site_id: str, vendor: str) -> Dict[str, Any]:
+        """Normalize vendor device data to a row of our schema"""
+        now = datetime.utcnow()
+        return {
+            "id": raw_device.get('id', str(uuid.uuid4())),
+            "site_id": site_id,
+            "vendor": vendor,
+            "vendor_device_id": raw_device.get('vendor_device_id', ''),
+            "device_type": raw_device.get('device_type', 'unknown'),
+            "model": raw_device.get('model'),
+            "manufacturer": raw_device.get('manufacturer'),
+            "serial_number": raw_device.get('serial_number'),
+            "status": raw_device.get('status', 'Unknown'),
+            "created_at": now,
+            "last_reported": now
+        }
 
@@ -0,0 +1,128 @@
+"""
+Event Bus - Change events for the /api/events Server-Sent Events stream
+
+Writers publish small deltas after they commit (changed site, device and
+alert fields, never whole lists), so clients update in place instead of
+re-downloading lists on a timer. Event kinds:
+
+- sites: site listing or overview fields that changed
+- devices: device rows that changed
+- alerts: alert status changes
+
+Events get increasing IDs of the form "<epoch>-<sequence>" and the last
+EVENTS_BUFFER_SIZE are kept. A reconnecting client sends the last ID it
+saw (Last-Event-ID) and gets every event after it replayed. If that ID is
+no longer buffered, or is from before a restart (another epoch), the
+client gets a reset event and must reload its data.
+
+Writers run on poller and threadpool threads; streams run on the event
+loop. Publishing only appends under a lock and wakes each subscriber with
+call_soon_threadsafe, so a slow client never blocks a writer.
+
+The bus is per process: a stream only sees writes made in its own worker.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from collections import deque
+from datetime import date, datetime
+import asyncio
+import json
+import threading
+import time
+
+from app.core.config import settings
+
+# Event kinds
+SITE_EVENT = "sites"
+DEVICE_EVENT = "devices"
+ALERT_EVENT = "alerts"
+RESET_EVENT = "reset"
+
+
+class Event(NamedTuple):
+    sequence: int
+    kind: str
+    data: str  # JSON
+
+
+class Subscription:
+    """One stream's wake-up signal, set from any thread"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.wake = asyncio.Event()
+
+    def notify(self) -> None:
+        self.loop.call_soon_threadsafe(self.wake.set)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class EventBus:
+    """Buffered change events with thread-safe publishing"""
+
+    def __init__(self):
+        self.epoch = str(int(time.time()))
+        self._events: deque = deque(maxlen=settings.EVENTS_BUFFER_SIZE)
+        self._sequence = 0
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.epoch}-{sequence}"
+
+    def publish(self, kind: str, changes: List[Dict[str, Any]]) -> None:
+        """Publish a batch of deltas (call after the write commits)"""
+        if not changes:
+            return
+
+        data = json.dumps(changes, default=_json_default)
+        with self._lock:
+            self._sequence += 1
+            self._events.append(Event(self._sequence, kind, data))
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            try:
+                subscription.notify()
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                self.unsubscribe(subscription)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def head(self) -> int:
+        """Sequence of the latest event (0 before the first)"""
+        with self._lock:
+            return self._sequence
+
+    def parse_id(self, event_id: Optional[str]) -> Optional[int]:
+        """Sequence of an event ID from this epoch, else None"""
+        epoch, _, sequence = (event_id or "").partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def since(self, sequence: int) -> Optional[List[Event]]:
+        """Events after a sequence, or None if some have left the buffer"""
+        with self._lock:
+            if sequence > self._sequence:
+                return None
+            oldest = self._events[0].sequence if self._events else self._sequence + 1
+            if sequence < oldest - 1:
+                return None
+            return [event for event in self._events if event.sequence > sequence]
+
+
+event_bus = EventBus()
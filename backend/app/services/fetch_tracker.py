@@ -0,0 +1,180 @@
+"""
+Fetch Tracker - Records every vendor fetch attempt in FetchLog
+
+Keeps one FetchLog row per (vendor, site, resource) with the outcome of the
+latest attempt and, after a 429, an exhausted quota or a bulk response that
+left the site out, the time until which that resource must not be requested
+again.
+
+Other errors (bad credentials, a 404, a timeout) set no cooldown, so a
+manual fetch can retry right away. The poller backs off instead: retry_after
+holds a delay that starts at ERROR_BACKOFF_SECONDS and doubles with every
+consecutive error, up to ERROR_BACKOFF_MAX_SECONDS.
+"""
+from typing import List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.config import settings
+from app.connectors.base import RateLimitError
+from app.models import FetchLog
+from app.services.quota import QuotaExceededError
+from app.services.resources import resource_classes
+
+
+class FetchTracker:
+    """Reads and writes per-resource fetch state"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def log_id(vendor: str, site_id: Optional[str], resource: str) -> str:
+        """Deterministic FetchLog primary key for a resource"""
+        return f"{vendor}:{site_id or '*'}:{resource}"
+
+    def get(self, vendor: str, site_id: Optional[str], resource: str) -> Optional[FetchLog]:
+        """Current fetch state for a resource, if it was ever fetched"""
+        return self.db.get(FetchLog, self.log_id(vendor, site_id, resource))
+
+    def cooldown_until(self, vendor: str, site_id: Optional[str], resource: str) -> Optional[datetime]:
+        """End of the active cooldown for a resource, or None if it may be fetched"""
+        log = self.get(vendor, site_id, resource)
+        if log and log.cooldown_until and log.cooldown_until > datetime.utcnow():
+            return log.cooldown_until
+        return None
+
+    def is_cooling_down(self, vendor: str, site_id: Optional[str], resource: str) -> bool:
+        """True while a resource is inside a rate-limit penalty window"""
+        until = self.cooldown_until(vendor, site_id, resource)
+        if until:
+            logger.info(f"⏸️  Skipping {vendor} {resource} for {site_id or 'account'} (cooling down until {until})")
+            return True
+        return False
+
+    def is_fresh(self, vendor: str, site_id: Optional[str], resource: str) -> bool:
+        """True while the last successful fetch is younger than the resource TTL"""
+        log = self.get(vendor, site_id, resource)
+        if not log or not log.last_success_at:
+            return False
+        ttl = timedelta(minutes=resource_classes()[resource].ttl_minutes)
+        return datetime.utcnow() - log.last_success_at < ttl
+
+    @staticmethod
+    def backoff_until(
+        last_status: Optional[str],
+        last_attempt_at: Optional[datetime],
+        retry_after: Optional[int]
+    ) -> Optional[datetime]:
+        """End of the poller's back-off after consecutive errors, if any"""
+        if last_status != "error" or not last_attempt_at or not retry_after:
+            return None
+        return last_attempt_at + timedelta(seconds=retry_after)
+
+    def record_success(self, vendor: str, site_id: Optional[str], resource: str) -> None:
+        """Record a successful fetch and clear any cooldown"""
+        self.record_batch_success(vendor, [site_id], resource)
+
+    def record_batch_success(
+        self,
+        vendor: str,
+        site_ids: List[Optional[str]],
+        resource: str
+    ) -> None:
+        """Record a successful fetch for several sites in one transaction"""
+        now = datetime.utcnow()
+        for site_id in site_ids:
+            log = self._get_or_create(vendor, site_id, resource)
+            log.last_attempt_at = now
+            log.last_success_at = now
+            log.last_status = "success"
+            log.error_message = None
+            log.cooldown_until = None
+            log.retry_after = None
+        self.db.commit()
+
+    def record_failure(
+        self,
+        vendor: str,
+        site_id: Optional[str],
+        resource: str,
+        error: Exception
+    ) -> None:
+        """
+        Record a failed fetch
+
+        Rate-limit and quota errors put the resource into cooldown for the
+        vendor's Retry-After (or RATE_LIMIT_COOLDOWN_SECONDS when absent).
+        Other errors grow the poller's back-off (see backoff_until).
+        """
+        self.record_batch_failure(vendor, [site_id], resource, error)
+
+    def record_batch_failure(
+        self,
+        vendor: str,
+        site_ids: List[Optional[str]],
+        resource: str,
+        error: Exception
+    ) -> None:
+        """Record a failed fetch for several sites in one transaction"""
+        # Discard whatever the failed fetch left half-written
+        self.db.rollback()
+
+        now = datetime.utcnow()
+        for site_id in site_ids:
+            log = self._get_or_create(vendor, site_id, resource)
+            log.last_attempt_at = now
+            log.error_message = str(error)[:500]
+
+            if isinstance(error, (RateLimitError, QuotaExceededError)):
+                retry_after = error.retry_after
+                if retry_after is None:
+                    retry_after = settings.RATE_LIMIT_COOLDOWN_SECONDS
+                log.last_status = "rate_limited" if isinstance(error, RateLimitError) else "quota_exhausted"
+                log.retry_after = retry_after
+                log.cooldown_until = now + timedelta(seconds=retry_after)
+            else:
+                previous = log.retry_after if log.last_status == "error" else None
+                log.retry_after = (
+                    min(previous * 2, settings.ERROR_BACKOFF_MAX_SECONDS) if previous
+                    else settings.ERROR_BACKOFF_SECONDS
+                )
+                log.last_status = "error"
+
+        self.db.commit()
+
+    def record_batch_no_data(
+        self,
+        vendor: str,
+        site_ids: List[Optional[str]],
+        resource: str
+    ) -> None:
+        """
+        Record sites a bulk fetch returned nothing for
+
+        They are held back for NO_DATA_COOLDOWN_MINUTES instead of being
+        requested again on every tick.
+        """
+        now = datetime.utcnow()
+        cooldown = timedelta(minutes=settings.NO_DATA_COOLDOWN_MINUTES)
+        for site_id in site_ids:
+            log = self._get_or_create(vendor, site_id, resource)
+            log.last_attempt_at = now
+            log.last_status = "no_data"
+            log.error_message = f"Missing from the bulk {resource} response"
+            log.retry_after = int(cooldown.total_seconds())
+            log.cooldown_until = now + cooldown
+        self.db.commit()
+
+    def _get_or_create(self, vendor: str, site_id: Optional[str], resource: str) -> FetchLog:
+        log = self.get(vendor, site_id, resource)
+        if log is None:
+            log = FetchLog(
+                id=self.log_id(vendor, site_id, resource),
+                vendor=vendor,
+                site_id=site_id,
+                resource=resource
+            )
+            self.db.add(log)
+        return log
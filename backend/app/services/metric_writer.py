@@ -0,0 +1,264 @@
+"""
+Metric Writer - Write-behind buffer for timeseries points
+
+Pollers hand their points to one process-wide queue instead of writing
+through their own session. A background thread drains the queue and
+writes it in large single-transaction batches, flushing whenever
+METRIC_FLUSH_BATCH_SIZE points are waiting or METRIC_FLUSH_INTERVAL_SECONDS
+have passed. The queue is bounded: when the writer falls behind, pollers
+block on submit until there is room again (backpressure).
+
+High-water marks travel through the same queue behind their points, so a
+watermark is only committed once every point before it has been written.
+Rollups of the touched buckets are refreshed in the same transaction, and
+the cached energy series of the touched sites are invalidated after it.
+
+When a flush fails, its points are lost, and later batches must not move
+the (site, metric) watermark past them: the lost range is held, watermarks
+are capped at its start (so the next ingestion fetches it again), and the
+hold shrinks as windows submitted after the failure rewrite it.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import queue
+import threading
+import time
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import MetricWatermark
+from app.services.result_cache import energy_namespace, invalidate
+from app.services.rollups import update_rollups
+from app.services.timeseries_store import get_store
+
+# Queue item kinds
+POINT = "point"
+WATERMARK = "watermark"
+_STOP = ("stop", None)
+
+
+class MetricWriter:
+    """Buffers timeseries points and writes them in batched transactions"""
+
+    def __init__(self):
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # (site_id, metric_name) -> (lost_from, lost_until, failed_at) of
+        # points a failed flush dropped
+        self._lost: Dict[Tuple[str, str], Tuple[datetime, datetime, float]] = {}
+        self._lost_lock = threading.Lock()
+        self.points_written = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background flush thread"""
+        with self._lock:
+            if self.running:
+                return
+            self._queue = queue.Queue(maxsize=settings.METRIC_BUFFER_MAX_POINTS)
+            self._thread = threading.Thread(target=self._run, name="metric-writer", daemon=True)
+            self._thread.start()
+        logger.info("✅ Metric writer started")
+
+    def stop(self) -> None:
+        """Flush everything still buffered and stop the flush thread"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join()
+            self._thread = None
+            self._queue = None
+        logger.info("⏹️  Metric writer stopped")
+
+    def submit(
+        self,
+        rows: List[Dict[str, Any]],
+        watermark: Optional[Tuple[str, str, datetime, datetime]] = None
+    ) -> None:
+        """
+        Queue TimeseriesMetric rows, then optionally a high-water mark
+
+        Blocks while the buffer is full. Without a running writer (e.g. in
+        scripts) the rows are written synchronously.
+
+        Args:
+            rows: TimeseriesMetric column values per point
+            watermark: (site_id, metric_name, start, timestamp) to advance
+                once these rows are stored; the rows are every point from
+                start up to timestamp
+        """
+        submitted_at = time.monotonic()
+        items = [(POINT, row) for row in rows]
+        if watermark is not None:
+            items.append((WATERMARK, (*watermark, submitted_at)))
+
+        buffer = self._queue
+        if not self.running or buffer is None:
+            self._write(items)
+            return
+
+        for item in items:
+            try:
+                buffer.put_nowait(item)
+            except queue.Full:
+                logger.warning("⏳ Metric buffer full, waiting for the writer to catch up")
+                buffer.put(item)
+
+    def _run(self) -> None:
+        """Flush loop: collect a batch until it is full or old enough, then write it"""
+        batch_size = settings.METRIC_FLUSH_BATCH_SIZE
+        interval = settings.METRIC_FLUSH_INTERVAL_SECONDS
+        buffer = self._queue
+
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+
+            while len(batch) < batch_size:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = buffer.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + interval
+
+            if stopping:
+                # Drain whatever was queued before the stop request
+                while True:
+                    try:
+                        item = buffer.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+
+            if batch:
+                self._write(batch)
+
+    def _write(self, items: List[Tuple[str, Any]]) -> None:
+        """Write one batch of points and watermarks in a single transaction"""
+        # Later points for the same key supersede earlier ones
+        points: Dict[str, Dict[str, Any]] = {}
+        marks: List[Tuple[Tuple[str, str], datetime, datetime, float]] = []
+        for kind, value in items:
+            if kind == POINT:
+                points[value["id"]] = value
+            else:
+                site_id, metric_name, start, mark, submitted_at = value
+                marks.append(((site_id, metric_name), start, mark, submitted_at))
+
+        lost, watermarks = self._apply_lost(marks)
+
+        db = SessionLocal()
+        try:
+            get_store().write(db, list(points.values()))
+            update_rollups(db, points.values())
+
+            for (site_id, metric_name), mark in watermarks.items():
+                watermark = db.get(MetricWatermark, f"{site_id}:{metric_name}")
+                if watermark is None:
+                    db.add(MetricWatermark(
+                        id=f"{site_id}:{metric_name}",
+                        site_id=site_id,
+                        metric_name=metric_name,
+                        high_water_mark=mark
+                    ))
+                elif mark > watermark.high_water_mark:
+                    watermark.high_water_mark = mark
+
+            db.commit()
+        except Exception as e:
+            # Watermarks were rolled back with the points; hold the range so
+            # later batches cannot advance past it either
+            db.rollback()
+            logger.error(f"Failed to flush {len(points)} metric points: {e}")
+            self._hold_lost(points.values(), marks)
+            return
+        finally:
+            db.close()
+
+        with self._lost_lock:
+            for key in watermarks:
+                if key in lost:
+                    self._lost[key] = lost[key]
+                elif self._lost.pop(key, None) is not None:
+                    logger.info(f"✅ Lost {key[1]} points of {key[0]} re-ingested, watermark released")
+
+        invalidate(*{energy_namespace(point["site_id"]) for point in points.values()})
+        self.points_written += len(points)
+        logger.debug(f"Flushed {len(points)} metric points, {len(watermarks)} watermarks")
+
+    def _apply_lost(
+        self,
+        marks: List[Tuple[Tuple[str, str], datetime, datetime, float]]
+    ) -> Tuple[Dict[Tuple[str, str], Tuple[datetime, datetime, float]], Dict[Tuple[str, str], datetime]]:
+        """
+        Watermarks to commit for a batch, capped at the lost ranges
+
+        A window submitted after a failure that starts at or before the
+        lost range rewrites it up to the window's mark. Returns the lost
+        ranges as they stand once the batch commits, and the watermarks.
+        """
+        with self._lost_lock:
+            lost = dict(self._lost)
+
+        watermarks: Dict[Tuple[str, str], datetime] = {}
+        for key, start, mark, submitted_at in marks:
+            if key in lost:
+                lost_from, lost_until, failed_at = lost[key]
+                if submitted_at > failed_at and start <= lost_from:
+                    lost_from = max(lost_from, mark)
+                if lost_from > lost_until:
+                    del lost[key]
+                else:
+                    lost[key] = (lost_from, lost_until, failed_at)
+                    mark = min(mark, lost_from)
+            watermarks[key] = max(mark, watermarks.get(key, mark))
+
+        return lost, watermarks
+
+    def _hold_lost(
+        self,
+        points: Iterable[Dict[str, Any]],
+        marks: List[Tuple[Tuple[str, str], datetime, datetime, float]]
+    ) -> None:
+        """Record the ranges of a failed batch, per (site, metric)"""
+        ranges: Dict[Tuple[str, str], Tuple[datetime, datetime]] = {}
+        spans = [
+            ((point["site_id"], point["metric_name"]), point["timestamp"], point["timestamp"])
+            for point in points
+        ]
+        spans.extend((key, start, mark) for key, start, mark, _ in marks)
+        for key, start, end in spans:
+            if key in ranges:
+                start, end = min(start, ranges[key][0]), max(end, ranges[key][1])
+            ranges[key] = (start, end)
+
+        failed_at = time.monotonic()
+        with self._lost_lock:
+            for key, (start, end) in ranges.items():
+                if key in self._lost:
+                    lost_from, lost_until, _ = self._lost[key]
+                    start, end = min(start, lost_from), max(end, lost_until)
+                self._lost[key] = (start, end, failed_at)
+
+        if ranges:
+            logger.warning(f"⏸️  Holding the watermarks of {len(ranges)} series until the lost points are re-ingested")
+
+
+metric_writer = MetricWriter()
@@ -0,0 +1,266 @@
+"""
+Fleet Poller - Fans site polling out across vendors and sites concurrently
+"""
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import heapq
+import math
+import threading
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.connectors.registry import CONNECTOR_CLASSES
+from app.models import ApiKey, Site, FetchLog
+from app.services.data_service import REMOVED_STATUS, DataService, write_stats
+from app.services.fetch_tracker import FetchTracker
+from app.services.resources import resource_classes, scheduled_site_resources
+
+
+class PollUnit(NamedTuple):
+    """One schedulable fetch: a resource of a site (or of the account when site_id is None)"""
+    vendor: str
+    api_key: str
+    site_id: Optional[str]
+    resource: str
+
+
+def batch_size(unit: PollUnit) -> int:
+    """How many units of this kind one bulk request can carry"""
+    if unit.resource == "overview" and unit.vendor in CONNECTOR_CLASSES:
+        return CONNECTOR_CLASSES[unit.vendor].overview_batch_size
+    return 1
+
+
+def vendor_concurrency_limits() -> Dict[str, int]:
+    """Max in-flight requests per vendor (the size of each vendor's bulkhead)"""
+    return {
+        "SolarEdge": settings.SOLAREDGE_CONCURRENT_LIMIT,
+        "Enphase": settings.ENPHASE_CONCURRENT_LIMIT,
+        "Generac": settings.GENERAC_CONCURRENT_LIMIT,
+    }
+
+
+class FleetPoller:
+    """
+    Concurrent poll engine
+
+    Every vendor gets its own bounded thread pool (bulkhead), so a slow or
+    paced vendor such as Generac can never occupy the workers SolarEdge
+    needs. Each unit of work opens and closes its own database session.
+    """
+
+    def __init__(self):
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._in_flight: Set[Tuple[str, Optional[str], str]] = set()
+        self._lock = threading.Lock()
+
+    def _executor(self, vendor: str) -> ThreadPoolExecutor:
+        """Get (or lazily create) the bulkhead for a vendor"""
+        with self._lock:
+            executor = self._executors.get(vendor)
+            if executor is None:
+                max_workers = max(1, vendor_concurrency_limits().get(vendor, 1))
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=f"poll-{vendor.lower()}"
+                )
+                self._executors[vendor] = executor
+            return executor
+
+    def dispatch_stale(self) -> int:
+        """
+        Dispatch the most overdue (site, resource) units
+
+        Units are ranked by how far past their resource class TTL they
+        are (time since FetchLog.last_success_at divided by the TTL; never
+        fetched ranks first). Only units past their TTL are eligible, and
+        each tick dispatches just the fleet's steady-state share of work
+        (sum of tick/TTL over all units), so polling is spread evenly
+        over the interval instead of bursting.
+
+        Returns:
+            Number of units dispatched
+        """
+        # Writes made by the groups dispatched on earlier ticks
+        self._report_writes()
+        
+        db = SessionLocal()
+        try:
+            groups = self._plan(db)
+        finally:
+            db.close()
+
+        for group in groups:
+            keys = [(unit.vendor, unit.site_id, unit.resource) for unit in group]
+            with self._lock:
+                self._in_flight.update(keys)
+            future = self._executor(group[0].vendor).submit(self._run_group, group)
+            future.add_done_callback(lambda _, keys=keys: self._finish(keys))
+
+        dispatched = sum(len(group) for group in groups)
+        if dispatched:
+            logger.info(f"🔄 Dispatched {dispatched} stale resources in {len(groups)} requests")
+        return dispatched
+
+    def _plan(self, db) -> List[List[PollUnit]]:
+        """Build the staleness priority queue and take this tick's budget from it"""
+        now = datetime.utcnow()
+        ttls = {name: resource.ttl_minutes for name, resource in resource_classes().items()}
+        site_resources = list(scheduled_site_resources())
+        tick_seconds = settings.SCHEDULER_TICK_SECONDS
+
+        accounts = {key.vendor: key.key_encrypted for key in db.query(ApiKey).all()}
+        if not accounts:
+            return []
+
+        logs = {
+            log.id: log
+            for log in db.query(
+                FetchLog.id, FetchLog.last_success_at, FetchLog.last_attempt_at, FetchLog.last_status,
+                FetchLog.cooldown_until, FetchLog.retry_after
+            )
+        }
+
+        candidates = [PollUnit(vendor, key, None, "sites") for vendor, key in accounts.items()]
+        site_rows = db.query(Site.id, Site.vendor).filter(
+            Site.vendor.in_(accounts), Site.status != REMOVED_STATUS
+        )
+        for site_id, vendor in site_rows:
+            for resource in site_resources:
+                candidates.append(PollUnit(vendor, accounts[vendor], site_id, resource))
+
+        # Steady-state dispatch rate for this fleet, in requests per tick
+        budget = math.ceil(sum(
+            tick_seconds / (ttls[unit.resource] * 60) / batch_size(unit)
+            for unit in candidates
+        ))
+
+        with self._lock:
+            in_flight = set(self._in_flight)
+
+        queue = []
+        for unit in candidates:
+            if (unit.vendor, unit.site_id, unit.resource) in in_flight:
+                continue
+
+            log = logs.get(FetchTracker.log_id(unit.vendor, unit.site_id, unit.resource))
+            if log is None:
+                # Never attempted: ahead of everything
+                heapq.heappush(queue, (-math.inf, len(queue), unit))
+                continue
+
+            if log.cooldown_until and log.cooldown_until > now:
+                continue
+
+            # Failing units wait out their back-off instead of leading every tick
+            backoff_until = FetchTracker.backoff_until(log.last_status, log.last_attempt_at, log.retry_after)
+            if backoff_until and backoff_until > now:
+                continue
+
+            ttl_seconds = ttls[unit.resource] * 60
+            if log.last_success_at is None:
+                # Never succeeded: ranked by time since the last attempt
+                overdue = (now - (log.last_attempt_at or now)).total_seconds() / ttl_seconds
+            else:
+                overdue = (now - log.last_success_at).total_seconds() / ttl_seconds
+                if overdue < 1:
+                    continue
+
+            heapq.heappush(queue, (-overdue, len(queue), unit))
+
+        ordered = [heapq.heappop(queue)[2] for _ in range(len(queue))]
+        return self._group(ordered, budget)
+
+    def _group(self, units: List[PollUnit], budget: Optional[int] = None) -> List[List[PollUnit]]:
+        """
+        Pack units (in priority order) into requests
+
+        Units with a bulk endpoint share a request with others of the same
+        account until the batch is full. Only opening a new request costs
+        budget, so stale units can still ride along in an open batch after
+        the budget is spent.
+        """
+        groups: List[List[PollUnit]] = []
+        open_batches: Dict[Tuple[str, str, str], List[PollUnit]] = {}
+
+        for unit in units:
+            size = batch_size(unit)
+            batch_key = (unit.vendor, unit.api_key, unit.resource)
+
+            if size > 1:
+                batch = open_batches.get(batch_key)
+                if batch is not None and len(batch) < size:
+                    batch.append(unit)
+                    continue
+
+            if budget is not None:
+                if budget <= 0:
+                    continue
+                budget -= 1
+
+            group = [unit]
+            groups.append(group)
+            if size > 1:
+                open_batches[batch_key] = group
+
+        return groups
+
+    def _run_group(self, group: List[PollUnit]) -> None:
+        """Fetch a single resource, or a batch of one resource across sites"""
+        unit = group[0]
+        if batch_size(unit) <= 1:
+            self._run_unit(unit)
+            return
+
+        db = SessionLocal()
+        try:
+            DataService(db).fetch_sites_overview(
+                [member.site_id for member in group], unit.vendor, unit.api_key
+            )
+        finally:
+            db.close()
+
+    def _run_unit(self, unit: PollUnit) -> None:
+        """Fetch a single resource"""
+        db = SessionLocal()
+        try:
+            data_service = DataService(db)
+            if unit.resource == "sites":
+                data_service.fetch_all_sites(unit.vendor, unit.api_key)
+            elif unit.resource == "overview":
+                data_service.fetch_site_overview(unit.site_id, unit.vendor, unit.api_key)
+            elif unit.resource == "devices":
+                data_service.fetch_site_devices(unit.site_id, unit.vendor, unit.api_key)
+            elif unit.resource == "energy":
+                data_service.fetch_site_energy(unit.site_id, unit.vendor, unit.api_key)
+        finally:
+            db.close()
+
+    def _finish(self, keys: List[Tuple[str, Optional[str], str]]) -> None:
+        with self._lock:
+            self._in_flight.difference_update(keys)
+
+    def _report_writes(self) -> None:
+        """Log and reset the changed/unchanged record counts of the last cycle"""
+        counts = write_stats.snapshot(reset=True)
+        if counts:
+            summary = ", ".join(
+                f"{kind} {value['changed']} changed/{value['unchanged']} unchanged"
+                for kind, value in sorted(counts.items())
+            )
+            logger.info(f"📝 Writes: {summary}")
+    
+    def shutdown(self) -> None:
+        """Stop all bulkheads, waiting for in-flight work to finish"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+            self._in_flight.clear()
+
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+fleet_poller = FleetPoller()
@@ -0,0 +1,108 @@
+"""
+Power Flow Cache - Shared, single-flight cache of live power flow
+
+Live power flow is read by the site page (GET /sites/{id}/power-flow) and
+by overview polls, and every upstream call counts against the site's
+SolarEdge quota (300 requests/day). Both go through
+DataService.fetch_power_flow, which reads this process-wide cache:
+
+- A reading is reused for the vendor's updateRefreshRate (how often
+  SolarEdge refreshes it), or POWER_FLOW_CACHE_SECONDS if none is reported
+- Concurrent misses for one site are coalesced: the first caller fetches,
+  the others wait for its result instead of calling the vendor too
+
+Failed fetches (None, or a reading without last_update) are not cached,
+but callers already waiting on them share the failure.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import threading
+import time
+from loguru import logger
+
+from app.core.config import settings
+
+# Waiters give up after this long (the leader's request has its own timeout)
+WAIT_TIMEOUT_SECONDS = 60
+
+
+class PowerFlowCache:
+    """Latest power flow per site, with one in-flight fetch per site"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def peek(self, site_id: str) -> Optional[Dict[str, Any]]:
+        """Cached reading if still fresh, without fetching"""
+        with self._lock:
+            return self._fresh(site_id)
+
+    def get(self, site_id: str, fetch: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Fresh reading for a site, calling fetch() at most once at a time
+
+        Callers arriving while a fetch for the site is running wait for it
+        and get its result.
+        """
+        with self._lock:
+            power_flow = self._fresh(site_id)
+            if power_flow is not None:
+                return power_flow
+
+            future = self._in_flight.get(site_id)
+            leader = future is None
+            if leader:
+                future = self._in_flight[site_id] = Future()
+
+        if not leader:
+            try:
+                return future.result(timeout=WAIT_TIMEOUT_SECONDS)
+            except FutureTimeoutError:
+                logger.warning(f"Timed out waiting for the power flow fetch of {site_id}")
+                return None
+
+        try:
+            power_flow = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[site_id]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if power_flow is not None and power_flow.get("last_update"):
+                self._entries[site_id] = (time.monotonic() + self._ttl(power_flow), power_flow)
+            del self._in_flight[site_id]
+        future.set_result(power_flow)
+        return power_flow
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def _fresh(self, site_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(site_id)
+        if entry is None:
+            return None
+        expires_at, power_flow = entry
+        if expires_at <= time.monotonic():
+            del self._entries[site_id]
+            return None
+        return power_flow
+
+    @staticmethod
+    def _ttl(power_flow: Dict[str, Any]) -> float:
+        refresh_rate = power_flow.get("update_refresh_rate")
+        try:
+            if refresh_rate and float(refresh_rate) > 0:
+                return float(refresh_rate)
+        except (TypeError, ValueError):
+            pass
+        return settings.POWER_FLOW_CACHE_SECONDS
+
+
+power_flow_cache = PowerFlowCache()
@@ -0,0 +1,120 @@
+"""
+Production Ledger - Daily production per site, vendor and fleet
+
+Every overview that changes a site's production today is booked against
+the site's local day, which is the date of the vendor's last update time.
+The site's row for that day holds the latest reading. The vendor and fleet
+rows for the day are incremented by the change, in the overview's
+transaction.
+
+When a site's day rolls over, the first reading of the new day starts a
+new row. The previous day's row keeps its final total, so each site is
+snapshotted at its own local day boundary without extra vendor calls.
+
+Reads are primary-key lookups of (scope, day) rows, so day-over-day and
+week-over-week deltas cost the same for any fleet size.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.bulk import bulk_increment, bulk_upsert, chunked
+from app.core.config import settings
+from app.models import ProductionLedger
+from app.services.counters import FLEET
+
+
+def vendor_scope(vendor: str) -> str:
+    """Ledger scope of one vendor's sites"""
+    return f"vendor:{vendor}"
+
+
+def ledger_id(scope: str, day: date) -> str:
+    """Deterministic ProductionLedger key"""
+    return f"{scope}:{day.isoformat()}"
+
+
+def fleet_today() -> date:
+    """Today in FLEET_TIMEZONE, the calendar the dashboard compares days in"""
+    return datetime.now(ZoneInfo(settings.FLEET_TIMEZONE)).date()
+
+
+def reading_day(overview: Dict[str, Any]) -> date:
+    """
+    Local day an overview's production today belongs to
+
+    SolarEdge reports its last update time in the site's local time; its
+    date is the day the site's counter is accumulating. Overviews without
+    one are booked on fleet_today().
+    """
+    value = overview.get("last_update")
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            pass
+    return fleet_today()
+
+
+def percent_change(current: float, previous: float) -> Optional[float]:
+    """Change from previous to current in percent (None without a baseline)"""
+    if not previous:
+        return None
+    return round((current - previous) / previous * 100, 1)
+
+
+class LedgerReadings:
+    """Production readings staged by one write, booked in its transaction"""
+
+    def __init__(self):
+        self._readings: Dict[Tuple[str, date], Tuple[str, float]] = {}
+
+    def record(self, site_id: str, vendor: str, day: date, energy_kwh: Optional[float]) -> None:
+        """Stage a site's production so far on its local day"""
+        self._readings[(site_id, day)] = (vendor, energy_kwh or 0.0)
+
+    def apply(self, db: Session) -> None:
+        """Write the site rows and add their changes to the vendor and fleet rows"""
+        readings, self._readings = self._readings, {}
+        if not readings:
+            return
+
+        ids = [ledger_id(site_id, day) for site_id, day in readings]
+        previous = {}
+        for chunk in chunked(ids):
+            previous.update(
+                db.query(ProductionLedger.id, ProductionLedger.energy_kwh)
+                .filter(ProductionLedger.id.in_(chunk))
+            )
+
+        site_rows = []
+        deltas: Dict[Tuple[str, date], float] = defaultdict(float)
+        for (site_id, day), (vendor, energy_kwh) in readings.items():
+            row_id = ledger_id(site_id, day)
+            site_rows.append({"id": row_id, "scope": site_id, "day": day, "energy_kwh": energy_kwh})
+
+            change = energy_kwh - previous.get(row_id, 0.0)
+            deltas[(FLEET, day)] += change
+            deltas[(vendor_scope(vendor), day)] += change
+
+        bulk_upsert(db, ProductionLedger, site_rows)
+        bulk_increment(db, ProductionLedger, [
+            {"id": ledger_id(scope, day), "scope": scope, "day": day, "energy_kwh": change}
+            for (scope, day), change in deltas.items()
+            if change
+        ], ["energy_kwh"])
+
+
+async def read_production(db: AsyncSession, scope: str, days: List[date]) -> Dict[date, float]:
+    """Production of one scope on each of the given days (0.0 if none booked)"""
+    rows = await db.execute(
+        select(ProductionLedger.day, ProductionLedger.energy_kwh)
+        .where(ProductionLedger.id.in_([ledger_id(scope, day) for day in days]))
+    )
+    production = {day: 0.0 for day in days}
+    production.update({day: energy_kwh for day, energy_kwh in rows})
+    return production
@@ -0,0 +1,218 @@
+"""
+Quota Manager - Persistent token buckets shared by every connector
+
+Each vendor request draws one token from every bucket that applies to it:
+the vendor-wide bucket (e.g. an Enphase application plan), the account
+bucket and, for site-level endpoints, the site bucket. Buckets live in the
+database, so the budget survives restarts and is shared by the scheduler
+and API-triggered fetches.
+
+A bucket holds at most 1/QUOTA_BURST_DIVISOR of the daily limit and refills
+continuously with the rest, so no rolling 24 hours can spend more than the
+limit itself (a full bucket plus one day of refill). Vendors reset their
+counters on calendar days in a timezone we cannot see, so a rolling bound
+is the one that holds for every vendor.
+
+Buckets are read and updated in one write transaction: threads are
+serialized by a lock, and other processes by the database (SELECT ... FOR
+UPDATE on PostgreSQL; on SQLite, which ignores FOR UPDATE, by taking the
+write lock with BEGIN IMMEDIATE before reading), so workers sharing the
+database never spend the same tokens twice.
+"""
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import hashlib
+import threading
+from sqlalchemy import text
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import IS_SQLITE, SessionLocal
+from app.models import QuotaBucket
+
+SECONDS_PER_DAY = 86400
+
+# A bucket holds this fraction of the daily limit (one hour's worth)
+QUOTA_BURST_DIVISOR = 24
+
+
+class QuotaExceededError(Exception):
+    """Raised when a request would exceed a vendor quota"""
+
+    def __init__(self, bucket_id: str, retry_after: int):
+        self.bucket_id = bucket_id
+        self.retry_after = retry_after
+        super().__init__(f"Quota exhausted for {bucket_id}, retry in {retry_after}s")
+
+
+def account_fingerprint(api_key: str) -> str:
+    """Stable, non-reversible identifier for an account credential"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def daily_limits(vendor: str) -> Dict[str, Optional[int]]:
+    """Daily request limits per scope for a vendor (None = unlimited)"""
+    limits = {
+        "SolarEdge": {
+            "vendor": None,
+            "account": settings.SOLAREDGE_DAILY_LIMIT,
+            "site": settings.SOLAREDGE_DAILY_LIMIT,
+        },
+        "Enphase": {
+            "vendor": settings.ENPHASE_DAILY_LIMIT,
+            "account": None,
+            "site": None,
+        },
+        "Generac": {
+            "vendor": None,
+            "account": settings.GENERAC_DAILY_LIMIT,
+            "site": None,
+        },
+    }
+    return limits.get(vendor, {"vendor": None, "account": None, "site": None})
+
+
+def bucket_shape(limit: int) -> Tuple[float, float]:
+    """
+    (capacity, refill_per_second) of a bucket for a daily limit
+
+    Capacity plus one day of refill equals the limit, so the limit holds
+    over any 24 hours, not just on average.
+    """
+    capacity = limit / QUOTA_BURST_DIVISOR
+    return capacity, (limit - capacity) / SECONDS_PER_DAY
+
+
+class QuotaManager:
+    """Token bucket accounting for vendor API requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        vendor: str,
+        api_key: str,
+        site_id: Optional[str] = None,
+        cost: float = 1
+    ) -> None:
+        """
+        Take `cost` tokens from every applicable bucket, or none at all
+
+        Raises:
+            QuotaExceededError: if any bucket lacks enough tokens
+        """
+        scopes = self._scopes(vendor, api_key, site_id)
+        if not scopes:
+            return
+
+        now = datetime.utcnow()
+
+        with self._lock:
+            db = SessionLocal()
+            try:
+                if IS_SQLITE:
+                    # Take the write lock up front so other processes wait
+                    db.execute(text("BEGIN IMMEDIATE"))
+                
+                buckets = []
+                for scope, scope_id, limit in scopes:
+                    bucket = self._load_bucket(db, vendor, scope, scope_id, limit)
+                    self._refill(bucket, now)
+                    buckets.append(bucket)
+
+                for bucket in buckets:
+                    if bucket.tokens < cost:
+                        retry_after = int((cost - bucket.tokens) / bucket.refill_per_second) + 1
+                        db.commit()
+                        logger.warning(f"🪣 Quota exhausted: {bucket.id} (retry in {retry_after}s)")
+                        raise QuotaExceededError(bucket.id, retry_after)
+
+                for bucket in buckets:
+                    bucket.tokens -= cost
+
+                db.commit()
+            finally:
+                db.close()
+
+    def get_status(self, vendor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Remaining budget for every known bucket"""
+        now = datetime.utcnow()
+
+        db = SessionLocal()
+        try:
+            query = db.query(QuotaBucket)
+            if vendor:
+                query = query.filter(QuotaBucket.vendor == vendor)
+
+            status = []
+            for bucket in query.order_by(QuotaBucket.id).all():
+                elapsed = max((now - bucket.updated_at).total_seconds(), 0)
+                remaining = min(bucket.capacity, bucket.tokens + elapsed * bucket.refill_per_second)
+                status.append({
+                    "vendor": bucket.vendor,
+                    "scope": bucket.scope,
+                    "scope_id": bucket.scope_id,
+                    "capacity": int(bucket.capacity),
+                    "remaining": int(remaining),
+                    "full_in_seconds": int((bucket.capacity - remaining) / bucket.refill_per_second)
+                })
+            return status
+        finally:
+            db.close()
+
+    def _scopes(
+        self,
+        vendor: str,
+        api_key: str,
+        site_id: Optional[str]
+    ) -> List[Tuple[str, str, int]]:
+        """(scope, scope_id, daily_limit) for each bucket a request draws from"""
+        limits = daily_limits(vendor)
+        scopes = []
+
+        if limits["vendor"]:
+            scopes.append(("vendor", vendor, limits["vendor"]))
+        if limits["account"]:
+            scopes.append(("account", account_fingerprint(api_key), limits["account"]))
+        if limits["site"] and site_id:
+            scopes.append(("site", site_id, limits["site"]))
+
+        return scopes
+
+    def _load_bucket(self, db, vendor: str, scope: str, scope_id: str, limit: int) -> QuotaBucket:
+        """Fetch a bucket, creating it full on first use"""
+        bucket_id = f"{vendor}:{scope}:{scope_id}"
+        bucket = db.query(QuotaBucket).filter(QuotaBucket.id == bucket_id).with_for_update().first()
+
+        capacity, refill_per_second = bucket_shape(limit)
+
+        if bucket is None:
+            bucket = QuotaBucket(
+                id=bucket_id,
+                vendor=vendor,
+                scope=scope,
+                scope_id=scope_id,
+                capacity=capacity,
+                tokens=capacity,
+                refill_per_second=refill_per_second,
+                updated_at=datetime.utcnow()
+            )
+            db.add(bucket)
+        elif bucket.capacity != capacity or bucket.refill_per_second != refill_per_second:
+            # Limit was reconfigured - keep the spent amount, rescale the bucket
+            spent = bucket.capacity - bucket.tokens
+            bucket.capacity = capacity
+            bucket.tokens = max(capacity - spent, 0.0)
+            bucket.refill_per_second = refill_per_second
+
+        return bucket
+
+    def _refill(self, bucket: QuotaBucket, now: datetime) -> None:
+        """Add the tokens accrued since the bucket was last touched"""
+        elapsed = max((now - bucket.updated_at).total_seconds(), 0)
+        bucket.tokens = min(bucket.capacity, bucket.tokens + elapsed * bucket.refill_per_second)
+        bucket.updated_at = now
+
+
+quota_manager = QuotaManager()
@@ -0,0 +1,37 @@
+"""
+Resource Classes - What we fetch from vendors and how often
+
+Each resource class has its own refresh interval: inventory barely changes
+and is refreshed daily, overviews follow the site TTL, and live power flow
+is only fetched on demand (by the API, or by an overview poll once the
+last reading has gone stale).
+"""
+from typing import Dict, NamedTuple
+
+from app.core.config import settings
+
+
+class ResourceClass(NamedTuple):
+    name: str
+    ttl_minutes: int  # Minutes a successful fetch stays fresh
+    scheduled: bool  # Polled by the scheduler (otherwise fetched on demand)
+    per_site: bool  # Fetched per site (otherwise once per vendor account)
+
+
+def resource_classes() -> Dict[str, ResourceClass]:
+    """All resource classes keyed by name (the FetchLog.resource value)"""
+    return {
+        "sites": ResourceClass("sites", settings.DASHBOARD_TTL_MINUTES, True, False),
+        "overview": ResourceClass("overview", settings.SITE_TTL_MINUTES, True, True),
+        "devices": ResourceClass("devices", settings.INVENTORY_TTL_MINUTES, True, True),
+        "power_flow": ResourceClass("power_flow", settings.POWER_FLOW_TTL_MINUTES, False, True),
+        "energy": ResourceClass("energy", settings.ENERGY_TTL_MINUTES, True, True),
+    }
+
+
+def scheduled_site_resources() -> Dict[str, ResourceClass]:
+    """Per-site resource classes the scheduler polls on its own"""
+    return {
+        name: resource for name, resource in resource_classes().items()
+        if resource.scheduled and resource.per_site
+    }
@@ -0,0 +1,345 @@
+"""
+Result Cache - Shared cache for computed API results
+
+Interchangeable backends, selected with CACHE_BACKEND:
+
+- memory: per-process LRU bounded by CACHE_MAX_ENTRIES, for a single
+  process only. Invalidations never leave the process, so with several
+  workers the others serve stale results for up to CACHE_TTL_SECONDS.
+- sqlite: a table in a separate SQLite file (CACHE_SQLITE_PATH) shared by
+  every worker on the host. Beyond CACHE_MAX_ENTRIES the entries closest
+  to expiry are evicted.
+- redis: REDIS_URL, shared by every worker and host. Needs the optional
+  redis package; eviction is left to Redis' maxmemory-policy.
+
+Entries expire after CACHE_TTL_SECONDS. Keys live in namespaces that
+writes invalidate after they commit:
+
+- stats: dashboard stats and production history (site listings, overview
+  updates and alert status changes)
+- alerts: alert facets (alert status changes)
+- energy:<site_id>: a site's energy series (metric writer flushes)
+
+Invalidating a namespace bumps its generation, which is part of every key
+in it, rather than deleting keys: it is O(1) on every backend, and a
+result computed from data read before the write can only be stored under
+the old generation, where no reader will look for it.
+
+Cache errors are logged and treated as misses, so a broken backend slows
+the API down but never fails a request.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import itertools
+import json
+import sqlite3
+import threading
+import time
+from starlette.concurrency import run_in_threadpool
+from loguru import logger
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Namespaces
+STATS = "stats"
+ALERTS = "alerts"
+
+
+def energy_namespace(site_id: str) -> str:
+    """Namespace of one site's energy series"""
+    return f"energy:{site_id}"
+
+
+class ResultCache(ABC):
+    """Interface every cache backend implements"""
+
+    name = ""
+    blocking = True  # Calls do I/O, so async endpoints run them off the event loop
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None if missing or expired"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        pass
+
+    @abstractmethod
+    def generation(self, namespace: str) -> int:
+        pass
+
+    @abstractmethod
+    def invalidate(self, namespace: str) -> None:
+        """Bump a namespace's generation, orphaning every key in it"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Drop every entry; returns how many were dropped"""
+        pass
+
+
+class MemoryCache(ResultCache):
+    """
+    Per-process LRU; values are shared, not copied, so callers must not mutate them
+
+    Generations come from one process-wide counter and are kept for the
+    CACHE_MAX_ENTRIES most recently used namespaces. A namespace seen again
+    after its generation was evicted gets a new one, so its old entries are
+    never read again.
+    """
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._next_generation = itertools.count()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            generation = self._generations.get(namespace)
+            if generation is None:
+                return self._new_generation(namespace)
+            self._generations.move_to_end(namespace)
+            return generation
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._new_generation(namespace)
+
+    def _new_generation(self, namespace: str) -> int:
+        generation = self._generations[namespace] = next(self._next_generation)
+        self._generations.move_to_end(namespace)
+        while len(self._generations) > settings.CACHE_MAX_ENTRIES:
+            self._generations.popitem(last=False)
+        return generation
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+
+class SqliteCache(ResultCache):
+    """Entries as JSON in a SQLite file, one connection per thread"""
+
+    name = "sqlite"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(settings.CACHE_SQLITE_PATH, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # Losing cache entries in a crash is fine
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires_at)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_generations "
+                "(namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), now + ttl)
+        )
+        connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM cache_entries WHERE key IN "
+            "(SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (settings.CACHE_MAX_ENTRIES,)
+        )
+
+    def generation(self, namespace: str) -> int:
+        row = self._connection().execute(
+            "SELECT generation FROM cache_generations WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def invalidate(self, namespace: str) -> None:
+        self._connection().execute(
+            "INSERT INTO cache_generations (namespace, generation) VALUES (?, 1) "
+            "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+            (namespace,)
+        )
+
+    def clear(self) -> int:
+        return self._connection().execute("DELETE FROM cache_entries").rowcount
+
+
+class RedisCache(ResultCache):
+    """Entries as JSON strings with a Redis expiry"""
+
+    name = "redis"
+
+    def __init__(self):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)")
+        self._client = redis.Redis.from_url(settings.REDIS_URL)
+        self._prefix = settings.CACHE_KEY_PREFIX
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._client.get(f"{self._prefix}entry:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._client.set(f"{self._prefix}entry:{key}", json.dumps(value), ex=ttl)
+
+    def generation(self, namespace: str) -> int:
+        return int(self._client.get(f"{self._prefix}generation:{namespace}") or 0)
+
+    def invalidate(self, namespace: str) -> None:
+        self._client.incr(f"{self._prefix}generation:{namespace}")
+
+    def clear(self) -> int:
+        count = 0
+        batch = []
+        for key in self._client.scan_iter(match=f"{self._prefix}entry:*", count=1000):
+            batch.append(key)
+            if len(batch) == 1000:
+                count += self._client.delete(*batch)
+                batch = []
+        if batch:
+            count += self._client.delete(*batch)
+        return count
+
+
+CACHES = {
+    MemoryCache.name: MemoryCache,
+    SqliteCache.name: SqliteCache,
+    RedisCache.name: RedisCache,
+}
+
+_instances: Dict[str, ResultCache] = {}
+_instances_lock = threading.Lock()
+
+
+def get_cache() -> ResultCache:
+    """The cache backend selected by CACHE_BACKEND"""
+    name = settings.CACHE_BACKEND
+    cache = _instances.get(name)
+    if cache is None:
+        cache_class = CACHES.get(name)
+        if cache_class is None:
+            raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+        with _instances_lock:
+            cache = _instances.get(name) or _instances.setdefault(name, cache_class())
+    return cache
+
+
+def _lookup(namespace: str, parts: Tuple[Any, ...]) -> Tuple[Optional[str], Optional[Any]]:
+    """Key of a result in the namespace's current generation, and its cached value"""
+    try:
+        cache = get_cache()
+        key = ":".join([namespace, str(cache.generation(namespace)), *map(str, parts)])
+        return key, cache.get(key)
+    except Exception as e:
+        logger.warning(f"Result cache lookup failed: {e}")
+        return None, None
+
+
+def _store(key: Optional[str], value: Any) -> None:
+    if key is None or value is None:
+        return
+    try:
+        get_cache().set(key, value, settings.CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Result cache store failed: {e}")
+
+
+def get_or_compute(namespace: str, parts: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+    """
+    Cached result for (namespace, *parts), computing and storing it on a miss
+
+    parts must identify everything the result depends on besides the
+    namespace's writes (query parameters, the day, ...).
+    """
+    key, value = _lookup(namespace, parts)
+    if value is None:
+        value = compute()
+        _store(key, value)
+    return value
+
+
+async def get_or_compute_async(
+    namespace: str,
+    parts: Tuple[Any, ...],
+    compute: Callable[[], Awaitable[Any]]
+) -> Any:
+    """get_or_compute() for async endpoints (blocking backends run in the threadpool)"""
+    blocking = CACHES.get(settings.CACHE_BACKEND, ResultCache).blocking
+    if blocking:
+        key, value = await run_in_threadpool(_lookup, namespace, parts)
+    else:
+        key, value = _lookup(namespace, parts)
+
+    if value is None:
+        value = await compute()
+        if blocking:
+            await run_in_threadpool(_store, key, value)
+        else:
+            _store(key, value)
+    return value
+
+
+def invalidate(*namespaces: str) -> None:
+    """Orphan every cached result in the namespaces (call after the write commits)"""
+    try:
+        cache = get_cache()
+        for namespace in namespaces:
+            cache.invalidate(namespace)
+    except Exception as e:
+        logger.warning(f"Result cache invalidation failed: {e}")
+
+
+def clear_cache() -> int:
+    """Drop every cached result; returns how many were dropped"""
+    count = get_cache().clear()
+    logger.info(f"🧹 Cleared {count} cached results")
+    return count
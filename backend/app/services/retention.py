@@ -0,0 +1,110 @@
+"""
+Retention - Tiered expiry of timeseries history
+
+Policies (days, 0 = keep forever):
+
+- RETENTION_RAW_DAYS: raw interval points (default 90)
+- RETENTION_HOURLY_DAYS: hourly rollups (default 730)
+- Daily and monthly rollups are kept forever
+
+Expired data is appended to the monthly archive files first and deleted
+from the database afterwards, in batches of RETENTION_BATCH_SIZE with a
+commit (and a short pause) after each, so a run never holds the write lock
+for long and pollers keep writing in between. The partitioned backend
+drops whole expired months instead of deleting rows.
+"""
+from typing import Dict
+from datetime import datetime, timedelta
+import threading
+import time
+from loguru import logger
+
+from app.core.bulk import chunked
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import MetricRollup
+from app.services import archive
+from app.services.timeseries_store import get_store
+
+
+class RetentionService:
+    """Moves expired timeseries history from the database to the archive"""
+
+    def __init__(self):
+        # Only one run at a time, even if a run outlasts the job interval
+        self._run_lock = threading.Lock()
+
+    def run(self) -> Dict[str, int]:
+        """
+        Apply every retention policy
+
+        Returns:
+            Number of expired records per tier
+        """
+        if not self._run_lock.acquire(blocking=False):
+            logger.info("Retention already running, skipping")
+            return {}
+
+        try:
+            now = datetime.utcnow()
+            expired = {"raw": 0, "hour": 0}
+
+            if settings.RETENTION_RAW_DAYS > 0:
+                expired["raw"] = self._expire_raw(now - timedelta(days=settings.RETENTION_RAW_DAYS))
+            if settings.RETENTION_HOURLY_DAYS > 0:
+                expired["hour"] = self._expire_hourly(now - timedelta(days=settings.RETENTION_HOURLY_DAYS))
+
+            if any(expired.values()):
+                logger.info(
+                    f"🗄️  Archived {expired['raw']} raw points and {expired['hour']} hourly rollups"
+                )
+            return expired
+        finally:
+            self._run_lock.release()
+
+    def _expire_raw(self, cutoff: datetime) -> int:
+        """Archive and delete raw points older than the cutoff (backend-specific)"""
+        try:
+            return get_store().expire(cutoff)
+        except Exception as e:
+            logger.error(f"Raw retention failed: {e}")
+            return 0
+
+    def _expire_hourly(self, cutoff: datetime) -> int:
+        """Archive and delete hourly rollups older than the cutoff, batch by batch"""
+        total = 0
+
+        while True:
+            db = SessionLocal()
+            try:
+                rollups = db.query(MetricRollup).filter(
+                    MetricRollup.granularity == "hour",
+                    MetricRollup.bucket_start < cutoff
+                ).order_by(MetricRollup.bucket_start).limit(settings.RETENTION_BATCH_SIZE).all()
+                if not rollups:
+                    return total
+
+                archive.append("hour", [
+                    (
+                        rollup.site_id,
+                        rollup.metric_name,
+                        rollup.bucket_start,
+                        (rollup.value_sum, rollup.value_min, rollup.value_max, rollup.sample_count)
+                    )
+                    for rollup in rollups
+                ])
+                for ids in chunked([rollup.id for rollup in rollups]):
+                    db.query(MetricRollup).filter(MetricRollup.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                total += len(rollups)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Hourly rollup retention failed: {e}")
+                return total
+            finally:
+                db.close()
+
+            time.sleep(settings.RETENTION_BATCH_PAUSE_SECONDS)
+
+
+retention_service = RetentionService()
@@ -0,0 +1,192 @@
+"""
+Metric Rollups - Hourly, daily and monthly aggregates per site and metric
+
+Rollups are maintained incrementally as points are written: only the
+buckets a batch touches are recomputed, hours from the raw points in
+those hours, days from their hour rollups and months from their day
+rollups. Recomputing a touched bucket (instead of adding deltas) keeps
+min/max exact when a vendor revises a still-filling interval.
+
+Hourly rollups past RETENTION_HOURLY_DAYS live in the archive; reads of
+hour buckets merge them back in.
+"""
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+from app.core.bulk import bulk_upsert
+from app.models import MetricRollup
+from app.services import archive
+from app.services.timeseries_store import read_series
+
+# Finest first; each level is computed from the one before it
+GRANULARITIES = ["hour", "day", "month"]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the rollup bucket containing a timestamp"""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "month":
+        return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+
+def bucket_end(start: datetime, granularity: str) -> datetime:
+    """Start of the bucket following the one starting at `start`"""
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def rollup_id(site_id: str, metric_name: str, granularity: str, start: datetime) -> str:
+    """Deterministic MetricRollup key"""
+    return f"{site_id}:{metric_name}:{granularity}:{start.isoformat()}"
+
+
+def update_rollups(db: Session, points: Iterable[Dict[str, Any]]) -> int:
+    """
+    Recompute every rollup bucket touched by a batch of points
+
+    Must run in the transaction that wrote the points (after they were
+    written). The caller commits.
+
+    Args:
+        db: Database session
+        points: TimeseriesMetric column values of the written points
+
+    Returns:
+        Number of rollup rows written
+    """
+    touched: Dict[Tuple[str, str], Set[datetime]] = defaultdict(set)
+    for point in points:
+        touched[(point["site_id"], point["metric_name"])].add(bucket_start(point["timestamp"], "hour"))
+
+    written = 0
+    for (site_id, metric_name), hours in touched.items():
+        buckets = hours
+        for granularity in GRANULARITIES:
+            if granularity != "hour":
+                buckets = {bucket_start(start, granularity) for start in buckets}
+            rows = _aggregate(db, site_id, metric_name, granularity, buckets)
+            bulk_upsert(db, MetricRollup, rows)
+            written += len(rows)
+
+    return written
+
+
+def _aggregate(
+    db: Session,
+    site_id: str,
+    metric_name: str,
+    granularity: str,
+    buckets: Set[datetime]
+) -> List[Dict[str, Any]]:
+    """Aggregate the given buckets from the level below"""
+    start = min(buckets)
+    end = bucket_end(max(buckets), granularity)
+
+    if granularity == "hour":
+        samples = [
+            (timestamp, value, value, value, 1)
+            for timestamp, value in read_series(db, site_id, metric_name, start, end).points()
+        ]
+    else:
+        child = GRANULARITIES[GRANULARITIES.index(granularity) - 1]
+        samples = [
+            (rollup.bucket_start, rollup.value_sum, rollup.value_min, rollup.value_max, rollup.sample_count)
+            for rollup in _read_buckets(db, site_id, metric_name, child, start, end)
+        ]
+
+    aggregates: Dict[datetime, List[Any]] = {}
+    for timestamp, value_sum, value_min, value_max, count in samples:
+        key = bucket_start(timestamp, granularity)
+        if key not in buckets:
+            continue
+        aggregate = aggregates.get(key)
+        if aggregate is None:
+            aggregates[key] = [value_sum, value_min, value_max, count]
+        else:
+            aggregate[0] += value_sum
+            aggregate[1] = min(aggregate[1], value_min)
+            aggregate[2] = max(aggregate[2], value_max)
+            aggregate[3] += count
+
+    now = datetime.utcnow()
+    return [
+        {
+            "id": rollup_id(site_id, metric_name, granularity, key),
+            "site_id": site_id,
+            "metric_name": metric_name,
+            "granularity": granularity,
+            "bucket_start": key,
+            "value_sum": value_sum,
+            "value_min": value_min,
+            "value_max": value_max,
+            "sample_count": count,
+            "updated_at": now
+        }
+        for key, (value_sum, value_min, value_max, count) in sorted(aggregates.items())
+    ]
+
+
+def read_rollups(
+    db: Session,
+    site_id: str,
+    metric_name: str,
+    granularity: str,
+    start: datetime,
+    end: datetime
+) -> List[MetricRollup]:
+    """Rollup buckets overlapping [start, end], oldest first"""
+    return _read_buckets(
+        db, site_id, metric_name, granularity, bucket_start(start, granularity), end + timedelta(microseconds=1)
+    )
+
+
+def _read_buckets(
+    db: Session,
+    site_id: str,
+    metric_name: str,
+    granularity: str,
+    start: datetime,
+    end: datetime
+) -> List[MetricRollup]:
+    """Buckets with start <= bucket_start < end, including archived hours"""
+    rollups = db.query(MetricRollup).filter(
+        MetricRollup.site_id == site_id,
+        MetricRollup.metric_name == metric_name,
+        MetricRollup.granularity == granularity,
+        MetricRollup.bucket_start >= start,
+        MetricRollup.bucket_start < end
+    ).order_by(MetricRollup.bucket_start).all()
+
+    if granularity != "hour":
+        return rollups
+
+    archived = archive.read("hour", site_id, metric_name, start, end)
+    if not archived:
+        return rollups
+
+    stored = {rollup.bucket_start for rollup in rollups}
+    for key, (value_sum, value_min, value_max, count) in archived.items():
+        if key not in stored:
+            rollups.append(MetricRollup(
+                id=rollup_id(site_id, metric_name, granularity, key),
+                site_id=site_id,
+                metric_name=metric_name,
+                granularity=granularity,
+                bucket_start=key,
+                value_sum=float(value_sum),
+                value_min=float(value_min),
+                value_max=float(value_max),
+                sample_count=int(count)
+            ))
+    return sorted(rollups, key=lambda rollup: rollup.bucket_start)
@@ -0,0 +1,479 @@
+"""
+Timeseries Store - Storage backends for raw metric points
+
+Interchangeable backends, selected with TIMESERIES_BACKEND:
+
+- rows: one TimeseriesMetric row per point (the original layout)
+- chunks: one MetricChunk per (site, metric, day). Timestamps are stored
+  as delta-encoded second offsets (uint32) and values as float32, packed
+  and zlib-compressed into a blob. A year of 15-minute data for a site is
+  365 small rows and one index instead of 35,040 rows and five indexes.
+- partitioned: one row per point in per-month tables
+  (timeseries_metrics_YYYY_MM). Reads only touch the months overlapping
+  the requested range, and expiring a month is a DROP TABLE.
+
+All three take the same point dicts (the TimeseriesMetric columns) and
+read back a Series of parallel timestamp / value arrays. read_series()
+additionally merges in points the retention job has moved to the archive.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta
+import re
+import sys
+import threading
+import time
+import zlib
+from sqlalchemy import Column, DateTime, Float, Index, MetaData, String, Table, inspect, select
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.bulk import bulk_upsert, chunked
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models import TimeseriesMetric, MetricChunk
+from app.services import archive
+
+# An expired point: (site_id, metric_name, timestamp, value)
+ExpiredPoint = Tuple[str, str, datetime, float]
+
+
+class Series(NamedTuple):
+    """Points of one site/metric in time order"""
+    timestamps: List[datetime]
+    values: array  # array('d')
+
+    def points(self) -> Iterable[Tuple[datetime, float]]:
+        return zip(self.timestamps, self.values)
+
+
+class TimeseriesStore(ABC):
+    """Interface every storage backend implements"""
+
+    name = ""
+
+    @abstractmethod
+    def write(self, db: Session, points: List[Dict[str, Any]]) -> None:
+        """Upsert points on (site_id, metric_name, timestamp); the caller commits"""
+        pass
+
+    @abstractmethod
+    def read(
+        self,
+        db: Session,
+        site_id: str,
+        metric_name: str,
+        start: datetime,
+        end: datetime
+    ) -> Series:
+        """Points with start <= timestamp < end, oldest first"""
+        pass
+
+    @abstractmethod
+    def expire(self, cutoff: datetime) -> int:
+        """
+        Archive and delete every point older than `cutoff`
+
+        Returns:
+            Number of points expired
+        """
+        pass
+
+
+class BatchExpiringStore(TimeseriesStore):
+    """Backend that expires points by deleting them a batch at a time"""
+
+    @abstractmethod
+    def pop_expired(self, db: Session, cutoff: datetime, limit: int) -> List[ExpiredPoint]:
+        """
+        Delete up to about `limit` points older than `cutoff` and return them
+
+        The caller archives the points, then commits.
+        """
+        pass
+
+    def expire(self, cutoff: datetime) -> int:
+        """
+        Archive and delete every point older than `cutoff`
+
+        Works in RETENTION_BATCH_SIZE batches, each archived and then
+        committed in its own short transaction.
+
+        Returns:
+            Number of points expired
+        """
+        total = 0
+        while True:
+            db = SessionLocal()
+            try:
+                points = self.pop_expired(db, cutoff, settings.RETENTION_BATCH_SIZE)
+                if not points:
+                    return total
+
+                archive.append("raw", [
+                    (site_id, metric_name, timestamp, (value,))
+                    for site_id, metric_name, timestamp, value in points
+                ])
+                db.commit()
+                total += len(points)
+            finally:
+                db.close()
+
+            time.sleep(settings.RETENTION_BATCH_PAUSE_SECONDS)
+
+
+class RowStore(BatchExpiringStore):
+    """One TimeseriesMetric row per point"""
+
+    name = "rows"
+
+    def write(self, db: Session, points: List[Dict[str, Any]]) -> None:
+        bulk_upsert(db, TimeseriesMetric, points)
+
+    def read(self, db, site_id, metric_name, start, end) -> Series:
+        rows = db.query(TimeseriesMetric.timestamp, TimeseriesMetric.value).filter(
+            TimeseriesMetric.site_id == site_id,
+            TimeseriesMetric.metric_name == metric_name,
+            TimeseriesMetric.timestamp >= start,
+            TimeseriesMetric.timestamp < end
+        ).order_by(TimeseriesMetric.timestamp).all()
+
+        return Series([timestamp for timestamp, _ in rows], array("d", (value for _, value in rows)))
+
+    def pop_expired(self, db, cutoff, limit) -> List[ExpiredPoint]:
+        rows = db.query(
+            TimeseriesMetric.id,
+            TimeseriesMetric.site_id,
+            TimeseriesMetric.metric_name,
+            TimeseriesMetric.timestamp,
+            TimeseriesMetric.value
+        ).filter(TimeseriesMetric.timestamp < cutoff).order_by(TimeseriesMetric.timestamp).limit(limit).all()
+
+        for ids in chunked([row.id for row in rows]):
+            db.query(TimeseriesMetric).filter(TimeseriesMetric.id.in_(ids)).delete(synchronize_session=False)
+
+        return [(row.site_id, row.metric_name, row.timestamp, row.value) for row in rows]
+
+
+def encode_chunk(day: datetime, points: Dict[datetime, float]) -> bytes:
+    """Pack one day of points: delta-encoded uint32 second offsets, then float32 values"""
+    offsets = sorted(points)
+    deltas = array("I")
+    previous = 0
+    for timestamp in offsets:
+        offset = int((timestamp - day).total_seconds())
+        deltas.append(offset - previous)
+        previous = offset
+
+    values = array("f", (points[timestamp] for timestamp in offsets))
+    if sys.byteorder != "little":
+        deltas.byteswap()
+        values.byteswap()
+
+    return zlib.compress(deltas.tobytes() + values.tobytes())
+
+
+def decode_chunk(day: datetime, count: int, payload: bytes) -> Series:
+    """Unpack a chunk written by encode_chunk"""
+    raw = zlib.decompress(payload)
+    deltas = array("I")
+    deltas.frombytes(raw[:count * deltas.itemsize])
+    packed = array("f")
+    packed.frombytes(raw[count * deltas.itemsize:])
+    if sys.byteorder != "little":
+        deltas.byteswap()
+        packed.byteswap()
+    
+    # Round to float32 precision so 0.1 reads back as 0.1, not 0.10000000149
+    values = array("d", (float(f"{value:.7g}") for value in packed))
+
+    timestamps = []
+    offset = 0
+    for delta in deltas:
+        offset += delta
+        timestamps.append(day + timedelta(seconds=offset))
+
+    return Series(timestamps, values)
+
+
+class ChunkStore(BatchExpiringStore):
+    """Compressed per-(site, metric, day) chunks"""
+
+    name = "chunks"
+
+    @staticmethod
+    def chunk_id(site_id: str, metric_name: str, day: datetime) -> str:
+        return f"{site_id}:{metric_name}:{day.date().isoformat()}"
+
+    def write(self, db: Session, points: List[Dict[str, Any]]) -> None:
+        """Merge points into their day chunks (read-modify-write of the touched chunks)"""
+        incoming: Dict[str, Dict[str, Any]] = {}
+        for point in points:
+            day = point["timestamp"].replace(hour=0, minute=0, second=0, microsecond=0)
+            key = self.chunk_id(point["site_id"], point["metric_name"], day)
+            chunk = incoming.setdefault(key, {
+                "site_id": point["site_id"],
+                "metric_name": point["metric_name"],
+                "day": day,
+                "unit": point.get("unit"),
+                "points": {}
+            })
+            chunk["points"][point["timestamp"].replace(microsecond=0)] = point["value"]
+
+        existing = {}
+        for ids in chunked(list(incoming)):
+            for chunk_id, day, count, payload in db.query(
+                MetricChunk.id, MetricChunk.day, MetricChunk.point_count, MetricChunk.payload
+            ).filter(MetricChunk.id.in_(ids)):
+                existing[chunk_id] = dict(decode_chunk(day, count, payload).points())
+
+        rows = []
+        for chunk_id, chunk in incoming.items():
+            merged = existing.get(chunk_id, {})
+            merged.update(chunk["points"])
+            rows.append({
+                "id": chunk_id,
+                "site_id": chunk["site_id"],
+                "metric_name": chunk["metric_name"],
+                "day": chunk["day"],
+                "unit": chunk["unit"],
+                "point_count": len(merged),
+                "payload": encode_chunk(chunk["day"], merged)
+            })
+
+        bulk_upsert(db, MetricChunk, rows)
+
+    def read(self, db, site_id, metric_name, start, end) -> Series:
+        first_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        chunks = db.query(MetricChunk.day, MetricChunk.point_count, MetricChunk.payload).filter(
+            MetricChunk.site_id == site_id,
+            MetricChunk.metric_name == metric_name,
+            MetricChunk.day >= first_day,
+            MetricChunk.day < end
+        ).order_by(MetricChunk.day).all()
+
+        timestamps: List[datetime] = []
+        values = array("d")
+        for day, count, payload in chunks:
+            series = decode_chunk(day, count, payload)
+            if start <= day and day + timedelta(days=1) <= end:
+                timestamps.extend(series.timestamps)
+                values.extend(series.values)
+                continue
+            for timestamp, value in series.points():
+                if start <= timestamp < end:
+                    timestamps.append(timestamp)
+                    values.append(value)
+
+        return Series(timestamps, values)
+
+    def pop_expired(self, db, cutoff, limit) -> List[ExpiredPoint]:
+        """Expire whole day chunks that end before the cutoff"""
+        chunks = db.query(
+            MetricChunk.id,
+            MetricChunk.site_id,
+            MetricChunk.metric_name,
+            MetricChunk.day,
+            MetricChunk.point_count,
+            MetricChunk.payload
+        ).filter(
+            MetricChunk.day <= cutoff - timedelta(days=1)
+        ).order_by(MetricChunk.day).limit(max(1, limit // 96)).all()
+
+        expired = []
+        for chunk in chunks:
+            for timestamp, value in decode_chunk(chunk.day, chunk.point_count, chunk.payload).points():
+                expired.append((chunk.site_id, chunk.metric_name, timestamp, value))
+
+        for ids in chunked([chunk.id for chunk in chunks]):
+            db.query(MetricChunk).filter(MetricChunk.id.in_(ids)).delete(synchronize_session=False)
+
+        return expired
+
+
+# Partition tables are not part of Base.metadata; they are created on demand
+partition_metadata = MetaData()
+PARTITION_PREFIX = "timeseries_metrics_"
+PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})_(\d{{2}})$")
+
+
+def partition_table(month: datetime) -> Table:
+    """Table definition for one month of points (same columns as TimeseriesMetric)"""
+    name = f"{PARTITION_PREFIX}{month:%Y_%m}"
+    table = partition_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name,
+            partition_metadata,
+            Column("id", String, primary_key=True),
+            Column("site_id", String, nullable=False),
+            Column("device_id", String, nullable=True),
+            Column("timestamp", DateTime, nullable=False),
+            Column("metric_name", String, nullable=False),
+            Column("value", Float, nullable=False),
+            Column("unit", String, nullable=True),
+            Index(f"idx_{name}_site_metric_time", "site_id", "metric_name", "timestamp"),
+        )
+    return table
+
+
+class PartitionStore(TimeseriesStore):
+    """One row per point, in a table per calendar month"""
+
+    name = "partitioned"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._months: Optional[Set[datetime]] = None
+
+    def months(self, bind=None) -> Set[datetime]:
+        """Months that have a partition table"""
+        with self._lock:
+            if self._months is None:
+                self._months = set()
+                for table_name in inspect(bind or engine).get_table_names():
+                    match = PARTITION_NAME.match(table_name)
+                    if match:
+                        self._months.add(datetime(int(match.group(1)), int(match.group(2)), 1))
+            return set(self._months)
+
+    def _ensure_partition(self, bind, month: datetime) -> Table:
+        table = partition_table(month)
+        if month not in self.months(bind):
+            with self._lock:
+                table.create(bind=bind, checkfirst=True)
+                self._months.add(month)
+            logger.info(f"🗂️  Created timeseries partition {table.name}")
+        return table
+
+    def write(self, db: Session, points: List[Dict[str, Any]]) -> None:
+        by_month: Dict[datetime, List[Dict[str, Any]]] = defaultdict(list)
+        for point in points:
+            month = point["timestamp"].replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            by_month[month].append(point)
+
+        # Create missing partitions before this transaction writes anything;
+        # on SQLite the DDL runs on its own connection and would otherwise
+        # wait on our write lock
+        tables = {month: self._ensure_partition(db.get_bind(), month) for month in by_month}
+
+        for month, rows in by_month.items():
+            table = tables[month]
+            bulk_upsert(db, table, [{column.name: row.get(column.name) for column in table.columns} for row in rows])
+
+    def read(self, db, site_id, metric_name, start, end) -> Series:
+        """Query only the partitions overlapping [start, end)"""
+        existing = self.months(db.get_bind())
+        timestamps: List[datetime] = []
+        values = array("d")
+
+        for month in archive.months_between(start, end):
+            if month not in existing:
+                continue
+            table = partition_table(month)
+            rows = db.execute(
+                select(table.c.timestamp, table.c.value).where(
+                    table.c.site_id == site_id,
+                    table.c.metric_name == metric_name,
+                    table.c.timestamp >= start,
+                    table.c.timestamp < end
+                ).order_by(table.c.timestamp)
+            )
+            for timestamp, value in rows:
+                timestamps.append(timestamp)
+                values.append(value)
+
+        return Series(timestamps, values)
+
+    def expire(self, cutoff: datetime) -> int:
+        """
+        Archive and drop every partition that ends before the cutoff
+
+        Rows are archived in RETENTION_BATCH_SIZE pages (keyset on id), then
+        the whole month goes with one DROP TABLE. The month containing the
+        cutoff is kept until it has fully expired.
+        """
+        total = 0
+        for month in sorted(self.months()):
+            if archive.next_month(month) > cutoff:
+                break
+
+            table = partition_table(month)
+            last_id = ""
+            while True:
+                db = SessionLocal()
+                try:
+                    rows = db.execute(
+                        select(table.c.id, table.c.site_id, table.c.metric_name, table.c.timestamp, table.c.value)
+                        .where(table.c.id > last_id)
+                        .order_by(table.c.id)
+                        .limit(settings.RETENTION_BATCH_SIZE)
+                    ).all()
+                finally:
+                    db.close()
+
+                if not rows:
+                    break
+
+                archive.append("raw", [
+                    (row.site_id, row.metric_name, row.timestamp, (row.value,)) for row in rows
+                ])
+                total += len(rows)
+                last_id = rows[-1].id
+
+            with self._lock:
+                table.drop(bind=engine, checkfirst=True)
+                self._months.discard(month)
+            logger.info(f"🗂️  Dropped timeseries partition {table.name}")
+
+        return total
+
+
+STORES = {
+    RowStore.name: RowStore,
+    ChunkStore.name: ChunkStore,
+    PartitionStore.name: PartitionStore,
+}
+
+# Backends are stateless apart from the partition table cache, so one
+# instance per backend is shared process-wide
+_instances: Dict[str, TimeseriesStore] = {}
+
+
+def get_store() -> TimeseriesStore:
+    """The storage backend selected by TIMESERIES_BACKEND"""
+    name = settings.TIMESERIES_BACKEND
+    store = _instances.get(name)
+    if store is None:
+        store_class = STORES.get(name)
+        if store_class is None:
+            raise ValueError(f"Unknown TIMESERIES_BACKEND: {name}")
+        store = _instances.setdefault(name, store_class())
+    return store
+
+
+def read_series(
+    db: Session,
+    site_id: str,
+    metric_name: str,
+    start: datetime,
+    end: datetime
+) -> Series:
+    """
+    Points with start <= timestamp < end from the database and the archive
+
+    Archive files are only opened for months that have one, so ranges
+    inside the retention window cost a few stat calls at most.
+    """
+    series = get_store().read(db, site_id, metric_name, start, end)
+
+    archived = archive.read("raw", site_id, metric_name, start, end)
+    if not archived:
+        return series
+
+    points = {timestamp: float(values[0]) for timestamp, values in archived.items()}
+    points.update(series.points())
+    timestamps = sorted(points)
+    return Series(timestamps, array("d", (points[timestamp] for timestamp in timestamps)))
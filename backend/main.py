@@ -7,8 +7,11 @@ from contextlib import asynccontextmanager
 import uvicorn
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import dispose_async_engine, init_db
 from app.core.scheduler import start_scheduler, stop_scheduler
+from app.connectors import connector_registry
+from app.services.counters import rebuild_counters
+from app.services.metric_writer import metric_writer
 from app.api import api_router
 
 @asynccontextmanager
@@ -17,6 +20,8 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🌞 Starting SunGazer Backend...")
     init_db()
+    rebuild_counters()  # Before any writer runs, so deltas apply to exact totals
+    metric_writer.start()
     start_scheduler()
     print("✅ Backend ready!")
     
@@ -25,6 +30,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("🌙 Shutting down SunGazer Backend...")
     stop_scheduler()
+    metric_writer.stop()  # After the pollers, so their last points are flushed
+    connector_registry.close_all()
+    await dispose_async_engine()
     print("✅ Shutdown complete")
 
 # Create FastAPI app
@@ -0,0 +1,226 @@
+"""
+Benchmark: sync (threadpool) vs async read endpoints under concurrent load
+
+Starts the API twice in a uvicorn subprocess against the same seeded SQLite
+database - once with the original sync handlers (def + get_db, each request
+holding a threadpool worker) and once with the async handlers in app.api
+(async def + get_async_db) - and drives both with the same number of
+concurrent dashboard clients. Reports throughput and p50/p99 latency.
+
+Usage (from backend/):
+    python -m scripts.benchmark_api [concurrency] [seconds]
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+SITES = 500
+DEVICES_PER_SITE = 20
+ALERTS_PER_SITE = 4
+PAGE_SIZE = 10
+
+# Set before app modules are imported, so both servers use the seeded file
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "serve":
+    os.environ["DATABASE_URL"] = f"sqlite:///{sys.argv[3]}"
+
+
+def baseline_router():
+    """The read endpoints as they were before the async session path"""
+    from fastapi import APIRouter, Depends, HTTPException
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+
+    from app.core.database import get_db
+    from app.models import Alert, Device, Site
+
+    router = APIRouter()
+
+    @router.get("/dashboard/stats")
+    def get_dashboard_stats(db: Session = Depends(get_db)):
+        total_sites = db.query(Site).count()
+        online_sites = db.query(Site).filter(Site.status == "Online").count()
+        sites_with_alerts = db.query(func.count(func.distinct(Alert.site_id)))\
+            .filter(Alert.status == "Active").scalar() or 0
+        total_production_today = db.query(func.sum(Site.daily_production_kwh)).scalar() or 0
+        new_alerts_this_week = db.query(Alert).filter(Alert.status == "Active").count()
+        return {
+            "total_sites": total_sites,
+            "online_sites": online_sites,
+            "sites_with_alerts": sites_with_alerts,
+            "total_production_today_kwh": round(total_production_today, 2),
+            "new_alerts_this_week": new_alerts_this_week
+        }
+
+    @router.get("/sites")
+    def get_all_sites(page: int = 1, page_size: int = 10, db: Session = Depends(get_db)):
+        query = db.query(Site)
+        total_count = query.count()
+        sites = query.offset((page - 1) * page_size).limit(page_size).all()
+        return {
+            "sites": [{"id": site.id, "name": site.name, "status": site.status} for site in sites],
+            "total_count": total_count
+        }
+
+    @router.get("/sites/{site_id}/overview")
+    def get_site_overview(site_id: str, db: Session = Depends(get_db)):
+        site = db.query(Site).filter(Site.id == site_id).first()
+        if not site:
+            raise HTTPException(status_code=404, detail="Site not found")
+        total_devices = db.query(Device).filter(Device.site_id == site_id).count()
+        online_devices = db.query(Device).filter(
+            Device.site_id == site_id,
+            Device.status == "Online"
+        ).count()
+        return {"site_id": site.id, "total_devices": total_devices, "online_devices": online_devices}
+
+    return router
+
+
+def serve(mode: str, port: int) -> None:
+    """Run the API (without the scheduler) in this process"""
+    import uvicorn
+    from fastapi import FastAPI
+    from loguru import logger
+
+    from app.core.database import dispose_async_engine
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        # Pooled aiosqlite connections run on threads that block shutdown
+        await dispose_async_engine()
+
+    logger.remove()
+    app = FastAPI(lifespan=lifespan)
+    if mode == "sync":
+        app.include_router(baseline_router(), prefix="/api")
+    else:
+        from app.api import api_router
+        app.include_router(api_router, prefix="/api")
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def seed(path: str) -> None:
+    """Create the schema and a fleet of sites, devices and alerts"""
+    code = f"""
+import os
+os.environ["DATABASE_URL"] = "sqlite:///{path}"
+from loguru import logger
+logger.remove()
+from datetime import datetime
+from app.core.database import Base, SessionLocal, engine
+from app.models import Alert, Device, Site
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+statuses = ["Online", "Online", "Online", "Warning", "Offline"]
+for i in range({SITES}):
+    db.add(Site(id=f"se_{{i}}", vendor="SolarEdge", vendor_site_id=str(i), name=f"Site {{i}}",
+                status=statuses[i % 5], current_power_kw=1.0, daily_production_kwh=2.0))
+    for d in range({DEVICES_PER_SITE}):
+        db.add(Device(id=f"se_{{i}}_{{d}}", site_id=f"se_{{i}}", vendor="SolarEdge",
+                      vendor_device_id=str(d), device_type="inverter", status=statuses[d % 5]))
+    for a in range({ALERTS_PER_SITE}):
+        db.add(Alert(id=f"se_{{i}}_a{{a}}", site_id=f"se_{{i}}", vendor="SolarEdge", severity="Warning",
+                     code="X", description="Test", status="Active", timestamp=datetime.utcnow()))
+db.commit()
+db.close()
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def random_path() -> str:
+    """One dashboard client request: stats, a page of sites or a site overview"""
+    choice = random.random()
+    if choice < 0.4:
+        return "/api/dashboard/stats"
+    if choice < 0.7:
+        return f"/api/sites?page={random.randint(1, SITES // PAGE_SIZE)}&page_size={PAGE_SIZE}"
+    return f"/api/sites/se_{random.randrange(SITES)}/overview"
+
+
+async def load(base_url: str, concurrency: int, seconds: float) -> dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def client_loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(random_path())
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        "req/s": len(latencies) / seconds,
+        "p50 ms": percentile(0.50),
+        "p99 ms": percentile(0.99),
+        "errors": errors,
+    }
+
+
+def run(mode: str, path: str, concurrency: int, seconds: float) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "scripts.benchmark_api", "serve", mode, path, str(port)]
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        asyncio.run(load(base_url, concurrency, 1))  # Warm up pools
+        return asyncio.run(load(base_url, concurrency, seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(sys.argv[2], int(sys.argv[4]))
+        sys.exit(0)
+
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    seed(path)
+
+    print(f"{concurrency} concurrent clients for {seconds:.0f}s")
+    columns = ["req/s", "p50 ms", "p99 ms", "errors"]
+    print(f"{'handlers':<10}" + "".join(f"{column:>12}" for column in columns))
+    for mode in ("sync", "async"):
+        result = run(mode, path, concurrency, seconds)
+        print(f"{mode:<10}" + "".join(f"{result[column]:>12,.1f}" for column in columns))
@@ -0,0 +1,167 @@
+"""
+Benchmark: default SQLite engine vs the production profile under concurrent load
+
+A writer thread commits batches of timeseries points (like the metric
+writer) while reader threads run dashboard-style queries at a fixed rate
+(a slow read falls behind rather than being skipped). Reports reader
+throughput and latency, "database is locked" errors and writer throughput
+for the original engine settings and for the WAL profile in
+app.core.database.
+
+Usage (from backend/):
+    python -m scripts.benchmark_sqlite [readers] [seconds]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.bulk import bulk_upsert
+from app.core.config import settings
+from app.core.database import Base, apply_sqlite_profile
+from app.models import Site, TimeseriesMetric
+
+SITES = 500
+WRITE_BATCH = 2000
+READS_PER_SECOND = 25  # Per reader thread, so both profiles get the same offered load
+
+
+def make_engine(profile: str, path: str):
+    url = f"sqlite:///{path}"
+    if profile == "default":
+        # The engine as originally configured: rollback journal, default pool
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    event.listen(engine, "connect", apply_sqlite_profile)
+    return engine
+
+
+def seed(Session):
+    db = Session()
+    statuses = ["Online", "Online", "Online", "Warning", "Offline"]
+    db.add_all([
+        Site(id=f"se_{i}", vendor="SolarEdge", vendor_site_id=str(i), name=f"Site {i}",
+             status=statuses[i % len(statuses)], current_power_kw=1.0, daily_production_kwh=2.0)
+        for i in range(SITES)
+    ])
+    db.commit()
+    db.close()
+
+
+def writer(Session, stop: threading.Event, stats: dict):
+    start = datetime(2024, 1, 1)
+    step = 0
+    while not stop.is_set():
+        rows = []
+        for _ in range(WRITE_BATCH):
+            site_id = f"se_{step % SITES}"
+            timestamp = start + timedelta(minutes=15 * (step // SITES))
+            rows.append({
+                "id": f"{site_id}:energy:{timestamp.isoformat()}",
+                "site_id": site_id,
+                "device_id": None,
+                "timestamp": timestamp,
+                "metric_name": "energy",
+                "value": 0.25,
+                "unit": "kWh"
+            })
+            step += 1
+
+        db = Session()
+        try:
+            bulk_upsert(db, TimeseriesMetric, rows)
+            db.commit()
+            stats["points"] += len(rows)
+        except OperationalError:
+            db.rollback()
+            stats["write_errors"] += 1
+        finally:
+            db.close()
+
+
+def reader(Session, stop: threading.Event, latencies: list, stats: dict):
+    interval = 1 / READS_PER_SECOND
+    next_read = time.perf_counter()
+    while not stop.is_set():
+        next_read += interval
+        pause = next_read - time.perf_counter()
+        if pause > 0:
+            time.sleep(pause)
+
+        started = time.perf_counter()
+        db = Session()
+        try:
+            db.query(Site.status, func.count(Site.id)).group_by(Site.status).all()
+            db.query(func.sum(Site.current_power_kw)).scalar()
+            site_id = f"se_{random.randrange(SITES)}"
+            db.query(TimeseriesMetric.timestamp, TimeseriesMetric.value).filter(
+                TimeseriesMetric.site_id == site_id,
+                TimeseriesMetric.metric_name == "energy"
+            ).order_by(TimeseriesMetric.timestamp.desc()).limit(96).all()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            stats["read_errors"] += 1
+        finally:
+            db.close()
+
+
+def run(profile: str, readers: int, seconds: float):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = make_engine(profile, path)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    seed(Session)
+
+    stop = threading.Event()
+    stats = {"points": 0, "write_errors": 0, "read_errors": 0}
+    latencies = []
+
+    threads = [threading.Thread(target=writer, args=(Session, stop, stats))]
+    threads += [threading.Thread(target=reader, args=(Session, stop, latencies, stats)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        "reads/s": len(latencies) / seconds,
+        "p50 ms": percentile(0.50),
+        "p99 ms": percentile(0.99),
+        "read errs": stats["read_errors"],
+        "points/s": stats["points"] / seconds,
+        "write errs": stats["write_errors"],
+    }
+
+
+if __name__ == "__main__":
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f"{readers} readers + 1 writer for {seconds:.0f}s")
+    columns = ["reads/s", "p50 ms", "p99 ms", "read errs", "points/s", "write errs"]
+    print(f"{'profile':<10}" + "".join(f"{column:>12}" for column in columns))
+    for profile in ("default", "wal"):
+        result = run(profile, readers, seconds)
+        print(f"{profile:<10}" + "".join(f"{result[column]:>12,.1f}" for column in columns))
@@ -0,0 +1,100 @@
+"""
+Benchmark: row-per-point vs chunked timeseries storage
+
+Writes a year of 15-minute energy data per site into a throwaway SQLite
+file with each TIMESERIES_BACKEND (rows, chunks, partitioned) and reports
+the file size, write time and the time to read the whole year back.
+
+Usage (from backend/):
+    python -m scripts.benchmark_timeseries [sites]
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Site
+from app.services.data_service import metric_point_id
+from app.services.timeseries_store import STORES
+
+DAYS = 365
+INTERVAL = timedelta(minutes=15)
+# Points per transaction - one SolarEdge quarter-hour request window
+BATCH_DAYS = 28
+
+
+def make_points(site_id: str, start: datetime, days: int):
+    points = []
+    for step in range(int(timedelta(days=days) / INTERVAL)):
+        timestamp = start + step * INTERVAL
+        hour = timestamp.hour + timestamp.minute / 60
+        value = max(0.0, math.sin((hour - 6) / 12 * math.pi)) * 1.25
+        points.append({
+            "id": metric_point_id(site_id, "energy", timestamp),
+            "site_id": site_id,
+            "device_id": None,
+            "timestamp": timestamp,
+            "metric_name": "energy",
+            "value": round(value, 3),
+            "unit": "kWh"
+        })
+    return points
+
+
+def run(store_class, sites: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    store = store_class()
+
+    db = Session()
+    site_ids = [f"se_{i}" for i in range(sites)]
+    for site_id in site_ids:
+        db.add(Site(id=site_id, vendor="SolarEdge", vendor_site_id=site_id, name="Bench"))
+    db.commit()
+
+    year_start = datetime(2024, 1, 1)
+    started = time.perf_counter()
+    for site_id in site_ids:
+        for offset in range(0, DAYS, BATCH_DAYS):
+            start = year_start + timedelta(days=offset)
+            store.write(db, make_points(site_id, start, min(BATCH_DAYS, DAYS - offset)))
+            db.commit()
+    write_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    points = sum(
+        len(store.read(db, site_id, "energy", year_start, year_start + timedelta(days=DAYS)).timestamps)
+        for site_id in site_ids
+    )
+    read_seconds = time.perf_counter() - started
+    db.close()
+
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    engine.dispose()
+
+    return os.path.getsize(path), write_seconds, read_seconds, points
+
+
+if __name__ == "__main__":
+    sites = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    logger.disable("app")
+
+    print(f"One year of 15-minute data for {sites} site(s)")
+    print(f"{'backend':<10}{'size (KB)':>12}{'write (s)':>12}{'read (s)':>12}{'points':>10}")
+    sizes = {}
+    for name, store_class in STORES.items():
+        size, write_seconds, read_seconds, points = run(store_class, sites)
+        sizes[name] = size
+        print(f"{name:<10}{size / 1024:>12,.0f}{write_seconds:>12.2f}{read_seconds:>12.2f}{points:>10,}")
+
+    print(f"rows/chunks size ratio: {sizes['rows'] / sizes['chunks']:.1f}x")
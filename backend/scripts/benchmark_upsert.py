@@ -0,0 +1,93 @@
+"""
+Benchmark: per-row ORM upsert vs set-based bulk upsert
+
+Runs against a throwaway SQLite file and reports rows/sec for the initial
+insert and for a re-poll that updates every row.
+
+Usage (from backend/):
+    python -m scripts.benchmark_upsert [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.bulk import bulk_upsert
+from app.core.database import Base
+from app.models import Site, Device
+
+
+def make_rows(count: int, status: str):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": f"en_micro_{i}",
+            "site_id": "en_1",
+            "vendor": "Enphase",
+            "vendor_device_id": str(i),
+            "device_type": "microinverter",
+            "model": "IQ8",
+            "manufacturer": "Enphase",
+            "serial_number": str(i),
+            "status": status,
+            "created_at": now,
+            "last_reported": now
+        }
+        for i in range(count)
+    ]
+
+
+def per_row_upsert(db, rows):
+    """The original DataService loop: one SELECT per row, then setattr"""
+    for row in rows:
+        device = Device(**row)
+        existing = db.query(Device).filter(Device.id == device.id).first()
+        if existing:
+            for key, value in device.__dict__.items():
+                if not key.startswith('_'):
+                    setattr(existing, key, value)
+        else:
+            db.add(device)
+    db.commit()
+
+
+def set_based_upsert(db, rows):
+    bulk_upsert(db, Device, rows)
+    db.commit()
+
+
+def run(strategy, count: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    db.add(Site(id="en_1", vendor="Enphase", vendor_site_id="1", name="Bench"))
+    db.commit()
+
+    results = []
+    for status in ("Online", "Offline"):  # insert, then update every row
+        rows = make_rows(count, status)
+        start = time.perf_counter()
+        strategy(db, rows)
+        results.append(count / (time.perf_counter() - start))
+        db.expunge_all()
+
+    db.close()
+    engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    print(f"Upserting {count} devices (rows/sec)")
+    print(f"{'strategy':<12}{'insert':>12}{'update':>12}")
+    for name, strategy in (("per-row", per_row_upsert), ("bulk", set_based_upsert)):
+        insert_rate, update_rate = run(strategy, count)
+        print(f"{name:<12}{insert_rate:>12,.0f}{update_rate:>12,.0f}")
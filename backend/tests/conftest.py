@@ -0,0 +1,141 @@
+"""
+Shared test setup
+
+Every test session runs against its own SQLite database, archive directory
+and cache file in a temporary directory. The environment is set before any
+app module is imported, since settings are read at import time. Tables and
+the in-process caches are emptied after each test.
+
+The connector fixture swaps the vendor connectors for a FakeConnector, so
+tests drive DataService without network access.
+"""
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="sungazer-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["ARCHIVE_DIR"] = os.path.join(TEST_DIR, "archive")
+os.environ["CACHE_SQLITE_PATH"] = os.path.join(TEST_DIR, "cache.db")
+
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from loguru import logger
+
+from app.connectors.registry import connector_registry
+from app.core.database import Base, SessionLocal, engine, init_db
+from app.services.power_flow_cache import power_flow_cache
+from app.services.result_cache import get_cache
+
+
+class FakeConnector:
+    """
+    In-memory stand-in for a vendor connector
+
+    Serves `sites` (site_id -> overview), `statuses` (site_id -> listed
+    status), `devices` (site_id -> raw devices) and `energy` (site_id ->
+    points), and counts calls per method in `calls`. Sites listed in
+    `missing` are left out of bulk overviews, as vendors do for sites they
+    no longer report.
+    """
+
+    def __init__(self, vendor="Generac", overview_batch_size=1):
+        self.vendor = vendor
+        self.overview_batch_size = overview_batch_size
+        self.energy_window = timedelta(days=30)
+        self.energy_time_unit = None
+        self.sites = {}
+        self.missing = set()
+        self.statuses = {}
+        self.devices = {}
+        self.energy = {}
+        self.calls = Counter()
+
+    def get_sites(self):
+        self.calls["get_sites"] += 1
+        return [
+            {
+                "id": site_id,
+                "vendor": self.vendor,
+                "vendor_site_id": site_id,
+                "name": site_id,
+                "status": self.statuses.get(site_id, "Online"),
+            }
+            for site_id in self.sites
+        ]
+
+    def get_site_overview(self, site_id):
+        self.calls["get_site_overview"] += 1
+        return dict(self.sites[site_id])
+
+    def get_sites_overview(self, site_ids):
+        self.calls["get_sites_overview"] += 1
+        return {
+            site_id: dict(self.sites[site_id])
+            for site_id in site_ids
+            if site_id in self.sites and site_id not in self.missing
+        }
+
+    def get_devices(self, site_id):
+        self.calls["get_devices"] += 1
+        return [dict(device) for device in self.devices.get(site_id, [])]
+
+    def get_site_energy(self, site_id, start_date, end_date, **options):
+        self.calls["get_site_energy"] += 1
+        return [
+            {"timestamp": timestamp.isoformat(), "value": value}
+            for timestamp, value in self.energy.get(site_id, [])
+            if start_date <= timestamp < end_date
+        ]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    logger.remove()
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    get_cache().clear()
+    power_flow_cache.clear()
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    fake = FakeConnector()
+    monkeypatch.setattr(connector_registry, "get", lambda vendor, api_key: fake)
+    return fake
+
+
+@pytest.fixture
+def client():
+    """
+    API client on one event loop (pooled async connections are bound to
+    it), without the app's startup: no scheduler or writer thread
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import api_router
+    from app.core.database import dispose_async_engine
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(dispose_async_engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,107 @@
+"""
+Alerts API: projected listing pages and the faceted summary
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core import database
+from app.models import Alert
+from app.services.counters import CounterDeltas
+from app.services.data_service import DataService
+
+
+@pytest.fixture
+def alerts(db, connector):
+    """Two sites with five alerts: (id, site, severity, status), newest last"""
+    connector.sites = {"site-1": {}, "site-2": {}}
+    DataService(db).fetch_all_sites("Generac", "key")
+
+    rows = [
+        ("a1", "site-1", "Critical", "Active"),
+        ("a2", "site-1", "Warning", "Active"),
+        ("a3", "site-2", "Warning", "Resolved"),
+        ("a4", "site-2", "Info", "Active"),
+        ("a5", "site-2", "Warning", "Acknowledged"),
+    ]
+    start = datetime(2026, 3, 1)
+    counters = CounterDeltas()
+    for n, (alert_id, site_id, severity, status) in enumerate(rows):
+        db.add(Alert(
+            id=alert_id, site_id=site_id, vendor="Generac", severity=severity, code="X",
+            description="Test", status=status, timestamp=start + timedelta(hours=n)
+        ))
+        counters.record_alert_status(site_id, None, status)
+    counters.apply(db)
+    db.commit()
+    return rows
+
+
+@pytest.fixture
+def statements():
+    """SQL statements run on the async engine"""
+    executed = []
+
+    def listener(connection, cursor, statement, *args):
+        executed.append(statement)
+
+    sync_engine = database.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(sync_engine, "before_cursor_execute", listener)
+
+
+def test_listing_pages_newest_first_with_site_names(client, alerts):
+    first = client.get("/api/alerts", params={"page_size": 3}).json()
+    assert [alert["id"] for alert in first["alerts"]] == ["a5", "a4", "a3"]
+    assert first["alerts"][0]["site_name"] == "site-2"
+    assert first["alerts"][0]["timestamp"] == "2026-03-01T04:00:00"
+    assert first["pagination"]["has_next"]
+    assert first["pagination"]["total_count"] is None
+
+    second = client.get(
+        "/api/alerts", params={"page_size": 3, "cursor": first["pagination"]["next_cursor"]}
+    ).json()
+    assert [alert["id"] for alert in second["alerts"]] == ["a2", "a1"]
+    assert second["pagination"]["next_cursor"] is None
+
+
+def test_listing_totals(client, alerts):
+    active = client.get("/api/alerts", params={"status": "Active"}).json()
+    assert [alert["id"] for alert in active["alerts"]] == ["a4", "a2", "a1"]
+    assert active["pagination"]["total_count"] == 3  # From the counters
+
+    warnings = client.get("/api/alerts", params={"severity": "Warning", "include_total": True}).json()
+    assert warnings["pagination"]["total_count"] == 3
+
+
+def test_listing_page_is_one_query(client, alerts, statements):
+    client.get("/api/alerts", params={"page_size": 2})
+    assert len(statements) == 1
+
+
+def test_summary_facets(client, alerts, statements):
+    summary = client.get("/api/alerts/summary").json()
+    assert summary == {
+        "total": 5,
+        "severity": {"Critical": 1, "Warning": 3, "Info": 1},
+        "status": {"Active": 3, "Resolved": 1, "Acknowledged": 1},
+        "vendor": {"Generac": 5},
+    }
+    assert len(statements) == 1
+
+    filtered = client.get("/api/alerts/summary", params={"status": "Active"}).json()
+    assert filtered["total"] == 3
+    assert filtered["severity"] == {"Critical": 1, "Warning": 1, "Info": 1}
+
+
+def test_summary_is_cached_until_an_alert_changes(client, alerts, statements):
+    client.get("/api/alerts/summary")
+    client.get("/api/alerts/summary")
+    assert len(statements) == 1
+
+    assert client.patch("/api/alerts/a1/resolve").status_code == 200
+    summary = client.get("/api/alerts/summary").json()
+    assert summary["status"] == {"Active": 2, "Resolved": 2, "Acknowledged": 1}
+    assert client.patch("/api/alerts/missing/acknowledge").status_code == 404
@@ -0,0 +1,42 @@
+"""
+Read API: async endpoints on the lazily created async engine
+"""
+import pytest
+
+from app.core import database
+from app.services.data_service import DataService
+
+
+@pytest.fixture
+def fleet(db, connector):
+    connector.sites = {f"site-{n}": {"current_power_kw": float(n)} for n in range(3)}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+    for site_id in connector.sites:
+        service.fetch_site_overview(site_id, "Generac", "key")
+
+
+def test_missing_async_driver_fails_on_use_not_import(monkeypatch):
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "async_database_url", lambda: "postgresql+asyncpg://user@localhost/sungazer")
+    try:
+        import asyncpg  # noqa: F401
+        pytest.skip("asyncpg is installed")
+    except ImportError:
+        pass
+
+    with pytest.raises(RuntimeError, match="ASYNC_DATABASE_URL"):
+        database.get_async_engine()
+    assert database._async_engine is None
+
+
+def test_async_read_endpoints(client, fleet):
+    sites = client.get("/api/sites").json()
+    assert [site["id"] for site in sites["sites"]] == ["site-0", "site-1", "site-2"]
+    assert sites["pagination"]["total_count"] == 3
+
+    overview = client.get("/api/sites/site-2/overview")
+    assert overview.status_code == 200
+
+    assert client.get("/api/sites/missing").status_code == 404
+    assert client.get("/api/dashboard/stats").json()["total_sites"] == 3
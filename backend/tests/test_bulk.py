@@ -0,0 +1,59 @@
+"""
+Bulk writes: set-based upserts and increments on every code path
+"""
+import pytest
+
+from app.core.bulk import bulk_increment, bulk_upsert, chunked
+from app.core.database import engine
+from app.models import Counter, Site
+
+
+@pytest.fixture(params=["native", "portable"])
+def path(request, monkeypatch):
+    if request.param == "portable":
+        # Any dialect without ON CONFLICT support takes the portable path
+        monkeypatch.setattr(engine.dialect, "name", "portable")
+    return request.param
+
+
+def site_row(site_id, name, status="Online"):
+    return {"id": site_id, "vendor": "Generac", "vendor_site_id": site_id, "name": name, "status": status}
+
+
+def test_chunked_splits_in_order():
+    assert list(chunked(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_bulk_upsert_inserts_and_updates(db, path):
+    bulk_upsert(db, Site, [site_row("site-1", "One")])
+    db.commit()
+
+    bulk_upsert(db, Site, [site_row("site-1", "Renamed"), site_row("site-2", "Two")])
+    db.commit()
+
+    db.expire_all()
+    assert {site.id: site.name for site in db.query(Site)} == {"site-1": "Renamed", "site-2": "Two"}
+
+
+def test_bulk_upsert_only_overwrites_update_columns(db, path):
+    bulk_upsert(db, Site, [site_row("site-1", "One", "Online")])
+    db.commit()
+
+    bulk_upsert(db, Site, [site_row("site-1", "Renamed", "Offline")], update_columns=["status"])
+    db.commit()
+
+    db.expire_all()
+    site = db.get(Site, "site-1")
+    assert (site.name, site.status) == ("One", "Offline")
+
+
+def test_bulk_increment_adds_to_existing_rows(db, path):
+    row = {"id": "fleet:sites", "scope": "fleet", "name": "sites", "value": 2.0}
+    bulk_increment(db, Counter, [row], ["value"])
+    db.commit()
+
+    bulk_increment(db, Counter, [dict(row, value=3.0)], ["value"])
+    db.commit()
+
+    db.expire_all()
+    assert db.get(Counter, "fleet:sites").value == 5.0
@@ -0,0 +1,91 @@
+"""
+Counters: deltas maintained on write match a full recount
+"""
+from datetime import datetime
+
+from app.models import Alert, Counter
+from app.services.counters import (
+    ALERTS_ACTIVE, DEVICES, DEVICES_ONLINE, FLEET, PRODUCTION_TODAY, SITES, SITES_WITH_ALERTS, VERSION,
+    CounterDeltas, counter_id, rebuild_counters, sites_with_status
+)
+from app.services.data_service import DataService
+
+
+def snapshot(db):
+    db.expire_all()
+    return {
+        (counter.scope, counter.name): counter.value
+        for counter in db.query(Counter)
+        if counter.name != VERSION and counter.value
+    }
+
+
+def device(device_id, status):
+    return {"id": device_id, "vendor_device_id": device_id, "device_type": "inverter", "status": status}
+
+
+def set_alert(db, alert_id, site_id, status):
+    """Create or update an alert the way the alerts API does"""
+    alert = db.get(Alert, alert_id)
+    previous = alert.status if alert else None
+    if alert is None:
+        alert = Alert(
+            id=alert_id, site_id=site_id, vendor="Generac", severity="Warning", code="X",
+            description="Test", timestamp=datetime.utcnow()
+        )
+        db.add(alert)
+    alert.status = status
+    counters = CounterDeltas()
+    counters.record_alert_status(site_id, previous, status)
+    counters.apply(db)
+    db.commit()
+
+
+def test_incremental_counters_match_a_rebuild(db, connector):
+    connector.sites = {"site-1": {"daily_energy_kwh": 4.0}, "site-2": {"daily_energy_kwh": 6.0}}
+    connector.statuses = {"site-2": "Offline"}
+    connector.devices = {"site-1": [device("d1", "Online"), device("d2", "Offline")]}
+    service = DataService(db)
+
+    service.fetch_all_sites("Generac", "key")
+    for site_id in connector.sites:
+        service.fetch_site_overview(site_id, "Generac", "key")
+        service.fetch_site_devices(site_id, "Generac", "key")
+
+    # Status flips, a device comes online, production grows, alerts change
+    connector.statuses = {"site-1": "Warning"}
+    connector.devices["site-1"][1]["status"] = "Online"
+    connector.sites["site-1"]["daily_energy_kwh"] = 5.5
+    service.fetch_all_sites("Generac", "key", force=True)
+    service.fetch_site_overview("site-1", "Generac", "key", force=True)
+    service.fetch_site_devices("site-1", "Generac", "key", force=True)
+    set_alert(db, "a1", "site-1", "Active")
+    set_alert(db, "a2", "site-1", "Active")
+    set_alert(db, "a3", "site-2", "Active")
+    set_alert(db, "a1", "site-1", "Resolved")
+    set_alert(db, "a3", "site-2", "Acknowledged")
+
+    incremental = snapshot(db)
+    assert incremental[(FLEET, SITES)] == 2
+    assert incremental[(FLEET, sites_with_status("Warning"))] == 1
+    assert incremental[(FLEET, sites_with_status("Online"))] == 1
+    assert incremental[(FLEET, PRODUCTION_TODAY)] == 11.5
+    assert incremental[("site-1", DEVICES)] == 2
+    assert incremental[("site-1", DEVICES_ONLINE)] == 2
+    assert incremental[("site-1", ALERTS_ACTIVE)] == 1
+    assert incremental[(FLEET, SITES_WITH_ALERTS)] == 1
+
+    rebuild_counters()
+    assert snapshot(db) == incremental
+
+
+def test_rebuild_keeps_versions(db, connector):
+    connector.sites = {"site-1": {}}
+    DataService(db).fetch_all_sites("Generac", "key")
+    db.expire_all()
+    version = db.get(Counter, counter_id(FLEET, VERSION)).value
+
+    rebuild_counters()
+
+    db.expire_all()
+    assert db.get(Counter, counter_id(FLEET, VERSION)).value == version > 0
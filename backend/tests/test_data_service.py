@@ -0,0 +1,88 @@
+"""
+DataService: bulk overviews, site listings and change detection
+"""
+from datetime import datetime
+
+from app.models import ApiKey, Counter, Site
+from app.services.counters import FLEET, counter_id, sites_with_status
+from app.services.data_service import REMOVED_STATUS, DataService, fingerprint, write_stats
+from app.services.fetch_tracker import FetchTracker
+from app.services.poller import FleetPoller
+
+
+def test_bulk_overview_holds_back_sites_missing_from_response(db, connector):
+    connector.overview_batch_size = 100
+    connector.sites = {"site-1": {"current_power_kw": 2.0}, "site-2": {"current_power_kw": 3.0}}
+    connector.missing = {"site-2"}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+
+    service.fetch_sites_overview(["site-1", "site-2"], "Generac", "key")
+    assert connector.calls["get_sites_overview"] == 1
+
+    tracker = FetchTracker(db)
+    assert tracker.get("Generac", "site-1", "overview").last_status == "success"
+    assert tracker.get("Generac", "site-2", "overview").last_status == "no_data"
+    assert tracker.is_cooling_down("Generac", "site-2", "overview")
+
+    # The missing site is not requested again on the next tick
+    service.fetch_sites_overview(["site-2"], "Generac", "key", force=True)
+    assert connector.calls["get_sites_overview"] == 1
+
+
+def test_sites_dropped_from_listing_are_removed_and_unscheduled(db, connector):
+    connector.sites = {"site-1": {}, "site-2": {}}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+
+    del connector.sites["site-2"]
+    service.fetch_all_sites("Generac", "key", force=True)
+
+    db.expire_all()
+    assert db.get(Site, "site-2").status == REMOVED_STATUS
+    assert db.get(Site, "site-1").status != REMOVED_STATUS
+    assert db.get(Counter, counter_id(FLEET, sites_with_status(REMOVED_STATUS))).value == 1
+    db.add(ApiKey(id="generac", vendor="Generac", key_encrypted="key", key_masked="***key"))
+    db.commit()
+    scheduled = {unit.site_id for group in FleetPoller()._plan(db) for unit in group}
+    assert "site-2" not in scheduled
+
+    # Listed again: restored in full
+    connector.sites["site-2"] = {}
+    service.fetch_all_sites("Generac", "key", force=True)
+    db.expire_all()
+    assert db.get(Site, "site-2").status != REMOVED_STATUS
+
+
+def test_empty_listing_prunes_nothing(db, connector):
+    connector.sites = {"site-1": {}}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+
+    connector.sites = {}
+    service.fetch_all_sites("Generac", "key", force=True)
+
+    db.expire_all()
+    assert db.get(Site, "site-1").status != REMOVED_STATUS
+
+
+def test_fingerprint_ignores_bookkeeping_timestamps():
+    row = {"id": "site-1", "name": "One", "last_updated": datetime(2026, 1, 1)}
+
+    assert fingerprint(row) == fingerprint(dict(row, last_updated=datetime(2026, 2, 1)))
+    assert fingerprint(row) != fingerprint(dict(row, name="Renamed"))
+    assert fingerprint(row, ["id"]) == fingerprint(dict(row, name="Renamed"), ["id"])
+
+
+def test_unchanged_listing_is_not_rewritten(db, connector):
+    connector.sites = {"site-1": {}, "site-2": {}}
+    service = DataService(db)
+    write_stats.snapshot(reset=True)
+
+    service.fetch_all_sites("Generac", "key")
+    first_write = db.get(Site, "site-1").last_updated
+    service.fetch_all_sites("Generac", "key", force=True)
+
+    db.expire_all()
+    assert db.get(Site, "site-1").last_updated == first_write
+    assert write_stats.snapshot(reset=True)["sites"] == {"changed": 2, "unchanged": 2}
@@ -0,0 +1,35 @@
+"""
+Database setup: SQLite performance profile and maintenance
+"""
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine, maintain_database
+
+
+def pragma(connection, name):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_every_connection_gets_the_sqlite_profile():
+    with engine.connect() as connection:
+        assert pragma(connection, "journal_mode").upper() == settings.SQLITE_JOURNAL_MODE
+        assert pragma(connection, "synchronous") == 1  # NORMAL
+        assert pragma(connection, "busy_timeout") == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert pragma(connection, "cache_size") == -settings.SQLITE_CACHE_SIZE_KB
+        assert pragma(connection, "temp_store") == 2  # MEMORY
+
+
+def test_maintenance_truncates_the_wal(db):
+    db.execute(text("CREATE TABLE IF NOT EXISTS wal_filler (value TEXT)"))
+    db.execute(text("INSERT INTO wal_filler VALUES (:value)"), [{"value": "x" * 1000}] * 200)
+    db.commit()
+    db.close()
+
+    maintain_database()
+
+    with engine.connect() as connection:
+        busy, wal_pages, _ = connection.execute(text("PRAGMA wal_checkpoint(PASSIVE)")).one()
+        connection.execute(text("DROP TABLE wal_filler"))
+        connection.commit()
+    assert (busy, wal_pages) == (0, 0)
@@ -0,0 +1,111 @@
+"""
+Energy ingestion: incremental fetches behind a per-site high-water mark
+"""
+from datetime import datetime, timedelta
+import base64
+import json
+
+import pytest
+import requests
+
+from app.connectors.enphase import EnphaseConnector
+from app.connectors.generac import GeneracConnector
+from app.connectors.solaredge import SolarEdgeConnector
+from app.core.database import SessionLocal
+from app.models import MetricWatermark
+from app.services.data_service import DataService
+from app.services.timeseries_store import get_store
+
+
+def hours_ago(hours):
+    return datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+
+
+def stored_energy(site_id):
+    db = SessionLocal()
+    try:
+        return list(get_store().read(db, site_id, "energy", hours_ago(24 * 30), hours_ago(-24)).points())
+    finally:
+        db.close()
+
+
+def test_first_ingestion_backfills_and_sets_watermark(db, connector):
+    connector.sites = {"site-1": {}}
+    connector.energy = {"site-1": [(hours_ago(3), 1.0), (hours_ago(2), 2.0)]}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+
+    assert service.fetch_site_energy("site-1", "Generac", "key") == 2
+
+    assert [value for _, value in stored_energy("site-1")] == [1.0, 2.0]
+    db.expire_all()
+    assert db.get(MetricWatermark, "site-1:energy").high_water_mark == hours_ago(2)
+
+
+def test_next_ingestion_starts_at_the_watermark(db, connector):
+    connector.sites = {"site-1": {}}
+    connector.energy = {"site-1": [(hours_ago(3), 1.0), (hours_ago(2), 2.0)]}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+    service.fetch_site_energy("site-1", "Generac", "key")
+
+    # The open interval is re-fetched (and updated); older ones are not
+    connector.energy["site-1"] = [(hours_ago(3), 9.0), (hours_ago(2), 2.5), (hours_ago(1), 3.0)]
+    assert service.fetch_site_energy("site-1", "Generac", "key", force=True) == 2
+
+    assert [value for _, value in stored_energy("site-1")] == [1.0, 2.5, 3.0]
+    db.expire_all()
+    assert db.get(MetricWatermark, "site-1:energy").high_water_mark == hours_ago(1)
+
+
+def test_failed_window_is_not_skipped(db, connector):
+    connector.sites = {"site-1": {}}
+    connector.energy_window = timedelta(days=1)
+    connector.energy = {"site-1": [(hours_ago(24 * 5), 1.0), (hours_ago(2), 2.0)]}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+
+    # The third backfill window times out
+    answer = connector.get_site_energy
+    calls = []
+
+    def flaky_energy(site_id, start_date, end_date, **options):
+        calls.append(start_date)
+        if len(calls) == 3:
+            raise TimeoutError("read timed out")
+        return answer(site_id, start_date, end_date, **options)
+
+    connector.get_site_energy = flaky_energy
+    assert service.fetch_site_energy("site-1", "Generac", "key") == 1
+
+    db.expire_all()
+    assert db.get(MetricWatermark, "site-1:energy").high_water_mark == calls[2]
+    assert service.fetch_tracker.is_fresh("Generac", "site-1", "energy") is False
+
+    # The next run resumes at the failed window
+    assert service.fetch_site_energy("site-1", "Generac", "key", force=True) == 1
+    assert calls[3] == calls[2]
+    assert [value for _, value in stored_energy("site-1")] == [1.0, 2.0]
+
+
+GENERAC_CREDENTIALS = base64.b64encode(json.dumps({"user_id": "1", "access_token": "token"}).encode()).decode()
+
+
+@pytest.mark.parametrize("connector_class, api_key", [
+    (EnphaseConnector, "token"),
+    (GeneracConnector, GENERAC_CREDENTIALS),
+    (SolarEdgeConnector, "key"),
+])
+def test_connectors_raise_on_failed_energy_requests(connector_class, api_key, monkeypatch):
+    vendor_connector = connector_class(api_key)
+
+    def timeout(*args, **kwargs):
+        raise requests.Timeout("read timed out")
+
+    monkeypatch.setattr(vendor_connector, "_make_request", timeout)
+    with pytest.raises(requests.Timeout):
+        vendor_connector.get_site_energy("site-1", hours_ago(48), hours_ago(24))
+
+    # An answer without data is an empty window, not an error
+    monkeypatch.setattr(vendor_connector, "_make_request", lambda *args, **kwargs: {})
+    assert vendor_connector.get_site_energy("site-1", hours_ago(48), hours_ago(24)) == []
@@ -0,0 +1,112 @@
+"""
+Change events: the replay buffer and the SSE stream
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from app.api import events
+from app.core.config import settings
+from app.services.event_bus import ALERT_EVENT, RESET_EVENT, SITE_EVENT, EventBus
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_BUFFER_SIZE", 3)
+    bus = EventBus()
+    monkeypatch.setattr(events, "event_bus", bus)
+    return bus
+
+
+def publish(bus, count, kind=SITE_EVENT):
+    for n in range(count):
+        bus.publish(kind, [{"id": f"site-{n}"}])
+
+
+def parse(message):
+    """Fields of one SSE message"""
+    return dict(line.split(": ", 1) for line in message.strip().split("\n") if not line.startswith(":"))
+
+
+async def read(last_event_id, count, after=None):
+    """First count messages of a stream, after the retry line; after() runs once it waits"""
+    stream = events.event_stream(last_event_id)
+    try:
+        assert (await stream.__anext__()).startswith("retry: ")
+        if after:
+            asyncio.get_running_loop().call_later(0.05, after)
+        return [await asyncio.wait_for(stream.__anext__(), timeout=2) for _ in range(count)]
+    finally:
+        await stream.aclose()
+
+
+def test_publish_serializes_and_sequences(bus):
+    bus.publish(SITE_EVENT, [])
+    assert bus.head() == 0
+
+    bus.publish(ALERT_EVENT, [{"id": "a1", "resolved_at": datetime(2026, 3, 1, 12)}])
+    [event] = bus.since(0)
+    assert (event.sequence, event.kind) == (1, ALERT_EVENT)
+    assert json.loads(event.data) == [{"id": "a1", "resolved_at": "2026-03-01T12:00:00"}]
+
+
+def test_event_ids_belong_to_one_epoch(bus):
+    assert bus.parse_id(bus.event_id(7)) == 7
+    assert bus.parse_id("1-7") is None
+    assert bus.parse_id(f"{bus.epoch}-x") is None
+    assert bus.parse_id(f"{bus.epoch}--1") is None
+    assert bus.parse_id("") is None
+    assert bus.parse_id(None) is None
+
+
+def test_since_replays_buffered_events(bus):
+    assert bus.since(0) == []
+    publish(bus, 5)
+
+    assert [event.sequence for event in bus.since(2)] == [3, 4, 5]
+    assert bus.since(5) == []
+    assert bus.since(1) is None  # Event 2 has left the buffer
+    assert bus.since(6) is None  # From the future: another process or a restart
+
+
+def test_stream_replays_after_last_event_id(bus):
+    publish(bus, 3)
+    messages = asyncio.run(read(bus.event_id(1), 2))
+
+    assert [parse(message)["id"] for message in messages] == [bus.event_id(2), bus.event_id(3)]
+    assert json.loads(parse(messages[0])["data"]) == [{"id": "site-1"}]
+
+
+def test_stream_delivers_new_events(bus):
+    publish(bus, 2)
+    [message] = asyncio.run(read(None, 1, after=lambda: bus.publish(ALERT_EVENT, [{"id": "a1"}])))
+
+    assert parse(message) == {"id": bus.event_id(3), "event": ALERT_EVENT, "data": '[{"id": "a1"}]'}
+
+
+@pytest.mark.parametrize("last_event_id", ["1-1", "garbage"])
+def test_stream_resets_unknown_ids(bus, last_event_id):
+    publish(bus, 2)
+    [message] = asyncio.run(read(last_event_id, 1))
+
+    assert parse(message)["event"] == RESET_EVENT
+    assert json.loads(parse(message)["data"]) == {"reason": "gap"}
+    assert parse(message)["id"] == bus.event_id(2)
+
+
+def test_stream_resets_after_a_buffer_overrun(bus):
+    publish(bus, 5)
+    [message] = asyncio.run(read(bus.event_id(1), 1))
+
+    assert parse(message)["event"] == RESET_EVENT
+    assert parse(message)["id"] == bus.event_id(5)
+
+
+def test_stream_sends_heartbeats_and_unsubscribes(bus, monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_HEARTBEAT_SECONDS", 0.01)
+    [message] = asyncio.run(read(None, 1))
+
+    assert message == ": heartbeat\n\n"
+    assert bus._subscriptions == set()
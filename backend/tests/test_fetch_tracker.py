@@ -0,0 +1,87 @@
+"""
+Fetch tracker: Retry-After parsing, per-resource cooldowns and error back-off
+"""
+from datetime import datetime, timedelta
+from email.utils import formatdate
+
+import httpx
+
+from app.connectors.base import RateLimitError, parse_retry_after
+from app.core.config import settings
+from app.services.fetch_tracker import FetchTracker
+from app.services.quota import QuotaExceededError
+
+
+def retry_after_header(value):
+    return parse_retry_after(httpx.Response(429, headers={"Retry-After": value}))
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert retry_after_header("120") == 120
+    assert parse_retry_after(httpx.Response(429)) is None
+    assert retry_after_header("soon") is None
+
+    in_a_minute = formatdate(datetime.utcnow().timestamp() + 60, usegmt=True)
+    assert 55 <= retry_after_header(in_a_minute) <= 60
+
+
+def test_rate_limit_puts_only_that_resource_in_cooldown(db):
+    tracker = FetchTracker(db)
+    tracker.record_failure("SolarEdge", "site-1", "overview", RateLimitError("SolarEdge", 90))
+
+    until = tracker.cooldown_until("SolarEdge", "site-1", "overview")
+    assert until is not None
+    assert timedelta(seconds=85) < until - datetime.utcnow() <= timedelta(seconds=90)
+    assert tracker.get("SolarEdge", "site-1", "overview").last_status == "rate_limited"
+    assert not tracker.is_cooling_down("SolarEdge", "site-1", "devices")
+    assert not tracker.is_cooling_down("SolarEdge", "site-2", "overview")
+
+
+def test_missing_retry_after_falls_back_to_default_cooldown(db):
+    tracker = FetchTracker(db)
+    tracker.record_failure("Generac", None, "sites", RateLimitError("Generac"))
+
+    assert tracker.get("Generac", None, "sites").retry_after == settings.RATE_LIMIT_COOLDOWN_SECONDS
+
+
+def test_quota_exhaustion_cools_down_and_success_clears_it(db):
+    tracker = FetchTracker(db)
+    tracker.record_failure("Enphase", "site-1", "energy", QuotaExceededError("Enphase:vendor:Enphase", 300))
+    assert tracker.get("Enphase", "site-1", "energy").last_status == "quota_exhausted"
+    assert tracker.is_cooling_down("Enphase", "site-1", "energy")
+
+    tracker.record_success("Enphase", "site-1", "energy")
+    assert not tracker.is_cooling_down("Enphase", "site-1", "energy")
+
+
+def test_other_errors_do_not_cool_down(db):
+    tracker = FetchTracker(db)
+    tracker.record_failure("SolarEdge", "site-1", "devices", RuntimeError("boom"))
+
+    log = tracker.get("SolarEdge", "site-1", "devices")
+    assert log.last_status == "error"
+    assert log.cooldown_until is None
+    assert tracker.backoff_until(log.last_status, log.last_attempt_at, log.retry_after) == (
+        log.last_attempt_at + timedelta(seconds=settings.ERROR_BACKOFF_SECONDS)
+    )
+
+
+def test_consecutive_errors_double_the_backoff_up_to_the_cap(db, monkeypatch):
+    monkeypatch.setattr(settings, "ERROR_BACKOFF_SECONDS", 60)
+    monkeypatch.setattr(settings, "ERROR_BACKOFF_MAX_SECONDS", 300)
+    tracker = FetchTracker(db)
+
+    backoffs = []
+    for _ in range(5):
+        tracker.record_failure("Generac", "site-1", "overview", RuntimeError("401 Unauthorized"))
+        backoffs.append(tracker.get("Generac", "site-1", "overview").retry_after)
+    assert backoffs == [60, 120, 240, 300, 300]
+
+    # A rate limit in between does not count as an error
+    tracker.record_failure("Generac", "site-1", "overview", RateLimitError("Generac", 30))
+    tracker.record_failure("Generac", "site-1", "overview", RuntimeError("401 Unauthorized"))
+    assert tracker.get("Generac", "site-1", "overview").retry_after == 60
+
+    tracker.record_success("Generac", "site-1", "overview")
+    log = tracker.get("Generac", "site-1", "overview")
+    assert tracker.backoff_until(log.last_status, log.last_attempt_at, log.retry_after) is None
@@ -0,0 +1,81 @@
+"""
+HTTP caching: ETags from the change counters and 304 responses
+"""
+from datetime import date
+
+import pytest
+
+from app.api import dashboard
+from app.core.config import settings
+from app.core.http_cache import etag_matches, make_etag
+from app.services.data_service import DataService
+
+
+@pytest.fixture
+def service(db, connector):
+    connector.sites = {"site-1": {"current_power_kw": 2.0}}
+    service = DataService(db)
+    service.fetch_all_sites("Generac", "key")
+    service.fetch_site_overview("site-1", "Generac", "key")
+    return service
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("site", "site-1", 3)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("site", "site-1", 3)
+    assert etag != make_etag("site", "site-1", 4)
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = make_etag("site", "site-1", 3)
+    opaque = etag.removeprefix("W/")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(opaque, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+    assert not etag_matches(make_etag("site", "site-1", 4), etag)
+
+
+@pytest.mark.parametrize("path", ["/api/sites", "/api/sites/site-1", "/api/sites/site-1/overview"])
+def test_unchanged_reads_are_not_modified(client, service, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == (
+        f"private, max-age=0, stale-while-revalidate={settings.SITE_TTL_MINUTES * 60}"
+    )
+
+    etag = response.headers["ETag"]
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+
+def test_a_write_changes_the_etag(client, service, connector):
+    etag = client.get("/api/sites/site-1").headers["ETag"]
+
+    connector.sites["site-1"]["current_power_kw"] = 3.5
+    service.fetch_site_overview("site-1", "Generac", "key", force=True)
+
+    response = client.get("/api/sites/site-1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["current_power_kw"] == 3.5
+    assert response.headers["ETag"] != etag
+
+
+def test_query_parameters_are_part_of_the_etag(client, service):
+    etag = client.get("/api/sites").headers["ETag"]
+    assert client.get("/api/sites", params={"page_size": 5}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_dashboard_stats_revalidate_at_midnight(client, service, monkeypatch):
+    monkeypatch.setattr(dashboard, "fleet_today", lambda: date(2026, 3, 1))
+    etag = client.get("/api/dashboard/stats").headers["ETag"]
+    assert client.get("/api/dashboard/stats", headers={"If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(dashboard, "fleet_today", lambda: date(2026, 3, 2))
+    assert client.get("/api/dashboard/stats", headers={"If-None-Match": etag}).status_code == 200
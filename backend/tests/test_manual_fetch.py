@@ -0,0 +1,34 @@
+"""
+Manual fetch endpoints: fetch regardless of TTLs, but honour cooldowns
+"""
+from app.api.fetch import fetch_vendor_data
+from app.connectors.base import RateLimitError
+from app.models import ApiKey
+from app.services.fetch_tracker import FetchTracker
+
+
+def test_manual_fetch_ignores_fresh_resources(db, connector):
+    connector.sites = {"site-1": {"current_power_kw": 1.0}}
+    db.add(ApiKey(id="generac", vendor="Generac", key_encrypted="key", key_masked="***key"))
+    db.commit()
+
+    fetch_vendor_data("Generac", db)
+    fetch_vendor_data("Generac", db)
+
+    # Everything was fresh for the second call, which fetched anyway
+    assert connector.calls["get_sites"] == 2
+    assert connector.calls["get_site_overview"] == 2
+    assert connector.calls["get_devices"] == 2
+    assert connector.calls["get_site_energy"] >= 2
+
+
+def test_manual_fetch_still_honours_cooldown(db, connector):
+    connector.sites = {"site-1": {}}
+    db.add(ApiKey(id="generac", vendor="Generac", key_encrypted="key", key_masked="***key"))
+    db.commit()
+    FetchTracker(db).record_failure("Generac", None, "sites", RateLimitError("Generac", 600))
+
+    result = fetch_vendor_data("Generac", db)
+
+    assert connector.calls["get_sites"] == 0
+    assert result["sites_fetched"] == 0
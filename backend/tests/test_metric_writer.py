@@ -0,0 +1,97 @@
+"""
+Metric writer: watermarks never skip points a failed flush dropped
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import MetricWatermark, Site
+from app.services import metric_writer as metric_writer_module
+from app.services.data_service import metric_point_id
+from app.services.metric_writer import MetricWriter
+
+DAY = datetime(2026, 10, 1)
+
+
+def window(site_id, start, hours):
+    """Rows for hourly points in [start, start + hours), and the window's watermark"""
+    rows = [
+        {
+            "id": metric_point_id(site_id, "energy", start + timedelta(hours=hour)),
+            "site_id": site_id,
+            "device_id": None,
+            "timestamp": start + timedelta(hours=hour),
+            "metric_name": "energy",
+            "value": 1.0,
+            "unit": "kWh",
+        }
+        for hour in range(hours)
+    ]
+    end = start + timedelta(hours=hours)
+    return rows, (site_id, "energy", start, end)
+
+
+def watermark(db):
+    db.expire_all()
+    row = db.get(MetricWatermark, "site-1:energy")
+    return row.high_water_mark if row else None
+
+
+@pytest.fixture
+def failing_store(monkeypatch):
+    """Store whose writes fail while `failing` is set"""
+    store = metric_writer_module.get_store()
+    state = {"failing": False}
+    write = store.write
+
+    def flaky_write(db, points):
+        if state["failing"]:
+            raise RuntimeError("disk full")
+        write(db, points)
+
+    monkeypatch.setattr(store, "write", flaky_write)
+    return state
+
+
+@pytest.fixture
+def site(db):
+    db.add(Site(id="site-1", vendor="Generac", vendor_site_id="site-1", name="site-1"))
+    db.commit()
+
+
+def test_watermark_holds_at_a_failed_range_until_it_is_rewritten(db, site, failing_store):
+    writer = MetricWriter()
+    writer.submit(*window("site-1", DAY, 6))
+    assert watermark(db) == DAY + timedelta(hours=6)
+
+    # The flush of hours 6-12 fails; hours 12-18 still flush fine
+    failing_store["failing"] = True
+    writer.submit(*window("site-1", DAY + timedelta(hours=6), 6))
+    failing_store["failing"] = False
+    writer.submit(*window("site-1", DAY + timedelta(hours=12), 6))
+
+    # The watermark stops at the lost range, so ingestion fetches it again
+    assert watermark(db) == DAY + timedelta(hours=6)
+
+    # Re-ingestion from the watermark rewrites the range and releases it
+    writer.submit(*window("site-1", DAY + timedelta(hours=6), 6))
+    assert watermark(db) == DAY + timedelta(hours=12)
+    writer.submit(*window("site-1", DAY + timedelta(hours=12), 6))
+    assert watermark(db) == DAY + timedelta(hours=18)
+    assert writer._lost == {}
+
+
+def test_in_flight_windows_after_the_gap_do_not_release_it(db, site, failing_store):
+    writer = MetricWriter()
+    writer.submit(*window("site-1", DAY, 6))
+
+    failing_store["failing"] = True
+    writer.submit(*window("site-1", DAY + timedelta(hours=6), 6))
+    failing_store["failing"] = False
+
+    # Later windows of the ingestion that hit the failure start past it
+    writer.submit(*window("site-1", DAY + timedelta(hours=12), 6))
+    writer.submit(*window("site-1", DAY + timedelta(hours=18), 6))
+
+    assert watermark(db) == DAY + timedelta(hours=6)
+    assert ("site-1", "energy") in writer._lost
@@ -0,0 +1,52 @@
+"""
+Keyset pagination: opaque cursors and their validation
+"""
+from datetime import datetime
+import base64
+import json
+
+import pytest
+
+from app.api.alerts import ALERT_SORT_KEY
+from app.api.sites import SITE_SORT_KEY
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip_keeps_column_types():
+    timestamp = datetime(2026, 3, 1, 12, 30)
+    cursor = encode_cursor([timestamp, "alert-42"])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, ALERT_SORT_KEY) == [timestamp, "alert-42"]
+    assert decode_cursor(encode_cursor(["Barn", "site-1"]), SITE_SORT_KEY) == ["Barn", "site-1"]
+    assert decode_cursor(encode_cursor([None, "alert-7"]), ALERT_SORT_KEY) == [None, "alert-7"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor({"name": "Barn"}),
+    raw_cursor(["Barn"]),
+    raw_cursor([123, "alert-1"]),
+    raw_cursor(["yesterday", "alert-1"]),
+    raw_cursor(["2026-03-01T12:30:00", 7]),
+    raw_cursor(["2026-03-01T12:30:00", True]),
+    raw_cursor(["2026-03-01T12:30:00", [1]]),
+])
+def test_malformed_alert_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, ALERT_SORT_KEY)
+
+
+def test_malformed_site_cursor_is_rejected():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(raw_cursor([123, "site-1"]), SITE_SORT_KEY)
+
+
+def test_mistyped_cursor_is_a_bad_request(client):
+    assert client.get("/api/sites", params={"cursor": raw_cursor([123, "site-1"])}).status_code == 400
+    assert client.get("/api/alerts", params={"cursor": raw_cursor([123, "id"])}).status_code == 400
+    assert client.get("/api/alerts", params={"cursor": raw_cursor([{}, "alert-1"])}).status_code == 400
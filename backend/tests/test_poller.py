@@ -0,0 +1,124 @@
+"""
+Fleet poller: per-vendor bulkheads and staleness-ranked dispatch
+"""
+from datetime import datetime, timedelta
+import threading
+
+from app.core.config import settings
+from app.models import ApiKey, FetchLog, Site
+from app.services.fetch_tracker import FetchTracker
+from app.services.poller import FleetPoller, PollUnit, batch_size
+from app.services.resources import resource_classes, scheduled_site_resources
+
+
+def test_each_vendor_gets_its_own_bounded_pool():
+    poller = FleetPoller()
+    try:
+        solaredge = poller._executor("SolarEdge")
+        generac = poller._executor("Generac")
+
+        assert poller._executor("SolarEdge") is solaredge
+        assert generac is not solaredge
+        assert solaredge._max_workers == settings.SOLAREDGE_CONCURRENT_LIMIT
+        assert generac._max_workers == settings.GENERAC_CONCURRENT_LIMIT
+    finally:
+        poller.shutdown()
+
+
+def test_saturated_vendor_does_not_block_another():
+    poller = FleetPoller()
+    release = threading.Event()
+    try:
+        for _ in range(settings.GENERAC_CONCURRENT_LIMIT + 2):
+            poller._executor("Generac").submit(release.wait, 5)
+
+        # Generac's workers are all stuck; SolarEdge still runs right away
+        assert poller._executor("SolarEdge").submit(lambda: "done").result(timeout=1) == "done"
+    finally:
+        release.set()
+        poller.shutdown()
+
+
+def add_account(db, vendor="Generac", site_ids=("site-1", "site-2")):
+    db.add(ApiKey(id=vendor, vendor=vendor, key_encrypted="key", key_masked="***key"))
+    for site_id in site_ids:
+        db.add(Site(id=site_id, vendor=vendor, vendor_site_id=site_id, name=site_id))
+    db.commit()
+
+
+def mark_fetched(db, vendor, site_id, resource, ago_minutes):
+    db.add(FetchLog(
+        id=FetchTracker.log_id(vendor, site_id, resource),
+        vendor=vendor, site_id=site_id, resource=resource,
+        last_success_at=datetime.utcnow() - timedelta(minutes=ago_minutes)
+    ))
+    db.commit()
+
+
+def planned(poller, db):
+    return [(unit.site_id, unit.resource) for group in poller._plan(db) for unit in group]
+
+
+def test_plan_skips_fresh_and_ranks_never_fetched_first(db):
+    add_account(db)
+    ttls = {name: resource.ttl_minutes for name, resource in resource_classes().items()}
+    mark_fetched(db, "Generac", None, "sites", ttls["sites"] / 2)
+    for resource in scheduled_site_resources():
+        mark_fetched(db, "Generac", "site-1", resource, ttls[resource] / 2)
+        mark_fetched(db, "Generac", "site-2", resource, ttls[resource] * 3)
+    db.query(FetchLog).filter(FetchLog.id == FetchTracker.log_id("Generac", "site-2", "devices")).delete()
+    db.commit()
+
+    order = planned(FleetPoller(), db)
+
+    assert order[0] == ("site-2", "devices")
+    assert all(site_id == "site-2" for site_id, _ in order)
+
+
+def test_plan_skips_units_in_cooldown_or_in_flight(db):
+    add_account(db, site_ids=("site-1",))
+    db.add(FetchLog(
+        id=FetchTracker.log_id("Generac", "site-1", "energy"),
+        vendor="Generac", site_id="site-1", resource="energy",
+        cooldown_until=datetime.utcnow() + timedelta(minutes=5)
+    ))
+    db.commit()
+    poller = FleetPoller()
+    poller._in_flight.add(("Generac", "site-1", "devices"))
+
+    units = planned(poller, db)
+
+    assert ("site-1", "energy") not in units
+    assert ("site-1", "devices") not in units
+
+
+def test_plan_backs_off_failing_units_and_ranks_them_after_stale_ones(db, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_TICK_SECONDS", 24 * 3600)  # Budget for the whole queue
+    add_account(db, site_ids=("site-1", "site-2"))
+    ttls = {name: resource.ttl_minutes for name, resource in resource_classes().items()}
+    mark_fetched(db, "Generac", None, "sites", ttls["sites"] / 2)
+    for resource in scheduled_site_resources():
+        mark_fetched(db, "Generac", "site-1", resource, ttls[resource] / 2)
+    mark_fetched(db, "Generac", "site-2", "overview", ttls["overview"] * 2)
+
+    # site-2's devices and energy have never succeeded: one is backing off,
+    # the other's back-off has run out
+    tracker = FetchTracker(db)
+    for resource in ("devices", "energy"):
+        tracker.record_failure("Generac", "site-2", resource, RuntimeError("404 Not Found"))
+    log = tracker.get("Generac", "site-2", "energy")
+    log.last_attempt_at -= timedelta(seconds=log.retry_after + 1)
+    db.commit()
+
+    assert planned(FleetPoller(), db) == [("site-2", "overview"), ("site-2", "energy")]
+
+
+def test_group_packs_bulk_units_without_spending_budget():
+    size = batch_size(PollUnit("SolarEdge", "key", "site-0", "overview"))
+    units = [PollUnit("SolarEdge", "key", f"site-{n}", "overview") for n in range(size + 1)]
+    units.append(PollUnit("SolarEdge", "key", "site-0", "devices"))
+
+    groups = FleetPoller()._group(units, budget=2)
+
+    assert [len(group) for group in groups] == [size, 1]
+    assert groups[1][0].resource == "overview"
@@ -0,0 +1,192 @@
+"""
+Power flow cache: single flight per site, refresh-rate TTL, failures not cached
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+import requests
+
+from app.connectors.solaredge import SolarEdgeConnector
+from app.core.config import settings
+from app.services import power_flow_cache as power_flow_module
+from app.services.data_service import DataService
+from app.services.power_flow_cache import PowerFlowCache
+
+
+def reading(**fields):
+    return {"last_update": "2026-03-01 12:00:00", "pv_power_kw": 4.2, **fields}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(power_flow_module.time, "monotonic", clock)
+    return clock
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = PowerFlowCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return reading()
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        futures = [pool.submit(cache.get, "site-1", fetch) for _ in range(10)]
+        time.sleep(0.2)  # Let every caller reach the cache before the leader returns
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == reading() for result in results)
+    assert cache._in_flight == {}
+
+
+def test_sites_fetch_independently():
+    cache = PowerFlowCache()
+    cache.get("site-1", lambda: reading(pv_power_kw=1.0))
+    assert cache.get("site-2", lambda: reading(pv_power_kw=2.0))["pv_power_kw"] == 2.0
+
+
+def test_reading_is_reused_for_the_refresh_rate(clock):
+    cache = PowerFlowCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return reading(update_refresh_rate=3)
+
+    cache.get("site-1", fetch)
+    clock.now += 2.9
+    assert cache.peek("site-1") is not None
+    cache.get("site-1", fetch)
+    assert len(calls) == 1
+
+    clock.now += 0.1
+    assert cache.peek("site-1") is None
+    cache.get("site-1", fetch)
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("refresh_rate", [None, 0, -5, "soon"])
+def test_default_ttl_without_a_usable_refresh_rate(clock, refresh_rate):
+    cache = PowerFlowCache()
+    cache.get("site-1", lambda: reading(update_refresh_rate=refresh_rate))
+
+    clock.now += settings.POWER_FLOW_CACHE_SECONDS - 0.1
+    assert cache.peek("site-1") is not None
+    clock.now += 0.1
+    assert cache.peek("site-1") is None
+
+
+@pytest.mark.parametrize("result", [None, {"pv_power_kw": 1.0}, {"last_update": None}])
+def test_failed_fetches_are_not_cached(result):
+    cache = PowerFlowCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return result
+
+    assert cache.get("site-1", fetch) == result
+    assert cache.peek("site-1") is None
+    cache.get("site-1", fetch)
+    assert len(calls) == 2
+
+
+def test_exception_reaches_the_waiters_and_is_not_cached():
+    cache = PowerFlowCache()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(cache.get, "site-1", fetch) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="upstream down"):
+                future.result(timeout=5)
+
+    assert cache._in_flight == {}
+    assert cache.get("site-1", reading) == reading()
+
+
+def test_clear_drops_readings():
+    cache = PowerFlowCache()
+    cache.get("site-1", reading)
+    assert cache.clear() == 1
+    assert cache.peek("site-1") is None
+
+
+def test_data_service_reads_through_the_shared_cache(db, connector):
+    calls = []
+
+    def get_power_flow(site_id):
+        calls.append(site_id)
+        return reading()
+
+    connector.get_power_flow = get_power_flow
+    service = DataService(db)
+
+    assert service.fetch_power_flow("site-1", "SolarEdge", "key") == reading()
+    assert DataService(db).fetch_power_flow("site-1", "SolarEdge", "key") == reading()
+    assert calls == ["site-1"]
+    assert service.fetch_power_flow("site-1", "Generac", "key") is None
+
+
+def test_data_service_failure_is_retried(db, connector):
+    def get_power_flow(site_id):
+        raise ConnectionError("timeout")
+
+    connector.get_power_flow = get_power_flow
+    assert DataService(db).fetch_power_flow("site-1", "SolarEdge", "key") is None
+
+    connector.get_power_flow = lambda site_id: reading()
+    assert DataService(db).fetch_power_flow("site-1", "SolarEdge", "key") == reading()
+
+
+def test_data_service_treats_a_reading_without_last_update_as_a_failure(db, connector):
+    connector.get_power_flow = lambda site_id: {"pv_power_kw": 0.0, "last_update": None}
+    service = DataService(db)
+
+    assert service.fetch_power_flow("site-1", "SolarEdge", "key") is None
+    assert service.fetch_tracker.get("SolarEdge", "site-1", "power_flow").last_status == "error"
+    assert not service.fetch_tracker.is_fresh("SolarEdge", "site-1", "power_flow")
+
+
+def test_failed_power_flow_leaves_the_overview_power_alone(db, connector):
+    connector.vendor = "SolarEdge"
+    connector.sites = {"site-1": {"current_power_kw": 3.2}}
+    DataService(db).fetch_all_sites("SolarEdge", "key")
+
+    connector.get_power_flow = lambda site_id: {"pv_power_kw": 0.0, "status": "unavailable", "last_update": None}
+    overview = DataService(db).fetch_site_overview("site-1", "SolarEdge", "key", force=True)
+
+    assert overview.current_power_kw == 3.2
+
+
+def test_solaredge_power_flow_errors_propagate(monkeypatch):
+    solaredge = SolarEdgeConnector("key")
+
+    def server_error(*args, **kwargs):
+        raise requests.HTTPError("502 Bad Gateway")
+
+    monkeypatch.setattr(solaredge, "_make_request", server_error)
+    with pytest.raises(requests.HTTPError):
+        solaredge.get_power_flow("se_1")
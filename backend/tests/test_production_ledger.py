@@ -0,0 +1,57 @@
+"""
+Production ledger: daily totals per site, vendor and fleet
+"""
+from datetime import date
+
+import pytest
+
+from app.models import ProductionLedger
+from app.services.counters import FLEET
+from app.services.production_ledger import (
+    LedgerReadings, ledger_id, percent_change, reading_day, vendor_scope
+)
+
+MONDAY, TUESDAY = date(2026, 10, 5), date(2026, 10, 6)
+
+
+def booked(db, scope, day):
+    db.expire_all()
+    row = db.get(ProductionLedger, ledger_id(scope, day))
+    return row.energy_kwh if row else None
+
+
+def book(db, *readings):
+    ledger = LedgerReadings()
+    for site_id, vendor, day, energy_kwh in readings:
+        ledger.record(site_id, vendor, day, energy_kwh)
+    ledger.apply(db)
+    db.commit()
+
+
+def test_reading_day_follows_the_vendor_update_time():
+    assert reading_day({"last_update": "2026-10-05 23:55:00"}) == MONDAY
+    assert reading_day({"last_update": "garbage"}) == reading_day({})
+
+
+def test_percent_change_needs_a_baseline():
+    assert percent_change(15.0, 10.0) == 50.0
+    assert percent_change(15.0, 0.0) is None
+
+
+def test_readings_roll_up_to_vendor_and_fleet(db):
+    book(db, ("site-1", "SolarEdge", MONDAY, 4.0), ("site-2", "Generac", MONDAY, 6.0))
+    # A later reading replaces the site's total; only the change is added up
+    book(db, ("site-1", "SolarEdge", MONDAY, 5.0))
+
+    assert booked(db, "site-1", MONDAY) == 5.0
+    assert booked(db, vendor_scope("SolarEdge"), MONDAY) == 5.0
+    assert booked(db, FLEET, MONDAY) == 11.0
+
+
+def test_a_new_local_day_starts_a_new_row(db):
+    book(db, ("site-1", "SolarEdge", MONDAY, 12.0))
+    book(db, ("site-1", "SolarEdge", TUESDAY, 0.5))
+
+    assert booked(db, "site-1", MONDAY) == 12.0
+    assert booked(db, FLEET, MONDAY) == 12.0
+    assert booked(db, FLEET, TUESDAY) == pytest.approx(0.5)
@@ -0,0 +1,64 @@
+"""
+Quota manager: token buckets that never exceed the daily limit
+"""
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.models import QuotaBucket
+from app.services.quota import (
+    QUOTA_BURST_DIVISOR, QuotaExceededError, QuotaManager, bucket_shape
+)
+
+
+def test_bucket_shape_bounds_any_rolling_day():
+    capacity, refill_per_second = bucket_shape(300)
+
+    assert capacity == 300 / QUOTA_BURST_DIVISOR
+    assert capacity + refill_per_second * 86400 == pytest.approx(300)
+
+
+def test_acquire_stops_at_burst_capacity(db):
+    manager = QuotaManager()
+    capacity, _ = bucket_shape(settings.GENERAC_DAILY_LIMIT)
+
+    for _ in range(int(capacity)):
+        manager.acquire("Generac", "key", cost=1)
+    with pytest.raises(QuotaExceededError) as error:
+        manager.acquire("Generac", "key", cost=1)
+
+    assert error.value.retry_after > 0
+
+
+def test_acquire_draws_all_buckets_or_none(db):
+    manager = QuotaManager()
+    manager.acquire("SolarEdge", "key", "site-1")
+
+    # Drain the site bucket only; the account must not be charged for a refusal
+    bucket = db.query(QuotaBucket).filter(QuotaBucket.scope == "site").one()
+    bucket.tokens = 0
+    db.commit()
+    account_tokens = db.query(QuotaBucket).filter(QuotaBucket.scope == "account").one().tokens
+
+    with pytest.raises(QuotaExceededError):
+        manager.acquire("SolarEdge", "key", "site-1")
+
+    db.expire_all()
+    account = db.query(QuotaBucket).filter(QuotaBucket.scope == "account").one()
+    assert account.tokens == pytest.approx(account_tokens, abs=0.01)
+
+
+def test_old_full_day_bucket_is_rescaled(db):
+    db.add(QuotaBucket(
+        id="Generac:account:x", vendor="Generac", scope="account", scope_id="x",
+        capacity=200.0, tokens=195.0, refill_per_second=200 / 86400,
+        updated_at=datetime.utcnow()
+    ))
+    db.commit()
+
+    manager = QuotaManager()
+    bucket = manager._load_bucket(db, "Generac", "account", "x", 200)
+
+    assert (bucket.capacity, bucket.refill_per_second) == bucket_shape(200)
+    assert bucket.tokens == pytest.approx(bucket.capacity - 5)
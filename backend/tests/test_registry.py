@@ -0,0 +1,31 @@
+"""
+Connector registry: one pooled connector per vendor account
+"""
+from app.connectors.registry import ConnectorRegistry
+
+
+def test_get_reuses_connector_per_account():
+    registry = ConnectorRegistry()
+    try:
+        first = registry.get("SolarEdge", "key-1")
+        assert registry.get("SolarEdge", "key-1") is first
+        assert registry.get("SolarEdge", "key-2") is not first
+        assert registry.get("Unknown", "key-1") is None
+    finally:
+        registry.close_all()
+
+
+def test_close_vendor_retires_without_closing_in_use_connector():
+    registry = ConnectorRegistry()
+    try:
+        in_use = registry.get("SolarEdge", "key-1")
+        registry.close_vendor("SolarEdge")
+
+        # Threads still holding the connector can keep using its client
+        assert not in_use.client.is_closed
+        # New callers get a fresh connector
+        assert registry.get("SolarEdge", "key-1") is not in_use
+    finally:
+        registry.close_all()
+
+    assert in_use.client.is_closed
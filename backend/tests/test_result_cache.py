@@ -0,0 +1,139 @@
+"""
+Result cache: generation invalidation on the memory and SQLite backends
+"""
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import result_cache
+from app.services.result_cache import (
+    MemoryCache, ResultCache, SqliteCache, energy_namespace, get_or_compute, get_or_compute_async, invalidate
+)
+
+
+@pytest.fixture(params=[MemoryCache.name, SqliteCache.name])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", request.param)
+    cache = result_cache.get_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+class Computation:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"value": self.calls}
+
+
+def test_backends_implement_the_interface():
+    with pytest.raises(TypeError):
+        ResultCache()
+
+    class Partial(ResultCache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_results_are_reused_until_invalidated(backend):
+    compute = Computation()
+    assert get_or_compute("stats", ("day",), compute) == {"value": 1}
+    assert get_or_compute("stats", ("day",), compute) == {"value": 1}
+    assert get_or_compute("stats", ("week",), compute) == {"value": 2}
+
+    invalidate("stats")
+    assert get_or_compute("stats", ("day",), compute) == {"value": 3}
+    assert compute.calls == 3
+
+
+def test_invalidation_is_per_namespace(backend):
+    compute = Computation()
+    get_or_compute(energy_namespace("site-1"), (), compute)
+    get_or_compute(energy_namespace("site-2"), (), compute)
+
+    invalidate(energy_namespace("site-1"))
+    get_or_compute(energy_namespace("site-1"), (), compute)
+    get_or_compute(energy_namespace("site-2"), (), compute)
+    assert compute.calls == 3
+
+
+def test_result_computed_before_an_invalidation_is_orphaned(backend):
+    def stale_compute():
+        # The write commits and invalidates while this result is computed
+        invalidate("alerts")
+        return "stale"
+
+    assert get_or_compute("alerts", ("summary",), stale_compute) == "stale"
+    assert get_or_compute("alerts", ("summary",), lambda: "fresh") == "fresh"
+
+
+def test_async_lookup(backend):
+    async def compute():
+        return [1, 2]
+
+    assert asyncio.run(get_or_compute_async("stats", ("async",), compute)) == [1, 2]
+    assert get_or_compute("stats", ("async",), Computation()) == [1, 2]
+
+
+def test_cache_errors_are_misses(backend, monkeypatch):
+    def broken(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(type(backend), "get", broken)
+    monkeypatch.setattr(type(backend), "set", broken)
+    compute = Computation()
+    get_or_compute("stats", (), compute)
+    get_or_compute("stats", (), compute)
+    assert compute.calls == 2
+
+
+def test_memory_generations_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_MAX_ENTRIES", 3)
+    cache = MemoryCache()
+
+    cache.set(f"energy:site-0:{cache.generation('energy:site-0')}", "old", 60)
+    for n in range(1, 10):
+        cache.invalidate(energy_namespace(f"site-{n}"))
+    assert len(cache._generations) == 3
+
+    # site-0's generation was evicted: it comes back as a new one, never
+    # the one its old entry was stored under
+    assert cache.get(f"energy:site-0:{cache.generation('energy:site-0')}") is None
+
+
+def test_memory_generations_never_repeat(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_MAX_ENTRIES", 2)
+    cache = MemoryCache()
+
+    generations = []
+    for n in range(20):
+        namespace = energy_namespace(f"site-{n % 5}")
+        generations.append(cache.generation(namespace))
+        cache.invalidate(namespace)
+    assert len(set(generations)) == len(generations)
+
+
+def test_memory_entries_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_MAX_ENTRIES", 2)
+    cache = MemoryCache()
+    for key in ("a", "b", "c"):
+        cache.set(key, key, 60)
+    assert cache.get("a") is None
+    assert [cache.get("b"), cache.get("c")] == ["b", "c"]
+
+
+def test_memory_generations_are_thread_safe():
+    cache = MemoryCache()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda n: cache.invalidate(f"ns-{n % 4}"), range(400)))
+    generations = [cache.generation(f"ns-{n}") for n in range(4)]
+    assert len(set(generations)) == 4
+    assert max(generations) == 399
@@ -0,0 +1,78 @@
+"""
+Retention: expired history moves to the monthly archives and reads back
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models import MetricRollup, Site, TimeseriesMetric
+from app.services import archive
+from app.services.data_service import metric_point_id
+from app.services.metric_writer import MetricWriter
+from app.services.retention import RetentionService
+from app.services.rollups import read_rollups
+from app.services.timeseries_store import read_series
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    return tmp_path
+
+
+def point(timestamp, value):
+    return {
+        "id": metric_point_id("site-1", "energy", timestamp),
+        "site_id": "site-1",
+        "device_id": None,
+        "timestamp": timestamp,
+        "metric_name": "energy",
+        "value": value,
+        "unit": "kWh",
+    }
+
+
+def test_archive_round_trip_across_months_and_batches():
+    september, october = datetime(2026, 9, 30, 23), datetime(2026, 10, 1, 1)
+    archive.append("raw", [("site-1", "energy", september, (1.5,))])
+    # A second batch appends a gzip member; a re-archived record collapses
+    archive.append("raw", [("site-1", "energy", october, (2.5,)), ("site-1", "energy", september, (1.5,))])
+
+    records = archive.read("raw", "site-1", "energy", datetime(2026, 9, 1), datetime(2026, 11, 1))
+
+    assert records == {september: ["1.5"], october: ["2.5"]}
+    assert archive.read("raw", "site-1", "energy", october, october) == {}
+
+
+def test_months_between_covers_partial_months():
+    assert archive.months_between(datetime(2026, 11, 15), datetime(2027, 1, 2)) == [
+        datetime(2026, 11, 1), datetime(2026, 12, 1), datetime(2027, 1, 1)
+    ]
+
+
+def test_retention_archives_expired_points_and_hours(db, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_RAW_DAYS", 30)
+    monkeypatch.setattr(settings, "RETENTION_HOURLY_DAYS", 60)
+    db.add(Site(id="site-1", vendor="Generac", vendor_site_id="site-1", name="site-1"))
+    db.commit()
+
+    old = (datetime.utcnow() - timedelta(days=90)).replace(minute=0, second=0, microsecond=0)
+    recent = (datetime.utcnow() - timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+    MetricWriter().submit([point(old, 1.0), point(old + timedelta(minutes=15), 2.0), point(recent, 3.0)])
+
+    expired = RetentionService().run()
+
+    assert expired == {"raw": 2, "hour": 1}
+    db.expire_all()
+    assert db.query(TimeseriesMetric).count() == 1
+    assert db.query(MetricRollup).filter(MetricRollup.granularity == "hour").count() == 1
+
+    # Reads merge the archive back in
+    series = read_series(db, "site-1", "energy", old - timedelta(days=1), recent + timedelta(days=1))
+    assert list(series.values) == [1.0, 2.0, 3.0]
+    hours = read_rollups(db, "site-1", "energy", "hour", old, recent)
+    assert [(rollup.bucket_start, rollup.value_sum) for rollup in hours] == [(old, 3.0), (recent, 3.0)]
+    # Daily rollups are kept forever
+    assert read_rollups(db, "site-1", "energy", "day", old, old)[0].value_sum == 3.0
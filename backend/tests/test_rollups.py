@@ -0,0 +1,75 @@
+"""
+Rollups: touched buckets are recomputed from the level below
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Site
+from app.services.data_service import metric_point_id
+from app.services.metric_writer import MetricWriter
+from app.services.rollups import bucket_end, bucket_start, read_rollups
+
+DAY = datetime(2026, 10, 1)
+
+
+def point(timestamp, value):
+    return {
+        "id": metric_point_id("site-1", "energy", timestamp),
+        "site_id": "site-1",
+        "device_id": None,
+        "timestamp": timestamp,
+        "metric_name": "energy",
+        "value": value,
+        "unit": "kWh",
+    }
+
+
+def aggregates(db, granularity):
+    db.expire_all()
+    return [
+        (rollup.bucket_start, rollup.value_sum, rollup.value_min, rollup.value_max, rollup.sample_count)
+        for rollup in read_rollups(db, "site-1", "energy", granularity, DAY, DAY + timedelta(days=1))
+    ]
+
+
+@pytest.fixture(autouse=True)
+def site(db):
+    db.add(Site(id="site-1", vendor="Generac", vendor_site_id="site-1", name="site-1"))
+    db.commit()
+
+
+def test_bucket_boundaries():
+    timestamp = datetime(2026, 12, 31, 23, 45)
+
+    assert bucket_start(timestamp, "hour") == datetime(2026, 12, 31, 23)
+    assert bucket_start(timestamp, "day") == datetime(2026, 12, 31)
+    assert bucket_end(bucket_start(timestamp, "month"), "month") == datetime(2027, 1, 1)
+    with pytest.raises(ValueError):
+        bucket_start(timestamp, "week")
+
+
+def test_rollups_aggregate_each_level(db):
+    MetricWriter().submit([
+        point(DAY + timedelta(minutes=0), 1.0),
+        point(DAY + timedelta(minutes=15), 3.0),
+        point(DAY + timedelta(hours=1), 2.0),
+    ])
+
+    assert aggregates(db, "hour") == [
+        (DAY, 4.0, 1.0, 3.0, 2),
+        (DAY + timedelta(hours=1), 2.0, 2.0, 2.0, 1),
+    ]
+    assert aggregates(db, "day") == [(DAY, 6.0, 1.0, 3.0, 3)]
+    assert aggregates(db, "month") == [(DAY.replace(day=1), 6.0, 1.0, 3.0, 3)]
+
+
+def test_revised_point_recomputes_min_and_max(db):
+    writer = MetricWriter()
+    writer.submit([point(DAY, 1.0), point(DAY + timedelta(minutes=15), 5.0)])
+
+    # The still-filling interval is revised downwards
+    writer.submit([point(DAY + timedelta(minutes=15), 2.0)])
+
+    assert aggregates(db, "hour") == [(DAY, 3.0, 1.0, 2.0, 2)]
+    assert aggregates(db, "day") == [(DAY, 3.0, 1.0, 2.0, 2)]
@@ -0,0 +1,134 @@
+"""
+Timeseries stores: chunk codec, month partitions and interchangeable backends
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import MetricChunk, Site
+from app.services import archive, timeseries_store
+from app.services.data_service import metric_point_id
+from app.services.timeseries_store import (
+    BatchExpiringStore, ChunkStore, PartitionStore, RowStore, TimeseriesStore, decode_chunk, encode_chunk,
+    partition_table
+)
+
+DAY = datetime(2026, 10, 1)
+
+
+def point(timestamp, value, site_id="site-1"):
+    return {
+        "id": metric_point_id(site_id, "energy", timestamp),
+        "site_id": site_id,
+        "device_id": None,
+        "timestamp": timestamp,
+        "metric_name": "energy",
+        "value": value,
+        "unit": "kWh",
+    }
+
+
+@pytest.fixture
+def site(db):
+    db.add(Site(id="site-1", vendor="Generac", vendor_site_id="site-1", name="site-1"))
+    db.commit()
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        TimeseriesStore()
+    with pytest.raises(TypeError):
+        BatchExpiringStore()
+
+
+def test_chunk_codec_round_trips_offsets_and_float32_values():
+    points = {
+        DAY + timedelta(minutes=15 * slot): value
+        for slot, value in enumerate([0.1, 2.5, 0.0, 1234.567, 1e-3])
+    }
+
+    series = decode_chunk(DAY, len(points), encode_chunk(DAY, points))
+
+    assert series.timestamps == sorted(points)
+    assert list(series.values) == [points[timestamp] for timestamp in sorted(points)]
+
+
+def test_chunk_payload_is_compact():
+    points = {DAY + timedelta(minutes=15 * slot): 1.5 for slot in range(96)}
+
+    # 96 points, 4-byte offsets and 4-byte values before compression
+    assert len(encode_chunk(DAY, points)) < 96 * 8
+
+
+@pytest.mark.parametrize("store_class", [RowStore, ChunkStore])
+def test_store_upserts_and_reads_a_range(db, site, store_class):
+    store = store_class()
+    store.write(db, [point(DAY + timedelta(hours=hour), float(hour)) for hour in range(30)])
+    db.commit()
+
+    # Rewriting a point replaces it instead of adding one
+    store.write(db, [point(DAY + timedelta(hours=2), 20.0)])
+    db.commit()
+
+    series = store.read(db, "site-1", "energy", DAY + timedelta(hours=1), DAY + timedelta(hours=26))
+    assert series.timestamps == [DAY + timedelta(hours=hour) for hour in range(1, 26)]
+    assert series.values[:2].tolist() == [1.0, 20.0]
+
+
+def test_chunk_store_keeps_one_row_per_site_metric_day(db, site):
+    ChunkStore().write(db, [point(DAY + timedelta(hours=hour), 1.0) for hour in range(48)])
+    db.commit()
+
+    chunks = db.query(MetricChunk).order_by(MetricChunk.day).all()
+    assert [(chunk.day, chunk.point_count) for chunk in chunks] == [(DAY, 24), (DAY + timedelta(days=1), 24)]
+
+
+@pytest.fixture
+def partitions():
+    """A PartitionStore whose month tables are dropped after the test"""
+    store = PartitionStore()
+    yield store
+    for month in store.months():
+        partition_table(month).drop(bind=engine, checkfirst=True)
+
+
+def test_partition_store_writes_one_table_per_month(db, partitions):
+    partitions.write(db, [point(datetime(2026, 9, 30, 23), 1.0), point(DAY, 2.0)])
+    db.commit()
+
+    tables = set(inspect(engine).get_table_names())
+    assert {"timeseries_metrics_2026_09", "timeseries_metrics_2026_10"} <= tables
+    assert partitions.months() == {datetime(2026, 9, 1), DAY}
+
+
+def test_partition_reads_only_touch_overlapping_months(db, partitions, monkeypatch):
+    partitions.write(db, [point(datetime(2026, month, 15), float(month)) for month in (8, 9, 10)])
+    db.commit()
+
+    queried = []
+    original = timeseries_store.partition_table
+    monkeypatch.setattr(timeseries_store, "partition_table", lambda month: queried.append(month) or original(month))
+
+    series = partitions.read(db, "site-1", "energy", datetime(2026, 9, 1), datetime(2026, 12, 1))
+
+    assert list(series.values) == [9.0, 10.0]
+    # August is pruned; November has no partition and is skipped
+    assert queried == [datetime(2026, 9, 1), DAY]
+
+
+def test_partition_expiry_archives_and_drops_whole_months(db, partitions, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    partitions.write(db, [point(datetime(2026, 8, 15), 8.0), point(datetime(2026, 9, 15), 9.0)])
+    db.commit()
+
+    # The cutoff falls inside September, which is kept until it fully expires
+    assert partitions.expire(datetime(2026, 9, 20)) == 1
+
+    assert partitions.months() == {datetime(2026, 9, 1)}
+    assert "timeseries_metrics_2026_08" not in inspect(engine).get_table_names()
+    archived = archive.read("raw", "site-1", "energy", datetime(2026, 8, 1), datetime(2026, 10, 1))
+    assert archived == {datetime(2026, 8, 15): ["8.0"]}
+    assert list(partitions.read(db, "site-1", "energy", datetime(2026, 8, 1), DAY).values) == [9.0]
@@ -0,0 +1,31 @@
+import { useEffect, useRef } from 'react';
+import { eventsApi } from '../services/api';
+
+// sites / devices / alerts carry an array of changed fields (each with its
+// id); reset means changes were missed and the data should be reloaded
+export type ChangeEventKind = 'sites' | 'devices' | 'alerts' | 'reset';
+
+type ChangeHandlers = Partial<Record<ChangeEventKind, (data: any) => void>>;
+
+const EVENT_KINDS: ChangeEventKind[] = ['sites', 'devices', 'alerts', 'reset'];
+
+export const useEvents = (handlers: ChangeHandlers, enabled = true) => {
+  // Latest handlers, so the stream is not reopened on every render
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    const source = eventsApi.connect();
+    EVENT_KINDS.forEach((kind) => {
+      source.addEventListener(kind, (event) => {
+        handlersRef.current[kind]?.(JSON.parse((event as MessageEvent).data));
+      });
+    });
+
+    return () => {
+      source.close();
+    };
+  }, [enabled]);
+};
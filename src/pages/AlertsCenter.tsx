@@ -19,7 +19,8 @@ import {
 } from '@ant-design/icons';
 import type { ColumnsType } from 'antd/es/table';
 import { alertsApi } from '../services/api';
-import type { Alert, AlertSeverity, AlertStatus } from '@/types';
+import { useEvents } from '../hooks/useEvents';
+import type { Alert, AlertSeverity, AlertStatus, AlertsSummary } from '@/types';
 import dayjs from 'dayjs';
 import './AlertsCenter.css';
 
@@ -29,6 +30,8 @@ const AlertsCenter = () => {
   const navigate = useNavigate();
   const [alerts, setAlerts] = useState<Alert[]>([]);
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [summary, setSummary] = useState<AlertsSummary | null>(null);
   const [filters, setFilters] = useState({
     vendor: 'all',
     severity: 'all',
@@ -40,15 +43,43 @@ const AlertsCenter = () => {
     fetchAlerts();
   }, [filters]);
 
-  const fetchAlerts = async () => {
+  // Live status changes: patch the loaded alerts and refresh the counts
+  useEvents({
+    alerts: async (changes: Partial<Alert>[]) => {
+      const changesById = new Map(changes.map((change) => [change.id, change]));
+      setAlerts((current) =>
+        current.map((alert) => (changesById.has(alert.id) ? { ...alert, ...changesById.get(alert.id) } : alert))
+      );
+      try {
+        setSummary(await alertsApi.getSummary({
+          vendor: filters.vendor !== 'all' ? filters.vendor : undefined,
+          severity: filters.severity !== 'all' ? filters.severity : undefined,
+          status: filters.status !== 'all' ? filters.status : undefined,
+        }));
+      } catch (error) {
+        console.error('Failed to refresh alert summary:', error);
+      }
+    },
+    reset: () => fetchAlerts(),
+  });
+
+  // Without a cursor the list restarts from the newest alert; with one the
+  // next page is appended
+  const fetchAlerts = async (cursor?: string) => {
     setLoading(true);
     try {
-      const data = await alertsApi.getAll({
+      const params = {
         vendor: filters.vendor !== 'all' ? filters.vendor : undefined,
         severity: filters.severity !== 'all' ? filters.severity : undefined,
         status: filters.status !== 'all' ? filters.status : undefined,
-      });
-      setAlerts(data);
+      };
+      const data = await alertsApi.getAll({ ...params, cursor });
+      setAlerts(cursor ? [...alerts, ...data.alerts] : data.alerts);
+      setNextCursor(data.pagination.next_cursor);
+      if (!cursor) {
+        // Counts come from one grouped query, not from the loaded rows
+        setSummary(await alertsApi.getSummary(params));
+      }
     } catch (error) {
       console.error('Failed to fetch alerts:', error);
     } finally {
@@ -242,7 +273,7 @@ const AlertsCenter = () => {
       {/* Actions Bar */}
       <div style={{ marginBottom: 16, textAlign: 'right' }}>
         <Space>
-          <Button icon={<ReloadOutlined />} onClick={fetchAlerts} loading={loading}>
+          <Button icon={<ReloadOutlined />} onClick={() => fetchAlerts()} loading={loading}>
             Refresh
           </Button>
           <Button icon={<ExportOutlined />}>Export Alerts</Button>
@@ -250,7 +281,20 @@ const AlertsCenter = () => {
       </div>
 
       {/* Alerts Table */}
-      <Card title="All Alerts">
+      <Card
+        title="All Alerts"
+        extra={
+          summary && (
+            <Space size="middle">
+              {Object.entries(summary.severity).map(([severity, count]) => (
+                <Tag key={severity} color={getSeverityColor(severity as AlertSeverity)}>
+                  {severity}: {count}
+                </Tag>
+              ))}
+            </Space>
+          )
+        }
+      >
         <Table
           columns={columns}
           dataSource={alerts}
@@ -259,12 +303,22 @@ const AlertsCenter = () => {
           pagination={{
             pageSize: 20,
             showSizeChanger: true,
-            showTotal: (total) => `Total ${total} alerts`,
+            showTotal: (total) =>
+              summary && summary.total > total
+                ? `Showing ${total} of ${summary.total} alerts`
+                : `Total ${total} alerts`,
           }}
           locale={{
             emptyText: 'No Alerts Yet',
           }}
         />
+        {nextCursor && (
+          <div style={{ marginTop: 16, textAlign: 'center' }}>
+            <Button onClick={() => fetchAlerts(nextCursor)} loading={loading}>
+              Load older alerts
+            </Button>
+          </div>
+        )}
       </Card>
     </div>
   );
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import {
   Card,
@@ -11,7 +11,6 @@ import {
   Button,
   Space,
   Progress,
-  Pagination,
   Alert,
 } from 'antd';
 import {
@@ -27,6 +26,7 @@ import {
 import { useMachine } from '@xstate/react';
 import { pollingMachine } from '../machines/pollingMachine';
 import { dashboardApi, sitesApi, settingsApi } from '../services/api';
+import { useEvents } from '../hooks/useEvents';
 import type { Site, DashboardStats } from '../types';
 import { formatPowerAdaptive, formatEnergyAdaptive } from '../utils/formatters';
 import './FleetDashboard.css';
@@ -40,15 +40,18 @@ const FleetDashboard = () => {
   const [sites, setSites] = useState<Site[]>([]);
   const [loading, setLoading] = useState(false);
   const [hasApiKey, setHasApiKey] = useState<boolean>(true);
-  const [currentPage, setCurrentPage] = useState(1);
+  const [pageCursor, setPageCursor] = useState<string | null>(null);
+  const [cursorHistory, setCursorHistory] = useState<(string | null)[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [pageSize, setPageSize] = useState(10);
-  const [totalCount, setTotalCount] = useState(0);
+  const [totalCount, setTotalCount] = useState<number | null>(null);
   const [filters, setFilters] = useState({
     vendor: 'all',
     status: 'all',
     score: 'all',
   });
   const [sortBy, setSortBy] = useState('name');
+  const statsTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   useEffect(() => {
     checkApiKeys();
@@ -62,7 +65,40 @@ const FleetDashboard = () => {
 
   useEffect(() => {
     fetchSites();
-  }, [currentPage, pageSize, filters.vendor, filters.status]);
+  }, [pageCursor, pageSize, filters.vendor, filters.status]);
+
+  // Live changes: patch the sites on this page in place and refresh the
+  // stats once a burst of events settles (unchanged stats answer 304)
+  const scheduleStatsRefresh = () => {
+    if (statsTimerRef.current) {
+      clearTimeout(statsTimerRef.current);
+    }
+    statsTimerRef.current = setTimeout(async () => {
+      try {
+        setStats(await dashboardApi.getStats());
+      } catch (error) {
+        console.error('Failed to refresh stats:', error);
+      }
+    }, 2000);
+  };
+
+  useEffect(() => () => {
+    if (statsTimerRef.current) {
+      clearTimeout(statsTimerRef.current);
+    }
+  }, []);
+
+  useEvents({
+    sites: (changes: Partial<Site>[]) => {
+      const changesById = new Map(changes.map((change) => [change.id, change]));
+      setSites((current) =>
+        current.map((site) => (changesById.has(site.id) ? { ...site, ...changesById.get(site.id) } : site))
+      );
+      scheduleStatsRefresh();
+    },
+    alerts: scheduleStatsRefresh,
+    reset: () => fetchDashboard(),
+  });
 
   const checkApiKeys = async () => {
     try {
@@ -92,10 +128,13 @@ const FleetDashboard = () => {
   const fetchSites = async () => {
     try {
       const params: any = {
-        page: currentPage,
         page_size: pageSize,
       };
       
+      if (pageCursor) {
+        params.cursor = pageCursor;
+      }
+      
       if (filters.vendor !== 'all') {
         params.vendor = filters.vendor;
       }
@@ -105,6 +144,7 @@ const FleetDashboard = () => {
 
       const data = await sitesApi.getAll(params);
       setSites(data.sites);
+      setNextCursor(data.pagination.next_cursor);
       setTotalCount(data.pagination.total_count);
     } catch (error) {
       console.error('Failed to fetch sites:', error);
@@ -116,11 +156,28 @@ const FleetDashboard = () => {
     send({ type: 'MANUAL_REFRESH' });
   };
 
-  const handlePageChange = (page: number, pageSize?: number) => {
-    setCurrentPage(page);
-    if (pageSize) {
-      setPageSize(pageSize);
-    }
+  // Filters and page size change the result set, so paging restarts
+  const resetPaging = () => {
+    setPageCursor(null);
+    setCursorHistory([]);
+  };
+
+  const handleNextPage = () => {
+    if (!nextCursor) return;
+    setCursorHistory([...cursorHistory, pageCursor]);
+    setPageCursor(nextCursor);
+  };
+
+  const handlePrevPage = () => {
+    const history = [...cursorHistory];
+    const previousCursor = history.pop();
+    setCursorHistory(history);
+    setPageCursor(previousCursor ?? null);
+  };
+
+  const handlePageSizeChange = (size: number) => {
+    setPageSize(size);
+    resetPaging();
   };
 
   const filteredSites = sites.filter((site) => {
@@ -186,7 +243,10 @@ const FleetDashboard = () => {
           <Select
             style={{ width: 150 }}
             value={filters.vendor}
-            onChange={(value) => setFilters({ ...filters, vendor: value })}
+            onChange={(value) => {
+              setFilters({ ...filters, vendor: value });
+              resetPaging();
+            }}
           >
             <Select.Option value="all">All Vendors</Select.Option>
             <Select.Option value="SolarEdge">SolarEdge</Select.Option>
@@ -204,7 +264,10 @@ const FleetDashboard = () => {
           <Select
             style={{ width: 150 }}
             value={filters.status}
-            onChange={(value) => setFilters({ ...filters, status: value })}
+            onChange={(value) => {
+              setFilters({ ...filters, status: value });
+              resetPaging();
+            }}
           >
             <Select.Option value="all">All Status</Select.Option>
             <Select.Option value="Online">Online</Select.Option>
@@ -296,7 +359,7 @@ const FleetDashboard = () => {
             <div style={{ fontSize: 24, fontWeight: 600, lineHeight: 1.2 }}>
               {formatEnergyAdaptive(stats?.total_production_today_kwh || 0)}
             </div>
-            {stats?.change_from_yesterday !== undefined && (
+            {stats?.change_from_yesterday != null && (
               <div style={{ marginTop: 8 }}>
                 <Text type="secondary">
                   {stats.change_from_yesterday > 0 ? (
@@ -385,17 +448,27 @@ const FleetDashboard = () => {
       )}
 
       {/* Pagination */}
-      {totalCount > 0 && (
+      {(sites.length > 0 || cursorHistory.length > 0) && (
         <div style={{ marginTop: 24, textAlign: 'center' }}>
-          <Pagination
-            current={currentPage}
-            pageSize={pageSize}
-            total={totalCount}
-            onChange={handlePageChange}
-            showSizeChanger
-            showTotal={(total, range) => `${range[0]}-${range[1]} of ${total} sites`}
-            pageSizeOptions={['10', '20', '50', '100']}
-          />
+          <Space>
+            <Button onClick={handlePrevPage} disabled={cursorHistory.length === 0}>
+              Previous
+            </Button>
+            <Text type="secondary">
+              Page {cursorHistory.length + 1}
+              {totalCount !== null &&
+                ` of ${Math.max(1, Math.ceil(totalCount / pageSize))} (${totalCount} sites)`}
+            </Text>
+            <Button onClick={handleNextPage} disabled={!nextCursor}>
+              Next
+            </Button>
+            <Select
+              style={{ width: 120 }}
+              value={pageSize}
+              onChange={handlePageSizeChange}
+              options={[10, 20, 50, 100].map((size) => ({ value: size, label: `${size} / page` }))}
+            />
+          </Space>
         </div>
       )}
     </div>
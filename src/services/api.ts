@@ -7,6 +7,8 @@ import type {
   ApiKey,
   Settings,
   TimeseriesMetric,
+  CursorPagination,
+  AlertsSummary,
 } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
@@ -36,9 +38,9 @@ export const sitesApi = {
   getAll: async (params?: {
     vendor?: string;
     status?: string;
-    page?: number;
+    cursor?: string;
     page_size?: number;
-  }): Promise<{ sites: Site[]; pagination: any }> => {
+  }): Promise<{ sites: Site[]; pagination: CursorPagination }> => {
     const response = await api.get('/api/sites', { params });
     return response.data;
   },
@@ -86,11 +88,22 @@ export const alertsApi = {
     vendor?: string;
     severity?: string;
     status?: string;
-  }): Promise<Alert[]> => {
+    cursor?: string;
+    page_size?: number;
+  }): Promise<{ alerts: Alert[]; pagination: CursorPagination }> => {
     const response = await api.get('/api/alerts', { params: filters });
     return response.data;
   },
   
+  getSummary: async (filters?: {
+    vendor?: string;
+    severity?: string;
+    status?: string;
+  }): Promise<AlertsSummary> => {
+    const response = await api.get('/api/alerts/summary', { params: filters });
+    return response.data;
+  },
+  
   getBySite: async (siteId: string): Promise<Alert[]> => {
     const response = await api.get(`/api/sites/${siteId}/alerts`);
     return response.data;
@@ -151,5 +164,10 @@ export const settingsApi = {
   },
 };
 
+// Change events (Server-Sent Events; EventSource reconnects with Last-Event-ID)
+export const eventsApi = {
+  connect: (): EventSource => new EventSource(`${API_BASE_URL}/api/events`),
+};
+
 export default api;
 
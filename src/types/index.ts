@@ -59,6 +59,22 @@ export interface Alert {
   timestamp: string;
 }
 
+// Cursor pagination metadata (pass next_cursor back to get the next page)
+export interface CursorPagination {
+  page_size: number;
+  next_cursor: string | null;
+  has_next: boolean;
+  total_count: number | null;
+}
+
+// Alert counts by facet (GET /api/alerts/summary)
+export interface AlertsSummary {
+  total: number;
+  severity: Record<string, number>;
+  status: Record<string, number>;
+  vendor: Record<string, number>;
+}
+
 // Timeseries metric
 export interface TimeseriesMetric {
   timestamp: string;
@@ -78,6 +94,7 @@ export interface PowerFlow {
   storage_level_percent: number;
   status: string;
   last_update: string | null;
+  update_refresh_rate: number | null;
   unit: string;
 }
 
@@ -96,7 +113,9 @@ export interface DashboardStats {
   online_sites: number;
   sites_with_alerts: number;
   total_production_today_kwh: number;
-  change_from_yesterday: number;
+  production_yesterday_kwh: number;
+  change_from_yesterday: number | null;
+  change_from_last_week: number | null;
   uptime_percentage: number;
   new_alerts_this_week: number;
 }